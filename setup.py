@@ -39,6 +39,7 @@ with open(os.path.join(REQUIREMENT_DIR, "test_requirements.txt")) as f:
 
 dumps_requires = ["pytablewriter>=0.64.0,<2"]
 logging_requires = ["loguru>=0.4.1,<1"]
+zstd_requires = ["zstandard>=0.18.0,<1"]
 tests_requires = list(set(tests_requires + dumps_requires))
 
 setuptools.setup(
@@ -66,6 +67,7 @@ setuptools.setup(
         "dumps": dumps_requires,
         "logging": logging_requires,
         "test": tests_requires,
+        "zstd": zstd_requires,
     },
     classifiers=[
         "Development Status :: 5 - Production/Stable",
@@ -3,10 +3,38 @@
 """
 
 from .__version__ import __author__, __copyright__, __email__, __license__, __version__
+from ._budget import CancellationToken
+from ._catalog import SQLiteSchemaCatalog
+from ._cluster import SchemaCluster, SchemaClusterer, SchemaDeviation
+from ._colindex import ColumnRef
 from ._const import SQLITE_SYSTEM_TABLES, SchemaHeader
-from ._error import DataNotFoundError
+from ._error import (
+    DatabaseFileFormatError,
+    DataNotFoundError,
+    ExtractionCancelledError,
+    ExtractionInterruptedError,
+    ExtractionTimeoutError,
+    ForeignKeyCycleError,
+)
 from ._extractor import SQLiteSchemaExtractor, SQLiteTableSchema
+from ._fileformat import SQLiteFileReader
+from ._fkgraph import ForeignKey, ForeignKeyGraph
+from ._index import (
+    IndexAnalysis,
+    IndexOrigin,
+    RedundancyType,
+    RedundantIndex,
+    SQLiteIndex,
+    SQLiteIndexColumn,
+)
 from ._logger import set_log_level, set_logger
+from ._object import SchemaChanges, SchemaSnapshot, SQLiteTableInfo, SQLiteTrigger, TableType
+from ._pool import SQLiteSchemaExtractorPool
+from ._profile import TableTypeProfile, TypeProfiler
+from ._progress import ProgressBar, ProgressInfo
+from ._retry import RetryPolicy, RetryStats
+from ._stats import ColumnStats, ColumnStatsCollector, HyperLogLog, TableStats
+from ._storage import RowEstimateSource, TableStorageInfo
 
 
 __all__ = (
@@ -15,11 +43,49 @@ __all__ = (
     "__email__",
     "__license__",
     "__version__",
+    "CancellationToken",
+    "ColumnRef",
+    "ColumnStats",
+    "ColumnStatsCollector",
+    "DatabaseFileFormatError",
     "DataNotFoundError",
+    "ExtractionCancelledError",
+    "ExtractionInterruptedError",
+    "ExtractionTimeoutError",
+    "ForeignKey",
+    "ForeignKeyCycleError",
+    "ForeignKeyGraph",
+    "HyperLogLog",
+    "IndexAnalysis",
+    "IndexOrigin",
+    "ProgressBar",
+    "ProgressInfo",
+    "RedundancyType",
+    "RedundantIndex",
+    "RetryPolicy",
+    "RetryStats",
+    "RowEstimateSource",
+    "SchemaChanges",
+    "SchemaCluster",
+    "SchemaClusterer",
+    "SchemaDeviation",
     "SchemaHeader",
+    "SchemaSnapshot",
+    "SQLiteFileReader",
+    "SQLiteIndex",
+    "SQLiteIndexColumn",
+    "SQLiteSchemaCatalog",
     "SQLiteSchemaExtractor",
+    "SQLiteSchemaExtractorPool",
+    "SQLiteTableInfo",
     "SQLiteTableSchema",
+    "SQLiteTrigger",
     "SQLITE_SYSTEM_TABLES",
+    "TableStats",
+    "TableStorageInfo",
+    "TableType",
+    "TableTypeProfile",
+    "TypeProfiler",
     "set_log_level",
     "set_logger",
 )
@@ -1,13 +1,21 @@
 import argparse
 import enum
 import errno
+import re
 import sys
 from textwrap import dedent
 
 from .__version__ import __version__
-from ._error import DataNotFoundError
+from ._catalog import SQLiteSchemaCatalog
+from ._const import STATS_VERBOSITY_LEVEL
+from ._error import DataNotFoundError, ExtractionTimeoutError
 from ._extractor import SQLiteSchemaExtractor
 from ._logger import logger
+from ._profile import TypeProfiler
+from ._progress import ProgressBar
+
+
+_RE_GLOB = re.compile(r"[*?\[]")
 
 
 class LogLevel(enum.Enum):
@@ -29,13 +37,100 @@ def parse_option() -> argparse.Namespace:
     )
     parser.add_argument("-V", "--version", action="version", version="%(prog)s " + __version__)
 
-    parser.add_argument("filepath", help="input SQLite file path")
+    parser.add_argument("filepath", nargs="?", help="input SQLite file path")
+    parser.add_argument(
+        "--catalog",
+        nargs=argparse.REMAINDER,
+        help="""manage a catalog of the schemas of many SQLite database files
+        with the rest of the arguments: build or query subcommands
+        (see '%(prog)s --catalog --help').
+        """,
+    )
 
     group = parser.add_argument_group("Output")
     parser.add_argument("-v", "--verbose", action="store_true", help="Shows verbose output.")
 
-    parser.add_argument("--table", dest="table_name", help="")
+    parser.add_argument(
+        "--table",
+        dest="table_patterns",
+        action="append",
+        metavar="PATTERN",
+        help="""output only tables that match the name or glob pattern (e.g. 'orders_*').
+        can be specified multiple times.
+        """,
+    )
+    parser.add_argument(
+        "--table-regex",
+        dest="table_regexes",
+        action="append",
+        metavar="REGEX",
+        type=re.compile,
+        help="output only tables whose names match the regular expression.",
+    )
+    parser.add_argument(
+        "--exclude",
+        dest="exclude_patterns",
+        action="append",
+        metavar="PATTERN",
+        help="skip tables that match the name or glob pattern. can be specified multiple times.",
+    )
+    parser.add_argument(
+        "--exclude-regex",
+        dest="exclude_regexes",
+        action="append",
+        metavar="REGEX",
+        type=re.compile,
+        help="skip tables whose names match the regular expression.",
+    )
     parser.add_argument("--format", dest="table_format", default="markdown", help="")
+    parser.add_argument(
+        "--storage",
+        action="store_true",
+        help="""show disk usage (from dbstat) and approximate row counts (from sqlite_stat1
+        or max(rowid)) of the tables without scanning the tables.
+        """,
+    )
+    parser.add_argument(
+        "--stats",
+        action="store_true",
+        help="""show statistics of the values of each column (null fraction, approximate distinct
+        count, min/max and average length). each table is scanned once, in parallel.
+        """,
+    )
+    parser.add_argument(
+        "--profile-types",
+        action="store_true",
+        help="""show the storage classes (typeof()) of the values of each column
+        by sampling rows from random rowid ranges of the tables.
+        """,
+    )
+    parser.add_argument(
+        "--sample-size",
+        type=int,
+        default=1000,
+        metavar="ROWS",
+        help="maximum number of rows to sample per table for --profile-types. defaults to %(default)s.",
+    )
+    parser.add_argument(
+        "--time-budget",
+        type=float,
+        default=1.0,
+        metavar="SECONDS",
+        help="maximum seconds to sample per table for --profile-types. defaults to %(default)s.",
+    )
+    parser.add_argument(
+        "--timeout",
+        type=float,
+        metavar="SECONDS",
+        help="""maximum seconds to extract the schema. running queries are interrupted and
+        the tables extracted before the timeout are printed.
+        """,
+    )
+    parser.add_argument(
+        "--progress",
+        action="store_true",
+        help="show a progress bar of the extraction on stderr.",
+    )
 
     loglevel_dest = "log_level"
     group = parser.add_mutually_exclusive_group()
@@ -56,7 +151,73 @@ def parse_option() -> argparse.Namespace:
         help="suppress execution log messages.",
     )
 
-    return parser.parse_args()
+    ns = parser.parse_args()
+    if ns.catalog is None and ns.filepath is None:
+        parser.error("the following arguments are required: filepath")
+    if ns.catalog is not None and ns.filepath is not None:
+        parser.error("filepath is not allowed with --catalog")
+
+    return ns
+
+
+def parse_catalog_option(args: list[str]) -> argparse.Namespace:
+    from argparse import ArgumentParser
+
+    parser = ArgumentParser(
+        prog="sqliteschema --catalog",
+        description="manage a catalog of the schemas of many SQLite database files.",
+    )
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    build_parser = subparsers.add_parser(
+        "build",
+        help="""add database files to a catalog, or refresh the files in a catalog.
+        unchanged files (modification time, size and schema_version) are skipped.
+        """,
+    )
+    build_parser.add_argument("catalog_path", help="catalog database file path")
+    build_parser.add_argument("filepaths", nargs="*", metavar="filepath", help="SQLite file paths")
+    build_parser.add_argument(
+        "--refresh",
+        action="store_true",
+        help="refresh all of the files in the catalog.",
+    )
+    build_parser.add_argument(
+        "--prune",
+        action="store_true",
+        help="remove files that no longer exist from the catalog.",
+    )
+
+    query_parser = subparsers.add_parser("query", help="query a catalog.")
+    query_parser.add_argument("catalog_path", help="catalog database file path")
+    query_group = query_parser.add_mutually_exclusive_group(required=True)
+    query_group.add_argument("--column", help="find tables that have the column.")
+    query_group.add_argument("--table", help="find files that have the table.")
+    query_group.add_argument("--missing-index", help="find files that do not have the index.")
+    query_parser.add_argument("--type", dest="data_type", help="data type of --column.")
+    query_parser.add_argument("--format", dest="table_format", default="markdown", help="")
+
+    for subparser in (build_parser, query_parser):
+        loglevel_dest = "log_level"
+        group = subparser.add_mutually_exclusive_group()
+        group.add_argument(
+            "--debug",
+            dest=loglevel_dest,
+            action="store_const",
+            const=LogLevel.DEBUG,
+            default=LogLevel.INFO,
+            help="for debug print.",
+        )
+        group.add_argument(
+            "--quiet",
+            dest=loglevel_dest,
+            action="store_const",
+            const=LogLevel.QUIET,
+            default=LogLevel.INFO,
+            help="suppress execution log messages.",
+        )
+
+    return parser.parse_args(args)
 
 
 def initialize_logger(name: str, log_level: LogLevel) -> None:
@@ -80,35 +241,144 @@ def initialize_logger(name: str, log_level: LogLevel) -> None:
     logger.enable(name)
 
 
-def main() -> int:
-    ns = parse_option()
+def catalog_main(args: list[str]) -> int:
+    ns = parse_catalog_option(args)
 
     initialize_logger(name="sqliteschema", log_level=ns.log_level)
 
-    extractor = SQLiteSchemaExtractor(ns.filepath)
+    with SQLiteSchemaCatalog(ns.catalog_path) as catalog:
+        if ns.command == "build":
+            if ns.prune:
+                for path in catalog.prune():
+                    logger.info(f"removed: {path}")
+
+            filepaths = list(ns.filepaths)
+            if ns.refresh:
+                filepaths.extend(catalog.fetch_file_paths())
+
+            for path in catalog.build(filepaths):
+                logger.info(f"extracted: {path}")
+
+            return 0
+
+        import pytablewriter as ptw
+
+        if ns.column:
+            headers = ["path", "table_name", "column_name", "data_type"]
+            value_matrix = [
+                [record[header] for header in headers]
+                for record in catalog.find_columns(ns.column, data_type=ns.data_type)
+            ]
+        elif ns.table:
+            headers = ["path"]
+            value_matrix = [[path] for path in catalog.find_tables(ns.table)]
+        else:
+            headers = ["path"]
+            value_matrix = [[path] for path in catalog.find_files_without_index(ns.missing_index)]
+
+        writer = ptw.TableWriterFactory.create_from_format_name(ns.table_format, margin=1)
+        writer.headers = headers
+        writer.value_matrix = value_matrix
+        print(writer.dumps())
+
+    return 0
+
+
+def print_schema(ns: argparse.Namespace) -> int:
+    extractor = SQLiteSchemaExtractor(ns.filepath, time_budget=ns.timeout)
 
     verbosity_level = 3
     if ns.verbose:
         verbosity_level = 5
 
+    if ns.stats:
+        verbosity_level = max(verbosity_level, STATS_VERBOSITY_LEVEL)
+
     output_format = ns.table_format
-    table_name = ns.table_name
+    type_profiler = None
+    if ns.profile_types:
+        type_profiler = TypeProfiler(sample_size=ns.sample_size, time_budget=ns.time_budget)
+
+    table_patterns = ns.table_patterns or []
+    include_patterns = table_patterns + (ns.table_regexes or [])
+    exclude_patterns = (ns.exclude_patterns or []) + (ns.exclude_regexes or [])
 
-    if table_name:
+    is_single_table = (
+        len(include_patterns) == 1
+        and len(table_patterns) == 1
+        and not exclude_patterns
+        and _RE_GLOB.search(table_patterns[0]) is None
+    )
+
+    if is_single_table:
+        # a plain table name: keep the output and the error of a single table
+        table_name = table_patterns[0]
         try:
             print(
-                extractor.fetch_table_schema(table_name).dumps(
-                    output_format=output_format, verbosity_level=verbosity_level
-                )
+                extractor.fetch_table_schema(
+                    table_name,
+                    include_storage=ns.storage,
+                    type_profiler=type_profiler,
+                    include_stats=ns.stats,
+                ).dumps(output_format=output_format, verbosity_level=verbosity_level)
             )
         except DataNotFoundError:
             logger.error(f"'{table_name}' not found in the database")
             return errno.ENOENT
-    else:
-        print(extractor.dumps(output_format=output_format, verbosity_level=verbosity_level))
+
+        return 0
+
+    table_names = None
+    if include_patterns or exclude_patterns:
+        table_names = extractor.fetch_table_names(
+            include_patterns=include_patterns, exclude_patterns=exclude_patterns
+        )
+        if include_patterns and not table_names:
+            logger.error("no tables matched the patterns")
+            return errno.ENOENT
+
+    # storage information of the matched tables is read once for both of the outputs
+    storage_infos = extractor.fetch_storage_infos(table_names=table_names) if ns.storage else None
+
+    progress_bar = ProgressBar() if ns.progress else None
+    try:
+        output = extractor.dumps(
+            output_format=output_format,
+            verbosity_level=verbosity_level,
+            include_patterns=include_patterns,
+            exclude_patterns=exclude_patterns,
+            type_profiler=type_profiler,
+            include_stats=ns.stats,
+            progress_callback=progress_bar,
+            storage_infos=storage_infos,
+        )
+    finally:
+        if progress_bar is not None:
+            progress_bar.close()
+
+    print(output)
+
+    if storage_infos is not None:
+        print(extractor.dumps_storage(output_format=output_format, storage_infos=storage_infos))
 
     return 0
 
 
+def main() -> int:
+    ns = parse_option()
+    if ns.catalog is not None:
+        return catalog_main(ns.catalog)
+
+    initialize_logger(name="sqliteschema", log_level=ns.log_level)
+
+    try:
+        return print_schema(ns)
+    except ExtractionTimeoutError as e:
+        if isinstance(e.partial_result, str) and e.partial_result:
+            print(e.partial_result)
+        logger.error(f"{e}: the output is incomplete")
+        return errno.ETIMEDOUT
+
+
 if __name__ == "__main__":
     sys.exit(main())
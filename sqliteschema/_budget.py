@@ -0,0 +1,213 @@
+"""
+.. codeauthor:: Tsuyoshi Hombashi <tsuyoshi.hombashi@gmail.com>
+"""
+
+import functools
+import sqlite3
+import threading
+import time
+from collections.abc import Iterator
+from contextlib import contextmanager
+from typing import Any, Callable, Final, Optional, TypeVar
+
+from ._error import ExtractionCancelledError, ExtractionInterruptedError, ExtractionTimeoutError
+
+
+# number of SQLite virtual machine instructions between the checks of the progress handler
+PROGRESS_HANDLER_INTERVAL: Final = 10000
+
+T = TypeVar("T")
+
+
+class CancellationToken:
+    """
+    A flag to cancel extractions from another thread.
+    Running statements of the extractors that share the token are interrupted
+    and the extractions fail with :py:class:`~sqliteschema.ExtractionCancelledError`.
+
+    :Sample Code:
+        .. code:: python
+
+            import threading
+            from sqliteschema import CancellationToken, SQLiteSchemaExtractor
+
+            token = CancellationToken()
+            threading.Timer(10, token.cancel).start()
+
+            extractor = SQLiteSchemaExtractor("sample.sqlite", cancellation_token=token)
+            print(extractor.dumps())
+    """
+
+    @property
+    def is_cancelled(self) -> bool:
+        return self.__event.is_set()
+
+    def __init__(self) -> None:
+        self.__event = threading.Event()
+
+    def __repr__(self) -> str:
+        return f"CancellationToken(cancelled={self.is_cancelled})"
+
+    def cancel(self) -> None:
+        self.__event.set()
+
+
+class ExecutionBudget:
+    """
+    Time budgets and a cancellation token of an extractor.
+
+    Args:
+        time_budget:
+            Maximum seconds for all of the calls to the extractor, from the creation of the budget.
+        call_time_budget:
+            Maximum seconds for each call to the extractor.
+        cancellation_token:
+            Token to cancel the calls.
+    """
+
+    @property
+    def is_enabled(self) -> bool:
+        return (
+            self.__deadline is not None
+            or self.__call_time_budget is not None
+            or self.__cancellation_token is not None
+        )
+
+    @property
+    def call_deadline(self) -> Optional[float]:
+        """
+        Deadline of the current call of the thread. |None| if not in a call.
+        """
+
+        if not getattr(self.__local, "depth", 0):
+            return None
+
+        return self.__local.deadline
+
+    def __init__(
+        self,
+        time_budget: Optional[float] = None,
+        call_time_budget: Optional[float] = None,
+        cancellation_token: Optional[CancellationToken] = None,
+    ) -> None:
+        self.__time_budget = time_budget
+        self.__deadline = None if time_budget is None else time.monotonic() + time_budget
+        self.__call_time_budget = call_time_budget
+        self.__cancellation_token = cancellation_token
+        self.__local = threading.local()
+
+    def install(self, con: sqlite3.Connection) -> None:
+        """
+        Set the progress handler of a connection to interrupt running statements
+        when the budget is exceeded.
+        """
+
+        if self.is_enabled:
+            con.set_progress_handler(self.progress_handler, PROGRESS_HANDLER_INTERVAL)
+
+    def progress_handler(self) -> int:
+        return 0 if self.__make_error() is None else 1
+
+    def check(self) -> None:
+        """
+        Raise an exception if the budget is exceeded or the token is cancelled.
+        """
+
+        error = self.__make_error()
+        if error is not None:
+            raise error
+
+    @contextmanager
+    def scope(self, deadline: Optional[float] = None) -> Iterator[None]:
+        """
+        Run a call within the budget. Nested scopes share the deadline of the outermost scope.
+        Statements interrupted by the progress handler raise
+        :py:class:`~sqliteschema.ExtractionInterruptedError` subclasses.
+
+        Args:
+            deadline:
+                Deadline of the call to inherit, e.g. from the caller of a worker thread.
+        """
+
+        depth = getattr(self.__local, "depth", 0)
+        if depth == 0:
+            if deadline is None and self.__call_time_budget is not None:
+                deadline = time.monotonic() + self.__call_time_budget
+            self.__local.deadline = deadline
+        self.__local.depth = depth + 1
+
+        try:
+            self.check()
+            yield
+        except sqlite3.OperationalError:
+            self.check()
+            raise
+        finally:
+            self.__local.depth = depth
+
+    def __make_error(self) -> Optional[ExtractionInterruptedError]:
+        if self.__cancellation_token is not None and self.__cancellation_token.is_cancelled:
+            return ExtractionCancelledError("the extraction is cancelled")
+
+        if self.__deadline is None and not getattr(self.__local, "depth", 0):
+            return None
+
+        now = time.monotonic()
+        if self.__deadline is not None and now > self.__deadline:
+            return ExtractionTimeoutError(
+                f"exceeded the time budget of the database: {self.__time_budget} seconds"
+            )
+
+        call_deadline = self.call_deadline
+        if call_deadline is not None and now > call_deadline:
+            return ExtractionTimeoutError(
+                f"exceeded the time budget of the call: {self.__call_time_budget} seconds"
+            )
+
+        return None
+
+
+def interruptible(func: Callable[..., T]) -> Callable[..., T]:
+    """
+    Decorator to run a method of an extractor within the budget of the extractor.
+    """
+
+    @functools.wraps(func)
+    def wrapper(self: Any, *args: Any, **kwargs: Any) -> T:
+        budget: ExecutionBudget = self._budget
+        if not budget.is_enabled:
+            return func(self, *args, **kwargs)
+
+        with budget.scope():
+            return func(self, *args, **kwargs)
+
+    return wrapper
+
+
+def interruptible_iterator(func: Callable[..., Iterator[T]]) -> Callable[..., Iterator[T]]:
+    """
+    Decorator to run a generator method of an extractor within the budget of the extractor.
+    The items yielded before an interruption, followed by the partial result of
+    the generator itself (items read but not yielded yet), are the partial result
+    of the exception.
+    """
+
+    @functools.wraps(func)
+    def wrapper(self: Any, *args: Any, **kwargs: Any) -> Iterator[T]:
+        budget: ExecutionBudget = self._budget
+        if not budget.is_enabled:
+            yield from func(self, *args, **kwargs)
+            return
+
+        items: list[T] = []
+        try:
+            with budget.scope():
+                for item in func(self, *args, **kwargs):
+                    items.append(item)
+                    yield item
+        except ExtractionInterruptedError as e:
+            if e.partial_result is not None:
+                items.extend(e.partial_result)
+            raise type(e)(*e.args, partial_result=items) from e
+
+    return wrapper
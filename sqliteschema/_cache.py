@@ -0,0 +1,85 @@
+"""
+.. codeauthor:: Tsuyoshi Hombashi <tsuyoshi.hombashi@gmail.com>
+"""
+
+import threading
+from collections import OrderedDict
+from collections.abc import Hashable
+from typing import Generic, NamedTuple, Optional, TypeVar
+
+
+T = TypeVar("T")
+
+
+class CacheInfo(NamedTuple):
+    hits: int
+    misses: int
+    maxsize: int
+    currsize: int
+
+
+class LRUCache(Generic[T]):
+    """
+    A thread-safe bounded mapping that discards the least recently used item
+    when it is full.
+    """
+
+    @property
+    def maxsize(self) -> int:
+        return self.__maxsize
+
+    def __init__(self, maxsize: int) -> None:
+        self.__maxsize = maxsize
+        self.__items: OrderedDict[Hashable, T] = OrderedDict()
+        self.__lock = threading.Lock()
+        self.__hits = 0
+        self.__misses = 0
+
+    def __len__(self) -> int:
+        return len(self.__items)
+
+    def get(self, key: Hashable) -> Optional[T]:
+        with self.__lock:
+            try:
+                value = self.__items[key]
+            except KeyError:
+                self.__misses += 1
+                return None
+
+            self.__items.move_to_end(key)
+            self.__hits += 1
+
+            return value
+
+    def put(self, key: Hashable, value: T) -> None:
+        with self.__lock:
+            if self.__maxsize <= 0:
+                return
+
+            self.__items[key] = value
+            self.__items.move_to_end(key)
+
+            while len(self.__items) > self.__maxsize:
+                self.__items.popitem(last=False)
+
+    def resize(self, maxsize: int) -> None:
+        with self.__lock:
+            self.__maxsize = maxsize
+
+            while len(self.__items) > max(maxsize, 0):
+                self.__items.popitem(last=False)
+
+    def clear(self) -> None:
+        with self.__lock:
+            self.__items.clear()
+            self.__hits = 0
+            self.__misses = 0
+
+    def info(self) -> CacheInfo:
+        with self.__lock:
+            return CacheInfo(self.__hits, self.__misses, self.__maxsize, len(self.__items))
+
+    def __repr__(self) -> str:
+        return "LRUCache({})".format(
+            ", ".join(f"{k}={v}" for k, v in self.info()._asdict().items())
+        )
@@ -0,0 +1,310 @@
+"""
+.. codeauthor:: Tsuyoshi Hombashi <tsuyoshi.hombashi@gmail.com>
+"""
+
+import os
+import sqlite3
+import time
+from collections.abc import Iterable
+from textwrap import dedent
+from types import TracebackType
+from typing import Any, Final, Optional
+
+from ._const import SchemaHeader
+from ._error import OperationalError
+from ._extractor import SQLiteSchemaExtractor
+from ._logger import logger
+
+
+_CATALOG_SCHEMA: Final = dedent(
+    """\
+    CREATE TABLE IF NOT EXISTS files (
+        file_id INTEGER PRIMARY KEY,
+        path TEXT NOT NULL UNIQUE,
+        mtime_ns INTEGER NOT NULL,
+        size INTEGER NOT NULL,
+        schema_version INTEGER NOT NULL,
+        extracted_at REAL NOT NULL
+    );
+    CREATE TABLE IF NOT EXISTS tables (
+        file_id INTEGER NOT NULL REFERENCES files(file_id) ON DELETE CASCADE,
+        table_name TEXT NOT NULL COLLATE NOCASE,
+        PRIMARY KEY (file_id, table_name)
+    ) WITHOUT ROWID;
+    CREATE TABLE IF NOT EXISTS columns (
+        file_id INTEGER NOT NULL REFERENCES files(file_id) ON DELETE CASCADE,
+        table_name TEXT NOT NULL COLLATE NOCASE,
+        column_id INTEGER NOT NULL,
+        column_name TEXT NOT NULL COLLATE NOCASE,
+        data_type TEXT COLLATE NOCASE,
+        nullable TEXT,
+        key TEXT,
+        default_value TEXT,
+        is_indexed INTEGER NOT NULL,
+        extra TEXT,
+        PRIMARY KEY (file_id, table_name, column_id)
+    ) WITHOUT ROWID;
+    CREATE TABLE IF NOT EXISTS indexes (
+        file_id INTEGER NOT NULL REFERENCES files(file_id) ON DELETE CASCADE,
+        index_name TEXT NOT NULL COLLATE NOCASE,
+        table_name TEXT NOT NULL COLLATE NOCASE,
+        sql TEXT,
+        PRIMARY KEY (file_id, index_name)
+    ) WITHOUT ROWID;
+    CREATE INDEX IF NOT EXISTS tables_name ON tables (table_name);
+    CREATE INDEX IF NOT EXISTS columns_name_type ON columns (column_name, data_type);
+    CREATE INDEX IF NOT EXISTS indexes_name ON indexes (index_name);
+    """
+)
+
+
+class SQLiteSchemaCatalog:
+    """
+    A catalog of the schemas of many SQLite database files, stored in a SQLite database.
+    Tables, columns and indexes of the files are stored in indexed tables,
+    so that queries across the files (e.g. "which files have column X of type Y")
+    do not require to extract the schemas again.
+
+    The catalog is refreshed incrementally: a file is skipped if its
+    modification time and size are not changed, and its schema is extracted
+    again only if the ``schema_version`` of the file changed.
+
+    Args:
+        catalog_path:
+            Path to the catalog database file. Created if not exists.
+
+    :Sample Code:
+        .. code:: python
+
+            from sqliteschema import SQLiteSchemaCatalog
+
+            with SQLiteSchemaCatalog("catalog.sqlite") as catalog:
+                catalog.build(["shard1.sqlite", "shard2.sqlite"])
+                print(catalog.find_columns("user_id", data_type="INTEGER"))
+                print(catalog.find_files_without_index("user_id_index"))
+    """
+
+    @property
+    def catalog_path(self) -> str:
+        return self.__catalog_path
+
+    def __init__(self, catalog_path: str) -> None:
+        self.__catalog_path = catalog_path
+
+        try:
+            self.__con = sqlite3.connect(catalog_path)
+            self.__con.execute("PRAGMA foreign_keys = ON")
+            self.__con.executescript(_CATALOG_SCHEMA)
+        except sqlite3.DatabaseError as e:
+            raise OperationalError(e)
+
+    def __enter__(self) -> "SQLiteSchemaCatalog":
+        return self
+
+    def __exit__(
+        self,
+        exc_type: Optional[type[BaseException]],
+        exc_value: Optional[BaseException],
+        traceback: Optional[TracebackType],
+    ) -> None:
+        self.close()
+
+    def close(self) -> None:
+        self.__con.close()
+
+    def build(self, database_paths: Iterable[str]) -> list[str]:
+        """
+        Add database files to the catalog, or refresh the files in the catalog.
+        Files that are not SQLite databases are skipped with warnings.
+
+        Args:
+            database_paths:
+                Paths to SQLite database files.
+
+        :return: Paths of the files whose schemas are extracted.
+        :rtype: list
+        """
+
+        extracted_paths = []
+
+        for database_path in database_paths:
+            path = os.path.abspath(database_path)
+
+            try:
+                if self.__refresh_file(path):
+                    extracted_paths.append(path)
+            except (OSError, sqlite3.DatabaseError) as e:
+                logger.warning(f"skip a file: path={path}, error={e}")
+
+        return extracted_paths
+
+    def prune(self) -> list[str]:
+        """
+        Remove files that no longer exist from the catalog.
+
+        :return: Paths of the removed files.
+        :rtype: list
+        """
+
+        removed_paths = [path for path in self.fetch_file_paths() if not os.path.isfile(path)]
+
+        with self.__con:
+            self.__con.executemany(
+                "DELETE FROM files WHERE path = ?", [[path] for path in removed_paths]
+            )
+
+        return removed_paths
+
+    def fetch_file_paths(self) -> list[str]:
+        return [record[0] for record in self.__con.execute("SELECT path FROM files ORDER BY path")]
+
+    def find_tables(self, table_name: str) -> list[str]:
+        """
+        :return: Paths of the files that have the table.
+        :rtype: list
+        """
+
+        return [
+            record[0]
+            for record in self.__con.execute(
+                dedent(
+                    """\
+                    SELECT f.path FROM tables AS t JOIN files AS f USING (file_id)
+                    WHERE t.table_name = ?
+                    ORDER BY f.path
+                    """
+                ),
+                [table_name],
+            )
+        ]
+
+    def find_columns(
+        self, column_name: str, data_type: Optional[str] = None
+    ) -> list[dict[str, Any]]:
+        """
+        Find columns by the name (and the declared type) across the files.
+        Names and types are compared case-insensitively.
+
+        :return:
+            List of dictionaries that have
+            ``path``, ``table_name``, ``column_name`` and ``data_type`` keys.
+        :rtype: list
+        """
+
+        query = dedent(
+            """\
+            SELECT f.path, c.table_name, c.column_name, c.data_type
+            FROM columns AS c JOIN files AS f USING (file_id)
+            WHERE c.column_name = ? {:s}
+            ORDER BY f.path, c.table_name
+            """
+        )
+        params = [column_name]
+        if data_type is None:
+            query = query.format("")
+        else:
+            query = query.format("AND c.data_type = ?")
+            params.append(data_type)
+
+        return [
+            {"path": path, "table_name": table_name, "column_name": name, "data_type": type_}
+            for path, table_name, name, type_ in self.__con.execute(query, params)
+        ]
+
+    def find_files_without_index(self, index_name: str) -> list[str]:
+        """
+        :return: Paths of the files that do not have the index.
+        :rtype: list
+        """
+
+        return [
+            record[0]
+            for record in self.__con.execute(
+                dedent(
+                    """\
+                    SELECT f.path FROM files AS f
+                    WHERE NOT EXISTS (
+                        SELECT 1 FROM indexes AS i
+                        WHERE i.file_id = f.file_id AND i.index_name = ?
+                    )
+                    ORDER BY f.path
+                    """
+                ),
+                [index_name],
+            )
+        ]
+
+    def __refresh_file(self, path: str) -> bool:
+        stat = os.stat(path)
+        record = self.__con.execute(
+            "SELECT file_id, mtime_ns, size, schema_version FROM files WHERE path = ?", [path]
+        ).fetchone()
+
+        if record is not None and record[1:3] == (stat.st_mtime_ns, stat.st_size):
+            logger.debug(f"skip an unchanged file: {path}")
+            return False
+
+        with SQLiteSchemaExtractor(path) as extractor:
+            schema_version = extractor.fetch_schema_version()
+
+            with self.__con:
+                if record is not None and record[3] == schema_version:
+                    # only the data of the file changed
+                    self.__con.execute(
+                        "UPDATE files SET mtime_ns = ?, size = ? WHERE file_id = ?",
+                        [stat.st_mtime_ns, stat.st_size, record[0]],
+                    )
+                    return False
+
+                logger.debug(f"extract the schema of a file: {path}")
+                if record is not None:
+                    self.__con.execute("DELETE FROM files WHERE file_id = ?", [record[0]])
+
+                file_id = self.__con.execute(
+                    dedent(
+                        """\
+                        INSERT INTO files (path, mtime_ns, size, schema_version, extracted_at)
+                        VALUES (?, ?, ?, ?, ?)
+                        """
+                    ),
+                    [path, stat.st_mtime_ns, stat.st_size, schema_version, time.time()],
+                ).lastrowid
+                self.__insert_schema(file_id, extractor)
+
+        return True
+
+    def __insert_schema(self, file_id: Optional[int], extractor: SQLiteSchemaExtractor) -> None:
+        table_records = []
+        column_records = []
+
+        for table_schema in extractor.fetch_database_schema():
+            table_name = table_schema.table_name
+            table_records.append([file_id, table_name])
+
+            for column_id, attr in enumerate(table_schema.as_dict()[table_name]):
+                column_records.append(
+                    [
+                        file_id,
+                        table_name,
+                        column_id,
+                        attr.get(SchemaHeader.ATTR_NAME),
+                        attr.get(SchemaHeader.DATA_TYPE),
+                        attr.get(SchemaHeader.NULLABLE),
+                        attr.get(SchemaHeader.KEY),
+                        attr.get(SchemaHeader.DEFAULT),
+                        bool(attr.get(SchemaHeader.INDEX)),
+                        attr.get(SchemaHeader.EXTRA),
+                    ]
+                )
+
+        index_records = [
+            [file_id, record["name"], record["tbl_name"], record["sql"]]
+            for record in extractor.fetch_sqlite_master()
+            if record["type"] == "index"
+        ]
+
+        self.__con.executemany("INSERT INTO tables VALUES (?, ?)", table_records)
+        self.__con.executemany(
+            "INSERT INTO columns VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)", column_records
+        )
+        self.__con.executemany("INSERT INTO indexes VALUES (?, ?, ?, ?)", index_records)
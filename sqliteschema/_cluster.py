@@ -0,0 +1,344 @@
+"""
+.. codeauthor:: Tsuyoshi Hombashi <tsuyoshi.hombashi@gmail.com>
+"""
+
+import hashlib
+import random
+from collections.abc import Iterable
+from typing import Any, Final
+
+from ._colindex import normalize_type
+from ._const import DEFAULT_SCHEMA_NAME, SchemaHeader
+from ._extractor import SQLiteSchemaExtractor
+from ._logger import logger
+from ._schema import SQLiteTableSchema
+
+
+_MERSENNE_PRIME: Final = (1 << 61) - 1
+_MAX_HASH: Final = (1 << 32) - 1
+
+
+def extract_schema_features(table_schemas: Iterable[SQLiteTableSchema]) -> frozenset[str]:
+    """
+    Convert table schemas of a database into a set of features:
+    tables, columns with normalized types, key constraints and indexed columns.
+    Identifiers are lowercased since SQLite identifiers are case-insensitive.
+    """
+
+    features = set()
+
+    for table_schema in table_schemas:
+        table_name = table_schema.qualified_name.lower()
+        features.add(f"table {table_name}")
+
+        for attr in table_schema.as_dict()[table_schema.table_name]:
+            column = "{}.{}".format(table_name, str(attr.get(SchemaHeader.ATTR_NAME)).lower())
+            features.add(
+                "column {} {}".format(column, normalize_type(attr.get(SchemaHeader.DATA_TYPE)))
+            )
+            if attr.get(SchemaHeader.KEY):
+                features.add("key {} {}".format(column, attr.get(SchemaHeader.KEY)))
+            if attr.get(SchemaHeader.INDEX) is True:
+                features.add(f"index {column}")
+
+    return frozenset(features)
+
+
+def _choose_bands(threshold: float, num_perm: int) -> tuple[int, int]:
+    # choose (bands, rows) whose S-curve threshold (1/bands)^(1/rows) is the nearest
+    candidates = [
+        (bands, num_perm // bands) for bands in range(1, num_perm + 1) if num_perm % bands == 0
+    ]
+
+    return min(candidates, key=lambda br: abs((1 / br[0]) ** (1 / br[1]) - threshold))
+
+
+class SchemaDeviation:
+    """
+    Difference of the schema of a database from the exemplar schema of its cluster.
+    """
+
+    @property
+    def key(self) -> str:
+        return self.__key
+
+    @property
+    def missing(self) -> list[str]:
+        """
+        Features of the exemplar schema that the schema does not have.
+        """
+
+        return list(self.__missing)
+
+    @property
+    def extra(self) -> list[str]:
+        """
+        Features of the schema that the exemplar schema does not have.
+        """
+
+        return list(self.__extra)
+
+    @property
+    def similarity(self) -> float:
+        """
+        Jaccard similarity between the features of the schema and the exemplar schema.
+        """
+
+        return self.__similarity
+
+    @property
+    def is_identical(self) -> bool:
+        return not self.__missing and not self.__extra
+
+    def __init__(
+        self, key: str, features: frozenset[str], exemplar_features: frozenset[str]
+    ) -> None:
+        self.__key = key
+        self.__missing = sorted(exemplar_features - features)
+        self.__extra = sorted(features - exemplar_features)
+
+        union_count = len(features | exemplar_features)
+        self.__similarity = len(features & exemplar_features) / union_count if union_count else 1.0
+
+    def __repr__(self) -> str:
+        return "SchemaDeviation(key={}, similarity={:.3f}, missing={}, extra={})".format(
+            self.key, self.similarity, len(self.__missing), len(self.__extra)
+        )
+
+    def as_dict(self) -> dict[str, Any]:
+        return {
+            "key": self.key,
+            "similarity": self.similarity,
+            "missing": self.missing,
+            "extra": self.extra,
+        }
+
+
+class SchemaCluster:
+    """
+    A group of databases with similar schemas.
+    """
+
+    @property
+    def exemplar(self) -> str:
+        """
+        Key of the database that has the most common schema in the cluster.
+        """
+
+        return self.__exemplar
+
+    @property
+    def members(self) -> list[str]:
+        return [deviation.key for deviation in self.__deviations]
+
+    @property
+    def deviations(self) -> list[SchemaDeviation]:
+        """
+        Deviations of the members from the exemplar, in the order of the similarity.
+        """
+
+        return list(self.__deviations)
+
+    @property
+    def stragglers(self) -> list[SchemaDeviation]:
+        """
+        Deviations of the members whose schemas differ from the exemplar.
+        """
+
+        return [deviation for deviation in self.__deviations if not deviation.is_identical]
+
+    def __init__(self, exemplar: str, deviations: list[SchemaDeviation]) -> None:
+        self.__exemplar = exemplar
+        self.__deviations = sorted(deviations, key=lambda d: (-d.similarity, d.key))
+
+    def __repr__(self) -> str:
+        return "SchemaCluster(exemplar={}, members={}, stragglers={})".format(
+            self.exemplar, len(self.__deviations), len(self.stragglers)
+        )
+
+    def __len__(self) -> int:
+        return len(self.__deviations)
+
+    def as_dict(self) -> dict[str, Any]:
+        return {
+            "exemplar": self.exemplar,
+            "deviations": [deviation.as_dict() for deviation in self.__deviations],
+        }
+
+
+class SchemaClusterer:
+    """
+    Group databases by schema similarity with MinHash signatures and
+    locality-sensitive hashing (LSH).
+    The schema of each database is converted into a set of features
+    (see :py:func:`extract_schema_features`) and a MinHash signature of the set.
+    Signatures are bucketed by LSH bands, so that only databases that share
+    a bucket are compared with each other.
+
+    Args:
+        threshold:
+            Jaccard similarity threshold of the schemas to be in the same cluster.
+        num_perm:
+            Number of hash functions of MinHash signatures.
+            A larger value improves the accuracy of the similarity estimation.
+        seed:
+            Random seed of the hash functions.
+
+    :Sample Code:
+        .. code:: python
+
+            from sqliteschema import SchemaClusterer
+
+            clusterer = SchemaClusterer(threshold=0.8)
+            for path in shard_paths:
+                clusterer.add_database(path)
+
+            for cluster in clusterer.cluster():
+                print(cluster.exemplar)
+                for deviation in cluster.stragglers:
+                    print(deviation.key, deviation.missing, deviation.extra)
+    """
+
+    @property
+    def threshold(self) -> float:
+        return self.__threshold
+
+    @property
+    def num_perm(self) -> int:
+        return self.__num_perm
+
+    def __init__(self, threshold: float = 0.8, num_perm: int = 128, seed: int = 1) -> None:
+        if not 0 < threshold <= 1:
+            raise ValueError(f"threshold must be in (0, 1]: {threshold}")
+        if num_perm < 1:
+            raise ValueError(f"num_perm must be greater than zero: {num_perm}")
+
+        self.__threshold = threshold
+        self.__num_perm = num_perm
+        self.__bands, self.__rows = _choose_bands(threshold, num_perm)
+
+        rand = random.Random(seed)
+        self.__permutations = [
+            (rand.randint(1, _MERSENNE_PRIME - 1), rand.randint(0, _MERSENNE_PRIME - 1))
+            for _ in range(num_perm)
+        ]
+
+        # schemas of shards share most of the features: hash each feature only once
+        self.__feature_hashes: dict[str, tuple[int, ...]] = {}
+        self.__features: dict[str, frozenset[str]] = {}
+
+    def __len__(self) -> int:
+        return len(self.__features)
+
+    def add(self, key: str, table_schemas: Iterable[SQLiteTableSchema]) -> None:
+        """
+        Add the schema of a database.
+
+        Args:
+            key:
+                Identifier of the database (e.g. a file path).
+            table_schemas:
+                Table schemas of the database.
+        """
+
+        self.__features[key] = extract_schema_features(table_schemas)
+
+    def add_database(self, database_path: str, schema_name: str = DEFAULT_SCHEMA_NAME) -> None:
+        """
+        Extract the schema of a database file and add it with the file path as the key.
+        """
+
+        with SQLiteSchemaExtractor(database_path) as extractor:
+            self.add(database_path, extractor.fetch_database_schema(schema_name))
+
+    def calc_signature(self, features: Iterable[str]) -> tuple[int, ...]:
+        """
+        :return: MinHash signature of a feature set.
+        """
+
+        hash_vectors = [self.__hash_feature(feature) for feature in features]
+        if not hash_vectors:
+            return (_MAX_HASH,) * self.__num_perm
+
+        return tuple(map(min, zip(*hash_vectors)))
+
+    def cluster(self) -> list[SchemaCluster]:
+        """
+        :return: Clusters in descending order of the number of the members.
+        :rtype: list of sqliteschema.SchemaCluster
+        """
+
+        # databases that have exactly the same schemas share a signature
+        groups: dict[frozenset[str], list[str]] = {}
+        for key, features in self.__features.items():
+            groups.setdefault(features, []).append(key)
+
+        feature_sets = list(groups)
+        signatures = [self.calc_signature(features) for features in feature_sets]
+        parents = list(range(len(feature_sets)))
+
+        def find(i: int) -> int:
+            while parents[i] != i:
+                parents[i] = parents[parents[i]]
+                i = parents[i]
+            return i
+
+        for band in range(self.__bands):
+            start = band * self.__rows
+            buckets: dict[tuple[int, ...], list[int]] = {}
+            for i, signature in enumerate(signatures):
+                buckets.setdefault(signature[start : start + self.__rows], []).append(i)
+
+            for members in buckets.values():
+                # compare with the head of the bucket only to keep the cost linear
+                head = members[0]
+                for i in members[1:]:
+                    if (
+                        find(i) != find(head)
+                        and self.__estimate_similarity(signatures[head], signatures[i])
+                        >= self.__threshold
+                    ):
+                        parents[find(i)] = find(head)
+
+        cluster_map: dict[int, list[int]] = {}
+        for i in range(len(feature_sets)):
+            cluster_map.setdefault(find(i), []).append(i)
+
+        clusters = []
+        for group_ids in cluster_map.values():
+            # the exemplar is the most common schema in the cluster
+            exemplar_id = max(group_ids, key=lambda i: len(groups[feature_sets[i]]))
+            exemplar_features = feature_sets[exemplar_id]
+            deviations = [
+                SchemaDeviation(key, feature_sets[i], exemplar_features)
+                for i in group_ids
+                for key in groups[feature_sets[i]]
+            ]
+            clusters.append(SchemaCluster(groups[exemplar_features][0], deviations))
+
+        logger.debug(
+            "clustered {} schemas ({} unique) into {} clusters: bands={}, rows={}".format(
+                len(self.__features), len(feature_sets), len(clusters), self.__bands, self.__rows
+            )
+        )
+
+        return sorted(clusters, key=lambda cluster: (-len(cluster), cluster.exemplar))
+
+    def __hash_feature(self, feature: str) -> tuple[int, ...]:
+        hash_vector = self.__feature_hashes.get(feature)
+        if hash_vector is not None:
+            return hash_vector
+
+        value = int.from_bytes(
+            hashlib.blake2b(feature.encode("utf-8"), digest_size=8).digest(), "little"
+        )
+        hash_vector = tuple(
+            ((a * value + b) % _MERSENNE_PRIME) & _MAX_HASH for a, b in self.__permutations
+        )
+        self.__feature_hashes[feature] = hash_vector
+
+        return hash_vector
+
+    @staticmethod
+    def __estimate_similarity(lhs: tuple[int, ...], rhs: tuple[int, ...]) -> float:
+        return sum(1 for x, y in zip(lhs, rhs) if x == y) / len(lhs)
@@ -0,0 +1,218 @@
+"""
+.. codeauthor:: Tsuyoshi Hombashi <tsuyoshi.hombashi@gmail.com>
+"""
+
+import re
+from collections.abc import Collection, Iterable
+from typing import Any, Final, Optional
+
+
+_RE_TYPE_PARAMS: Final = re.compile(r"\s*\(.*\)\s*$", re.DOTALL)
+
+
+def normalize_type(data_type: Optional[str]) -> str:
+    """
+    Normalize a declared column type to compare types:
+    uppercase with collapsed whitespace and without size parameters
+    (e.g. ``varchar (255)`` to ``VARCHAR``).
+    """
+
+    if not data_type:
+        return ""
+
+    return " ".join(_RE_TYPE_PARAMS.sub("", data_type).upper().split())
+
+
+def get_type_affinity(data_type: Optional[str]) -> str:
+    """
+    Determine the type affinity of a declared column type.
+    https://www.sqlite.org/datatype3.html#determination_of_column_affinity
+    """
+
+    data_type = (data_type or "").upper()
+
+    if "INT" in data_type:
+        return "INTEGER"
+    if "CHAR" in data_type or "CLOB" in data_type or "TEXT" in data_type:
+        return "TEXT"
+    if not data_type or "BLOB" in data_type:
+        return "BLOB"
+    if "REAL" in data_type or "FLOA" in data_type or "DOUB" in data_type:
+        return "REAL"
+
+    return "NUMERIC"
+
+
+class ColumnRef:
+    """
+    A column of a table that is found by
+    :py:meth:`~sqliteschema.SQLiteSchemaExtractor.find_columns`.
+    """
+
+    @property
+    def schema_name(self) -> str:
+        return self.__schema_name
+
+    @property
+    def table_name(self) -> str:
+        return self.__table_name
+
+    @property
+    def column_name(self) -> str:
+        return self.__column_name
+
+    @property
+    def data_type(self) -> Optional[str]:
+        """
+        Declared type of the column.
+        """
+
+        return self.__data_type
+
+    @property
+    def normalized_type(self) -> str:
+        return normalize_type(self.__data_type)
+
+    @property
+    def affinity(self) -> str:
+        return get_type_affinity(self.__data_type)
+
+    @property
+    def not_null(self) -> bool:
+        return self.__not_null
+
+    @property
+    def primary_key(self) -> bool:
+        return self.__primary_key
+
+    @property
+    def unique(self) -> bool:
+        """
+        |True| if the column alone is the primary key or has a unique index.
+        """
+
+        return self.__unique
+
+    @property
+    def indexed(self) -> bool:
+        """
+        |True| if the column is the leading column of an index (or the rowid alias),
+        i.e. rows can be looked up by the column.
+        """
+
+        return self.__indexed
+
+    def __init__(
+        self,
+        schema_name: str,
+        table_name: str,
+        column_name: str,
+        data_type: Optional[str],
+        not_null: bool = False,
+        primary_key: bool = False,
+        unique: bool = False,
+        indexed: bool = False,
+    ) -> None:
+        self.__schema_name = schema_name
+        self.__table_name = table_name
+        self.__column_name = column_name
+        self.__data_type = data_type
+        self.__not_null = not_null
+        self.__primary_key = primary_key
+        self.__unique = unique
+        self.__indexed = indexed
+
+    def __repr__(self) -> str:
+        return "ColumnRef({}.{}.{} {})".format(
+            self.schema_name, self.table_name, self.column_name, self.data_type
+        )
+
+    def __eq__(self, other: Any) -> bool:
+        if not isinstance(other, ColumnRef):
+            return False
+
+        return self.as_dict() == other.as_dict()
+
+    def __hash__(self) -> int:
+        return hash((self.schema_name, self.table_name, self.column_name))
+
+    def as_dict(self) -> dict[str, Any]:
+        return {
+            "schema_name": self.schema_name,
+            "table_name": self.table_name,
+            "column_name": self.column_name,
+            "data_type": self.data_type,
+            "not_null": self.not_null,
+            "primary_key": self.primary_key,
+            "unique": self.unique,
+            "indexed": self.indexed,
+        }
+
+
+class ColumnIndex:
+    """
+    An inverted index of columns by name, type and key flags.
+    Names and types are matched case-insensitively.
+    """
+
+    def __init__(self, columns: Iterable[ColumnRef]) -> None:
+        self.__columns = list(columns)
+        self.__by_name: dict[str, list[int]] = {}
+        self.__by_type: dict[str, list[int]] = {}
+        self.__by_affinity: dict[str, list[int]] = {}
+        self.__by_flag: dict[str, set[int]] = {
+            "primary_key": set(),
+            "unique": set(),
+            "indexed": set(),
+            "not_null": set(),
+        }
+
+        for i, column in enumerate(self.__columns):
+            self.__by_name.setdefault(column.column_name.lower(), []).append(i)
+            self.__by_type.setdefault(column.normalized_type, []).append(i)
+            self.__by_affinity.setdefault(column.affinity, []).append(i)
+            for flag, positions in self.__by_flag.items():
+                if getattr(column, flag):
+                    positions.add(i)
+
+    def __len__(self) -> int:
+        return len(self.__columns)
+
+    def find(
+        self,
+        name: Optional[str] = None,
+        type: Optional[str] = None,
+        affinity: Optional[str] = None,
+        **flags: Optional[bool],
+    ) -> list[ColumnRef]:
+        candidates: list[Collection[int]] = []
+        if name is not None:
+            candidates.append(self.__by_name.get(name.lower(), []))
+        if type is not None:
+            candidates.append(self.__by_type.get(normalize_type(type), []))
+        if affinity is not None:
+            candidates.append(self.__by_affinity.get(affinity.upper(), []))
+
+        excluded: set[int] = set()
+        for flag, value in flags.items():
+            if value is None:
+                continue
+            if flag not in self.__by_flag:
+                raise TypeError(f"unknown column flag: {flag}")
+
+            if value:
+                candidates.append(self.__by_flag[flag])
+            else:
+                excluded |= self.__by_flag[flag]
+
+        if not candidates:
+            positions: Iterable[int] = range(len(self.__columns))
+        else:
+            # intersect starting from the smallest posting list
+            candidates.sort(key=len)
+            positions = candidates[0]
+            for other in candidates[1:]:
+                other_set = other if isinstance(other, set) else set(other)
+                positions = [i for i in positions if i in other_set]
+
+        return [self.__columns[i] for i in sorted(positions) if i not in excluded]
@@ -7,6 +7,13 @@ from typing import Final
 
 MAX_VERBOSITY_LEVEL: Final = 100
 
+# minimum verbosity level to render column statistics of table schemas
+STATS_VERBOSITY_LEVEL: Final = 4
+
+DEFAULT_SCHEMA_NAME: Final = "main"
+TEMP_SCHEMA_NAME: Final = "temp"
+ALL_SCHEMAS: Final = "*"
+
 # https://www.sqlite.org/fileformat2.html
 SQLITE_SYSTEM_TABLES: Final = (
     "sqlite_master",
@@ -17,13 +24,31 @@ SQLITE_SYSTEM_TABLES: Final = (
     "sqlite_stat4",
 )
 
+# suffixes of the shadow tables created by the virtual table modules
+_FTS3_SHADOW_TABLE_SUFFIXES: Final = ("content", "segments", "segdir", "docsize", "stat")
+_RTREE_SHADOW_TABLE_SUFFIXES: Final = ("node", "parent", "rowid")
+SHADOW_TABLE_SUFFIXES: Final = {
+    "fts3": _FTS3_SHADOW_TABLE_SUFFIXES,
+    "fts4": _FTS3_SHADOW_TABLE_SUFFIXES,
+    "fts5": ("data", "idx", "content", "docsize", "config"),
+    "rtree": _RTREE_SHADOW_TABLE_SUFFIXES,
+    "rtree_i32": _RTREE_SHADOW_TABLE_SUFFIXES,
+    "geopoly": _RTREE_SHADOW_TABLE_SUFFIXES,
+}
+
 
 class SchemaHeader:
     ATTR_NAME: Final = "Field"
     DATA_TYPE: Final = "Type"
+    STORAGE_CLASS: Final = "Storage Class"
     KEY: Final = "Key"
     DEFAULT: Final = "Default"
     NULLABLE: Final = "Nullable"
     INDEX: Final = "Index"
     EXTRA: Final = "Extra"
     COMMENT: Final = "Comment"
+    NULL_FRACTION: Final = "Null Fraction"
+    DISTINCT_COUNT: Final = "Distinct"
+    MIN_VALUE: Final = "Min"
+    MAX_VALUE: Final = "Max"
+    AVG_LENGTH: Final = "Avg Length"
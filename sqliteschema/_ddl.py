@@ -0,0 +1,382 @@
+"""
+.. codeauthor:: Tsuyoshi Hombashi <tsuyoshi.hombashi@gmail.com>
+"""
+
+import re
+from collections.abc import Sequence
+from typing import Final, NamedTuple, Optional
+
+from ._sql import quote_identifier
+
+
+# https://www.sqlite.org/lang_keywords.html
+_KEYWORDS: Final = frozenset(
+    """
+    ABORT ACTION ADD AFTER ALL ALTER ALWAYS ANALYZE AND AS ASC ATTACH AUTOINCREMENT BEFORE
+    BEGIN BETWEEN BY CASCADE CASE CAST CHECK COLLATE COLUMN COMMIT CONFLICT CONSTRAINT CREATE
+    CROSS CURRENT CURRENT_DATE CURRENT_TIME CURRENT_TIMESTAMP DATABASE DEFAULT DEFERRABLE
+    DEFERRED DELETE DESC DETACH DISTINCT DO DROP EACH ELSE END ESCAPE EXCEPT EXCLUDE EXCLUSIVE
+    EXISTS EXPLAIN FAIL FILTER FIRST FOLLOWING FOR FOREIGN FROM FULL GENERATED GLOB GROUP
+    GROUPS HAVING IF IGNORE IMMEDIATE IN INDEX INDEXED INITIALLY INNER INSERT INSTEAD
+    INTERSECT INTO IS ISNULL JOIN KEY LAST LEFT LIKE LIMIT MATCH MATERIALIZED NATURAL NO NOT
+    NOTHING NOTNULL NULL NULLS OF OFFSET ON OR ORDER OTHERS OUTER OVER PARTITION PLAN PRAGMA
+    PRECEDING PRIMARY QUERY RAISE RANGE RECURSIVE REFERENCES REGEXP REINDEX RELEASE RENAME
+    REPLACE RESTRICT RETURNING RIGHT ROLLBACK ROW ROWS SAVEPOINT SELECT SET TABLE TEMP
+    TEMPORARY THEN TIES TO TRANSACTION TRIGGER UNBOUNDED UNION UNIQUE UPDATE USING VACUUM
+    VALUES VIEW VIRTUAL WHEN WHERE WINDOW WITH WITHOUT
+    """.split()
+)
+# words of the grammar that are not keywords: never quoted as identifiers
+_BARE_WORDS: Final = frozenset(["TRUE", "FALSE", "STORED", "STRICT", "ROWID"])
+# keywords that are also the names of SQL functions
+_FUNCTION_KEYWORDS: Final = frozenset(["GLOB", "LIKE", "MATCH", "REGEXP", "REPLACE"])
+# a word after these keywords is an identifier even if it is followed by a parenthesis
+_IDENTIFIER_CONTEXT_KEYWORDS: Final = frozenset(
+    ["CONSTRAINT", "EXISTS", "FROM", "INDEX", "INTO", "JOIN", "ON", "REFERENCES", "TABLE"]
+)
+
+# column constraints in the canonical order
+_COLUMN_CONSTRAINT_RANKS: Final = {
+    "PRIMARY": 0,
+    "NOT": 1,
+    "NULL": 1,
+    "UNIQUE": 2,
+    "CHECK": 3,
+    "DEFAULT": 4,
+    "COLLATE": 5,
+    "REFERENCES": 6,
+    "GENERATED": 7,
+    "AS": 7,
+}
+_TABLE_CONSTRAINT_WORDS: Final = frozenset(["CONSTRAINT", "PRIMARY", "UNIQUE", "CHECK", "FOREIGN"])
+_INDENT: Final = "    "
+
+_RE_TOKEN: Final = re.compile(
+    r"""
+    (?P<space>\s+)
+    |(?P<comment>--[^\n]*|/\*.*?(?:\*/|$))
+    |(?P<string>[xX]?'(?:[^']|'')*')
+    |(?P<quoted>"(?:[^"]|"")*"|`(?:[^`]|``)*`|\[[^\]]*\])
+    |(?P<number>0[xX][0-9a-fA-F]+|(?:\d+(?:\.\d*)?|\.\d+)(?:[eE][+-]?\d+)?)
+    |(?P<word>[^\W\d][\w$]*)
+    |(?P<op>\|\||->>|->|<=|>=|==|!=|<>|<<|>>|\S)
+    """,
+    re.VERBOSE | re.DOTALL,
+)
+
+
+class _Token(NamedTuple):
+    kind: str
+    text: str
+
+    @property
+    def upper(self) -> str:
+        return self.text.upper() if self.kind == "word" else self.text
+
+
+def _tokenize(sql: str) -> list[_Token]:
+    return [
+        _Token(str(match.lastgroup), match.group()) for match in _RE_TOKEN.finditer(sql.strip())
+    ]
+
+
+def _unquote(token: _Token) -> str:
+    if token.kind != "quoted":
+        return token.text
+
+    quote = token.text[0]
+    if quote == "[":
+        return token.text[1:-1]
+
+    return token.text[1:-1].replace(quote * 2, quote)
+
+
+def _to_comment_text(token: _Token) -> str:
+    if token.text.startswith("--"):
+        return token.text[2:].strip()
+
+    return " ".join(token.text[2:].rstrip("/").rstrip("*").split())
+
+
+def _split_top_level(tokens: Sequence[_Token], separator: str = ",") -> list[list[_Token]]:
+    groups: list[list[_Token]] = [[]]
+    depth = 0
+
+    for token in tokens:
+        if token.text == "(":
+            depth += 1
+        elif token.text == ")":
+            depth -= 1
+        elif token.text == separator and depth == 0:
+            groups.append([])
+            continue
+
+        groups[-1].append(token)
+
+    return groups
+
+
+def _find_closing_paren(tokens: Sequence[_Token], start: int) -> int:
+    depth = 0
+    for i in range(start, len(tokens)):
+        if tokens[i].text == "(":
+            depth += 1
+        elif tokens[i].text == ")":
+            depth -= 1
+            if depth == 0:
+                return i
+
+    return len(tokens)
+
+
+def _normalize_tokens(tokens: Sequence[_Token]) -> str:
+    """
+    Normalize a sequence of tokens into a single line:
+    uppercase keywords, lowercase function names, double-quoted identifiers
+    and canonical spacing. Comments are kept as ``/* ... */``.
+    """
+
+    significant = [token for token in tokens if token.kind not in ("space", "comment")]
+    parts: list[tuple[str, str]] = []  # (kind, text)
+    sig_index = 0
+
+    for token in tokens:
+        if token.kind == "space":
+            continue
+        if token.kind == "comment":
+            parts.append(("comment", "/* {} */".format(_to_comment_text(token))))
+            continue
+
+        prev_token = significant[sig_index - 1] if sig_index > 0 else None
+        next_token = significant[sig_index + 1] if sig_index + 1 < len(significant) else None
+        sig_index += 1
+
+        if token.kind == "quoted":
+            parts.append(("identifier", quote_identifier(_unquote(token))))
+            continue
+        if token.kind != "word":
+            parts.append((token.kind, token.text))
+            continue
+
+        upper = token.upper
+        prev_upper = prev_token.upper if prev_token else ""
+        is_call = next_token is not None and next_token.text == "("
+
+        if upper in _KEYWORDS and not (is_call and upper in _FUNCTION_KEYWORDS):
+            parts.append(("keyword", upper))
+        elif upper in _BARE_WORDS or prev_upper == "COLLATE":
+            parts.append(("keyword", upper))
+        elif is_call and prev_upper not in _IDENTIFIER_CONTEXT_KEYWORDS and prev_upper != ".":
+            parts.append(("function", token.text.lower()))
+        else:
+            parts.append(("identifier", quote_identifier(token.text)))
+
+    return _join_parts(parts)
+
+
+def _join_parts(parts: Sequence[tuple[str, str]]) -> str:
+    text = ""
+    prev_kind, prev_text = "", ""
+    is_unary = False
+
+    for kind, part in parts:
+        if not text:
+            text = part
+        elif (
+            is_unary
+            or prev_text in ("(", ".")
+            or part in (")", ",", ".", ";")
+            or (part == "(" and prev_kind == "function")
+        ):
+            text += part
+        else:
+            text += " " + part
+
+        # a sign that follows an operator (except a closing parenthesis) or a keyword is unary
+        is_unary = (
+            part in ("-", "+")
+            and kind == "op"
+            and prev_text != ")"
+            and (not prev_text or prev_kind in ("op", "keyword"))
+        )
+        prev_kind, prev_text = kind, part
+
+    return text
+
+
+def _normalize_type(tokens: Sequence[_Token]) -> str:
+    return _join_parts(
+        [
+            ("function" if token.kind == "word" else token.kind, token.upper)
+            for token in tokens
+            if token.kind not in ("space", "comment")
+        ]
+    )
+
+
+def _is_constraint_start(tokens: Sequence[_Token], i: int) -> bool:
+    upper = tokens[i].upper
+    prev_upper = tokens[i - 1].upper if i > 0 else ""
+    next_upper = tokens[i + 1].upper if i + 1 < len(tokens) else ""
+
+    if tokens[i].kind != "word":
+        return False
+    if upper == "NOT":
+        return next_upper == "NULL"
+    if upper == "NULL":
+        return prev_upper not in ("NOT", "DEFAULT", "SET", "IS")
+    if upper == "DEFAULT":
+        return prev_upper != "SET"
+    if upper == "AS":
+        return prev_upper != "ALWAYS"
+
+    return upper == "CONSTRAINT" or upper in _COLUMN_CONSTRAINT_RANKS
+
+
+def _normalize_column_def(tokens: Sequence[_Token]) -> str:
+    significant = [token for token in tokens if token.kind not in ("space", "comment")]
+    column_name = quote_identifier(_unquote(significant[0]))
+
+    # the type name continues until the first constraint at the top level
+    depth = 0
+    type_end = len(significant)
+    for i in range(1, len(significant)):
+        if significant[i].text == "(":
+            depth += 1
+        elif significant[i].text == ")":
+            depth -= 1
+        elif depth == 0 and _is_constraint_start(significant, i):
+            type_end = i
+            break
+
+    constraints: list[list[_Token]] = []
+    depth = 0
+    for i in range(type_end, len(significant)):
+        token = significant[i]
+        is_prefixed = (
+            len(constraints) > 0
+            and len(constraints[-1]) == 2
+            and constraints[-1][0].upper == "CONSTRAINT"
+        )
+        if depth == 0 and _is_constraint_start(significant, i) and not is_prefixed:
+            constraints.append([])
+        if token.text == "(":
+            depth += 1
+        elif token.text == ")":
+            depth -= 1
+        constraints[-1].append(token)
+
+    def rank(constraint: list[_Token]) -> int:
+        head = constraint[2] if constraint[0].upper == "CONSTRAINT" else constraint[0]
+        return _COLUMN_CONSTRAINT_RANKS.get(head.upper, len(_COLUMN_CONSTRAINT_RANKS))
+
+    items = [column_name]
+    type_name = _normalize_type(significant[1:type_end])
+    if type_name:
+        items.append(type_name)
+    items.extend(_normalize_tokens(constraint) for constraint in sorted(constraints, key=rank))
+
+    return " ".join(items)
+
+
+def _is_virtual_table(tokens: Sequence[_Token]) -> bool:
+    words = [token.upper for token in tokens[:3] if token.kind == "word"]
+    return "VIRTUAL" in words
+
+
+def normalize_create_table(table_name: str, sql: str) -> str:
+    """
+    Regenerate a ``CREATE TABLE`` statement in the canonical form:
+
+    - one column definition or table constraint per line
+    - double-quoted identifiers, uppercase keywords and type names
+    - column constraints in a fixed order
+      (``PRIMARY KEY``, ``NOT NULL``, ``UNIQUE``, ``CHECK``, ``DEFAULT``, ``COLLATE``,
+      ``REFERENCES``, ``GENERATED``)
+    - comments kept as ``--`` comments next to the definitions
+
+    ``CREATE VIRTUAL TABLE`` statements are returned as is since the arguments of
+    the module are not SQL.
+    """
+
+    tokens = _tokenize(sql)
+    if _is_virtual_table(tokens):
+        return sql.strip().rstrip(";") + ";"
+
+    body_start = next(i for i, token in enumerate(tokens) if token.text == "(")
+    body_end = _find_closing_paren(tokens, body_start)
+
+    definitions: list[tuple[list[str], list[_Token], list[str]]] = []
+    for group in _split_top_level(tokens[body_start + 1 : body_end]):
+        leading_comments: list[str] = []
+        trailing_comments: list[str] = []
+        is_leading = True
+        is_after_comma = bool(definitions)
+        definition: list[_Token] = []
+
+        for token in group:
+            if token.kind == "space":
+                if "\n" in token.text:
+                    is_after_comma = False
+                continue
+            if token.kind == "comment":
+                if is_leading and is_after_comma:
+                    # a comment on the line of the previous definition belongs to it
+                    definitions[-1][2].append(_to_comment_text(token))
+                elif is_leading:
+                    leading_comments.append(_to_comment_text(token))
+                else:
+                    trailing_comments.append(_to_comment_text(token))
+                continue
+
+            is_leading = False
+            definition.append(token)
+
+        if definition:
+            definitions.append((leading_comments, definition, trailing_comments))
+        elif definitions:
+            definitions[-1][2].extend(leading_comments)
+
+    lines = []
+    for i, (leading_comments, definition, trailing_comments) in enumerate(definitions):
+        lines.extend(f"{_INDENT}-- {comment}" for comment in leading_comments)
+
+        if definition[0].kind == "word" and definition[0].upper in _TABLE_CONSTRAINT_WORDS:
+            line = _INDENT + _normalize_tokens(definition)
+        else:
+            line = _INDENT + _normalize_column_def(definition)
+        if i < len(definitions) - 1:
+            line += ","
+        if trailing_comments:
+            line += "  -- " + " ".join(trailing_comments)
+        lines.append(line)
+
+    options = ", ".join(
+        _normalize_tokens(option)
+        for option in _split_top_level(
+            [token for token in tokens[body_end + 1 :] if token.kind != "comment"]
+        )
+        if any(token.kind == "word" for token in option)
+    )
+
+    return "\n".join(
+        ["CREATE TABLE {} (".format(quote_identifier(table_name))]
+        + lines
+        + [")" + (" " + options if options else "") + ";"]
+    )
+
+
+def normalize_statement(sql: str) -> str:
+    """
+    Regenerate a statement (e.g. ``CREATE INDEX``) in the canonical form on a single line.
+    """
+
+    tokens = _tokenize(sql)
+    while tokens and tokens[-1].text == ";":
+        tokens.pop()
+
+    return _normalize_tokens(tokens) + ";"
+
+
+def to_verbatim_statement(sql: Optional[str]) -> str:
+    return (sql or "").strip().rstrip(";") + ";"
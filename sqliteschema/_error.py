@@ -3,6 +3,7 @@
 """
 
 import sqlite3
+from collections.abc import Sequence
 from typing import Any
 
 
@@ -10,6 +11,12 @@ class DataNotFoundError(ValueError):
     pass
 
 
+class DatabaseFileFormatError(ValueError):
+    """
+    Exception raised when a file is not a valid SQLite database file.
+    """
+
+
 class OperationalError(sqlite3.OperationalError):
     """
     Exception raised when failed to execute a query.
@@ -23,3 +30,51 @@ class OperationalError(sqlite3.OperationalError):
         self.__message = kwargs.pop("message", None)
 
         super().__init__(*args, **kwargs)
+
+
+class ForeignKeyCycleError(ValueError):
+    """
+    Exception raised when tables can not be ordered because of
+    foreign key constraints that refer to each other.
+    """
+
+    @property
+    def cycles(self) -> list[list[str]]:
+        return self.__cycles
+
+    def __init__(self, *args: Any, **kwargs: Any) -> None:
+        cycles: Sequence[Sequence[str]] = kwargs.pop("cycles", [])
+        self.__cycles = [list(cycle) for cycle in cycles]
+
+        super().__init__(*args, **kwargs)
+
+
+class ExtractionInterruptedError(Exception):
+    """
+    Exception raised when an extraction is interrupted by a time budget or a cancellation.
+    ``partial_result`` is the result extracted before the interruption:
+    items yielded so far for iterators, or a partial return value.
+    |None| if the interrupted method has no partial result.
+    """
+
+    @property
+    def partial_result(self) -> Any:
+        return self.__partial_result
+
+    def __init__(self, *args: Any, **kwargs: Any) -> None:
+        self.__partial_result = kwargs.pop("partial_result", None)
+
+        super().__init__(*args, **kwargs)
+
+
+class ExtractionTimeoutError(ExtractionInterruptedError, TimeoutError):
+    """
+    Exception raised when an extraction exceeds its time budget.
+    """
+
+
+class ExtractionCancelledError(ExtractionInterruptedError):
+    """
+    Exception raised when an extraction is cancelled by a
+    :py:class:`~sqliteschema.CancellationToken`.
+    """
@@ -2,48 +2,127 @@
 .. codeauthor:: Tsuyoshi Hombashi <tsuyoshi.hombashi@gmail.com>
 """
 
+import io
 import os.path
 import re
 import sqlite3
+import threading
 from collections import OrderedDict
-from collections.abc import Iterator, Mapping
+from collections.abc import Iterator, Mapping, Sequence
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
 from textwrap import dedent
-from typing import TYPE_CHECKING, Any, Optional, Union, cast
+from types import TracebackType
+from typing import IO, TYPE_CHECKING, Any, Final, Optional, Union, cast
 
 import typepy
 
-from ._const import MAX_VERBOSITY_LEVEL, SQLITE_SYSTEM_TABLES, SchemaHeader
-from ._error import DataNotFoundError, OperationalError
+from ._budget import CancellationToken, ExecutionBudget, interruptible, interruptible_iterator
+from ._cache import CacheInfo, LRUCache
+from ._colindex import ColumnIndex, ColumnRef
+from ._const import (
+    ALL_SCHEMAS,
+    DEFAULT_SCHEMA_NAME,
+    MAX_VERBOSITY_LEVEL,
+    SQLITE_SYSTEM_TABLES,
+    TEMP_SCHEMA_NAME,
+    SchemaHeader,
+)
+from ._ddl import normalize_create_table, normalize_statement, to_verbatim_statement
+from ._error import (
+    DataNotFoundError,
+    ExtractionInterruptedError,
+    ForeignKeyCycleError,
+    OperationalError,
+)
+from ._fkgraph import ForeignKey, ForeignKeyGraph
+from ._index import (
+    IndexAnalysis,
+    SQLiteIndex,
+    SQLiteIndexColumn,
+    find_redundant_indexes,
+    split_index_sql,
+)
 from ._logger import logger
+from ._object import (
+    SchemaChanges,
+    SchemaSnapshot,
+    SQLiteTableInfo,
+    SQLiteTrigger,
+    TableType,
+    calc_table_digests,
+    classify_sqlite_master,
+)
+from ._pattern import NameFilter, NamePattern
+from ._profile import TableTypeProfile, TypeProfiler
+from ._progress import ProgressCallback, ProgressReporter
+from ._retry import RetryingCursor, RetryPolicy, RetryStats, StatementRetrier
 from ._schema import SQLiteTableSchema
+from ._script import SQL_SCRIPT_EXTENSIONS, iter_script_chunks, iter_text_chunks, load_sql_script
+from ._source import BytesSource, deserialize, is_compressed_file, read_database_stream
+from ._sql import qualify_name, quote_identifier
+from ._stats import ColumnStatsCollector, TableStats
+from ._storage import RowEstimateSource, TableStorageInfo, storage_infos_as_tabledata
 
 
 if TYPE_CHECKING:
     import simplesqlite
 
 
-def stash_row_factory(func: Any) -> Any:
-    def wrapper(*args: list[Any], **kwargs: Any) -> Any:
-        db: SQLiteSchemaExtractor = cast(SQLiteSchemaExtractor, args[0])
-        stash_row_factory = db._con.row_factory
-        db._con.row_factory = None
+_DDL_CACHE_SIZE: Final = 1024
 
-        try:
-            result = func(*args, **kwargs)
-        finally:
-            db._con.row_factory = stash_row_factory
+# savepoint of the snapshots on connections given by the caller
+_SNAPSHOT_SAVEPOINT: Final = "sqliteschema_snapshot"
 
-        return result
-
-    return wrapper
+# process-wide cache of parsed table DDLs: (parser class, DDL, index DDLs) -> column records
+_ddl_cache: LRUCache[tuple[tuple[tuple[str, Any], ...], ...]] = LRUCache(_DDL_CACHE_SIZE)
 
 
 class SQLiteSchemaExtractor:
     """A SQLite database file schema extractor class.
 
     Args:
-        database_source (str or simplesqlite.SimpleSQLite or sqlite3.Connection):
+        database_source (str or simplesqlite.SimpleSQLite or sqlite3.Connection or bytes or file-like):
             SQLite database source to extract schema information.
+            ``bytes``/``bytearray``/``memoryview`` of a database image and binary
+            file-like objects are loaded into memory with
+            ``sqlite3.Connection.deserialize`` (requires Python 3.11 or later).
+            gzip/zip/zstd compressed images and files are decompressed on the fly.
+            SQL scripts, i.e. file paths with ``.sql``/``.sql.gz``/``.sql.zst`` extensions and
+            text file-like objects, are read by chunks: only the schema statements are
+            executed into an in-memory connection and data statements are skipped,
+            so that dumps of any size are processed in a constant memory.
+        max_workers:
+            Maximum number of threads to process tables in parallel.
+        time_budget:
+            Maximum seconds for the whole work on the database: loading the source and
+            all of the subsequent calls to the extractor.
+        call_time_budget:
+            Maximum seconds for each call to the extractor.
+        cancellation_token:
+            Token to cancel the calls to the extractor from another thread.
+        busy_timeout:
+            Maximum seconds that SQLite waits for a lock before a statement fails with
+            ``SQLITE_BUSY`` (``PRAGMA busy_timeout``).
+            Defaults to the timeout of ``sqlite3.connect`` for file paths,
+            and to the setting of a given connection.
+        retry_policy:
+            Retry of the statements that fail with ``SQLITE_BUSY``/``SQLITE_LOCKED``
+            (``database is locked``). Defaults to ``RetryPolicy()``.
+            Counts of the retries are available from :py:meth:`get_retry_stats`.
+
+    Running statements are interrupted by the progress handler of SQLite when a time budget
+    is exceeded or the token is cancelled, and the calls fail with
+    :py:class:`~sqliteschema.ExtractionTimeoutError`/:py:class:`~sqliteschema.ExtractionCancelledError`.
+    ``partial_result`` of the exceptions holds the result extracted before the interruption.
+    The progress handler replaces the one of a given connection.
+
+    An extractor can be shared among threads.
+    Rows are fetched with cursor-level row factories, so the row factory of
+    a connection is never modified.
+    If the source is a file path, each thread reads the database with its own
+    connection. Otherwise the given connection is shared: create the connection
+    with ``check_same_thread=False`` to use it from multiple threads.
     """
 
     global_debug_query = False
@@ -51,6 +130,13 @@ class SQLiteSchemaExtractor:
     _SQLITE_MASTER_TABLE_NAME = "master"
     _SQLITE_MASTER_ATTR_NAME_LIST = ["tbl_name", "sql", "type", "name", "rootpage"]
 
+    # a constant statement text to be reused from the statement cache of the snapshot connection
+    __LOOKUP_QUERY = (
+        "SELECT sql FROM {:s} WHERE schema_name = ? AND tbl_name = ? AND type = ?".format(
+            _SQLITE_MASTER_TABLE_NAME
+        )
+    )
+
     _RE_FOREIGN_KEY = re.compile("FOREIGN KEY")
     _RE_ATTR_NAME = re.compile(r"^'.+?'|^\".+?\"|^\[.+?\]")
 
@@ -66,107 +152,1447 @@ class SQLiteSchemaExtractor:
 
     def __init__(
         self,
-        database_source: Union[str, "simplesqlite.SimpleSQLite", sqlite3.Connection],
+        database_source: Union[
+            str,
+            "simplesqlite.SimpleSQLite",
+            sqlite3.Connection,
+            BytesSource,
+            IO[bytes],
+            IO[str],
+        ],
         max_workers: Optional[int] = None,
+        time_budget: Optional[float] = None,
+        call_time_budget: Optional[float] = None,
+        cancellation_token: Optional[CancellationToken] = None,
+        busy_timeout: Optional[float] = None,
+        retry_policy: Optional[RetryPolicy] = None,
     ) -> None:
         from simplesqlite import SimpleSQLite
 
+        self.__budget = ExecutionBudget(time_budget, call_time_budget, cancellation_token)
+        self.__busy_timeout = busy_timeout
+        self.__retrier = StatementRetrier(
+            retry_policy if retry_policy is not None else RetryPolicy(), self.__budget.check
+        )
         is_connection_required = True
+        self.__database_path: Optional[str] = None
+        # connections given by the caller are not closed by the extractor
+        self.__is_con_owner = True
 
         if isinstance(database_source, SimpleSQLite) and database_source.is_connected():
             assert database_source.connection
-            self._con: sqlite3.Connection = database_source.connection
+            self.__con: sqlite3.Connection = database_source.connection
             is_connection_required = False
+            self.__is_con_owner = False
         elif isinstance(database_source, sqlite3.Connection):
-            self._con = database_source
+            self.__con = database_source
+            is_connection_required = False
+            self.__is_con_owner = False
+        elif isinstance(database_source, (bytes, bytearray, memoryview)):
+            self.__con = deserialize(database_source)
+            is_connection_required = False
+        elif isinstance(database_source, io.TextIOBase):
+            try:
+                self.__con = load_sql_script(
+                    iter_text_chunks(cast(IO[str], database_source)), check=self.__budget.check
+                )
+            except sqlite3.OperationalError as e:
+                raise OperationalError(e)
+            is_connection_required = False
+        elif hasattr(database_source, "read"):
+            self.__con = deserialize(
+                read_database_stream(cast(IO[bytes], database_source)), is_owner=True
+            )
             is_connection_required = False
 
         if is_connection_required:
-            assert not isinstance(database_source, sqlite3.Connection)
+            assert isinstance(database_source, str)
 
             if not os.path.isfile(database_source):
                 raise OSError(f"file not found: {database_source}")
 
             try:
-                self._con = sqlite3.connect(database_source)
+                if database_source.lower().endswith(SQL_SCRIPT_EXTENSIONS):
+                    with open(database_source, "rb") as f:
+                        self.__con = load_sql_script(
+                            iter_script_chunks(f), check=self.__budget.check
+                        )
+                elif is_compressed_file(database_source):
+                    with open(database_source, "rb") as f:
+                        self.__con = deserialize(read_database_stream(f), is_owner=True)
+                else:
+                    # the connection is used by the owner thread only, but may be closed
+                    # by another thread (e.g. a pool)
+                    self.__con = sqlite3.connect(database_source, check_same_thread=False)
+                    self.__database_path = database_source
             except sqlite3.OperationalError as e:
                 raise OperationalError(e)
 
+        self.__setup_connection(self.__con)
+        self.__con_owner_thread_id = threading.get_ident()
+        self.__thread_local = threading.local()
+        # connections opened for the threads other than the owner thread
+        self.__thread_cons: dict[threading.Thread, sqlite3.Connection] = {}
+        self.__lock = threading.RLock()
+        # threads that share a connection share the transaction of the snapshot:
+        # connection -> [number of the snapshots, statement that opened the transaction:
+        # "BEGIN", the savepoint name or None if the snapshots joined an open transaction]
+        self.__transaction_refs: dict[sqlite3.Connection, list] = {}
+        self.__transaction_lock = threading.Lock()
+
         self.__con_sqlite_master: Optional[sqlite3.Connection] = None
-        self.__total_changes: Optional[int] = None
+        self.__schema_versions: Optional[tuple[tuple[str, int], ...]] = None
+        self.__table_infos: list[SQLiteTableInfo] = []
+        self.__triggers: list[SQLiteTrigger] = []
+
+        # (schema name, table name) -> digest of the table DDL and its index DDLs
+        self.__table_digests: dict[tuple[str, str], str] = {}
+        self.__refreshed_table_digests: dict[tuple[str, str], str] = {}
+        # (schema name, table name) -> (digest, table DDL, parsed column records)
+        self.__parsed_tables: dict[tuple[str, str], tuple[str, str, tuple]] = {}
+        # schema name -> inverted index of the columns, built once per snapshot
+        self.__column_indexes: dict[str, ColumnIndex] = {}
 
         self.max_workers = max_workers
 
-    @stash_row_factory
+    @property
+    def _con(self) -> sqlite3.Connection:
+        if self.__database_path is None or threading.get_ident() == self.__con_owner_thread_id:
+            return self.__con
+
+        con = getattr(self.__thread_local, "con", None)
+        if con is None:
+            logger.debug(f"open a connection for a thread: {threading.get_ident()}")
+            con = sqlite3.connect(self.__database_path, check_same_thread=False)
+            self.__setup_connection(con)
+            self.__thread_local.con = con
+            with self.__lock:
+                self.__close_exited_thread_cons()
+                self.__thread_cons[threading.current_thread()] = con
+
+        return con
+
+    @property
+    def _budget(self) -> ExecutionBudget:
+        return self.__budget
+
+    def __enter__(self) -> "SQLiteSchemaExtractor":
+        return self
+
+    def __exit__(
+        self,
+        exc_type: Optional[type[BaseException]],
+        exc_value: Optional[BaseException],
+        traceback: Optional[TracebackType],
+    ) -> None:
+        self.close()
+
+    def close(self) -> None:
+        """
+        Close the connections opened by the extractor: the connection to the database,
+        the connections of the threads and the ``sqlite_master`` snapshot.
+        Connections given by the caller (``sqlite3.Connection`` or
+        ``SimpleSQLite`` instances) are not closed.
+        The extractor is not usable after the call.
+        """
+
+        with self.__lock:
+            thread_cons = list(self.__thread_cons.values())
+            self.__thread_cons = {}
+            con_sqlite_master = self.__con_sqlite_master
+            self.__con_sqlite_master = None
+            self.__schema_versions = None
+
+        for con in thread_cons:
+            con.close()
+
+        if con_sqlite_master is not None:
+            con_sqlite_master.close()
+
+        if self.__is_con_owner:
+            self.__con.close()
+
+    def __close_exited_thread_cons(self) -> None:
+        # the caller must hold the lock of the extractor
+        for thread, con in list(self.__thread_cons.items()):
+            if thread.is_alive():
+                continue
+
+            logger.debug(f"close the connection of an exited thread: {thread.ident}")
+            del self.__thread_cons[thread]
+            con.close()
+
+    def _cursor(self) -> sqlite3.Cursor:
+        cur = self._con.cursor(factory=RetryingCursor)
+        cur.retrier = self.__retrier
+        cur.row_factory = None
+
+        return cur
+
+    @staticmethod
+    def __validate_schema_name(schema_name: str) -> None:
+        if schema_name == ALL_SCHEMAS:
+            raise ValueError(f"a schema name required: '{ALL_SCHEMAS}' is not supported")
+
+    def __expand_schema_name(self, schema_name: str) -> list[str]:
+        if schema_name == ALL_SCHEMAS:
+            return self.fetch_schema_names()
+
+        return [schema_name]
+
+    def __setup_connection(self, con: sqlite3.Connection) -> None:
+        if self.__busy_timeout is not None:
+            con.execute("PRAGMA busy_timeout = {:d}".format(int(self.__busy_timeout * 1000)))
+
+        self.__budget.install(con)
+
+    def get_retry_stats(self) -> RetryStats:
+        """
+        :return:
+            Counts of the statements that failed with ``SQLITE_BUSY``/``SQLITE_LOCKED``,
+            the retries, the statements that failed after all of the retries,
+            and the total wait seconds of the extractor.
+        """
+
+        return self.__retrier.get_stats()
+
+    @interruptible
+    def fetch_schema_version(self, schema_name: str = DEFAULT_SCHEMA_NAME) -> int:
+        """
+        :return:
+            ``PRAGMA schema_version`` of the schema.
+            The value changes whenever the schema of the database is modified.
+        :rtype: int
+        """
+
+        self.__validate_schema_name(schema_name)
+
+        return (
+            self._cursor()
+            .execute("PRAGMA {:s}.schema_version".format(quote_identifier(schema_name)))
+            .fetchone()[0]
+        )
+
+    @contextmanager
+    def snapshot(self) -> Iterator[SchemaSnapshot]:
+        """
+        Read the schemas of the connection in a single read transaction.
+        ``PRAGMA schema_version`` of every schema is read at the beginning of the transaction,
+        so that the shared locks of the databases are acquired once for the whole block and
+        every extraction in the block reflects the same schema versions,
+        even if another connection modifies the schema concurrently.
+        ``sqlite_master`` is not queried again to check the schema versions in the block.
+        Nested blocks and blocks on a connection that already has an open transaction
+        reuse the transaction.
+        On a connection given by the caller, the transaction is a savepoint
+        that is released at the end of the block: the connection is never committed.
+        :py:meth:`fetch_database_schema` and :py:meth:`dump_ddl` run in a snapshot.
+
+        :return: The schema versions of the snapshot.
+
+        :Sample Code:
+            .. code:: python
+
+                from sqliteschema import SQLiteSchemaExtractor
+
+                extractor = SQLiteSchemaExtractor("sample.sqlite")
+                with extractor.snapshot() as snapshot:
+                    table_names = extractor.fetch_table_names()
+                    view_schemas = extractor.fetch_view_schemas()
+                    print(snapshot.schema_version)
+        """
+
+        snapshot = getattr(self.__thread_local, "snapshot", None)
+        if snapshot is not None:
+            yield snapshot
+            return
+
+        con = self._con
+        with self.__transaction_lock:
+            ref = self.__transaction_refs.get(con)
+            if ref is None:
+                if con.in_transaction:
+                    ref = [0, None]
+                elif con is self.__con and not self.__is_con_owner:
+                    ref = [0, _SNAPSHOT_SAVEPOINT]
+                    con.execute(f"SAVEPOINT {_SNAPSHOT_SAVEPOINT}")
+                else:
+                    ref = [0, "BEGIN"]
+                    con.execute("BEGIN")
+                self.__transaction_refs[con] = ref
+            ref[0] += 1
+            transaction = ref[1]
+
+        try:
+            with self.__budget.scope():
+                snapshot = SchemaSnapshot(
+                    dict(self.__fetch_schema_versions()), transaction is not None
+                )
+                logger.debug(f"take a snapshot: {snapshot}")
+                self.__thread_local.snapshot = snapshot
+                self.__update_sqlite_master_db()
+
+            yield snapshot
+        finally:
+            self.__thread_local.snapshot = None
+            with self.__transaction_lock:
+                ref[0] -= 1
+                if ref[0] == 0:
+                    del self.__transaction_refs[con]
+                    if transaction == _SNAPSHOT_SAVEPOINT and con.in_transaction:
+                        con.execute(f"RELEASE {_SNAPSHOT_SAVEPOINT}")
+                    elif transaction is not None and con.in_transaction:
+                        con.commit()
+
+    @interruptible
+    def fetch_schema_names(self) -> list[str]:
+        """
+        :return:
+            List of schema names of the connection: ``main``, ``temp``
+            and the names of the attached databases.
+        :rtype: list
+        """
+
+        cur = self._cursor()
+        result = cur.execute("SELECT name FROM pragma_database_list ORDER BY seq")
+        schema_names = [record[0] for record in result.fetchall()]
+
+        if TEMP_SCHEMA_NAME not in schema_names:
+            # the temp schema is not listed until a temporary object is created
+            schema_names.insert(1, TEMP_SCHEMA_NAME)
+
+        return schema_names
+
+    @interruptible
     def fetch_table_names(
-        self, include_system_table: bool = False, include_view: bool = False
+        self,
+        include_system_table: bool = False,
+        include_view: bool = False,
+        schema_name: str = DEFAULT_SCHEMA_NAME,
+        include_shadow_table: bool = True,
+        include_patterns: Optional[Sequence[NamePattern]] = None,
+        exclude_patterns: Optional[Sequence[NamePattern]] = None,
     ) -> list[str]:
         """
+        Args:
+            schema_name:
+                Schema name to fetch table names from.
+                Defaults to ``main``.
+                ``"*"`` fetches table names of all of the schemas, qualified with
+                the schema names except for the ``main`` schema (e.g. ``aux.table``).
+            include_shadow_table:
+                If |False|, exclude shadow tables of virtual tables
+                (e.g. ``<name>_data`` of FTS5 tables).
+            include_patterns:
+                Fetch only tables whose names match any of the patterns.
+                ``str`` patterns are case-sensitive globs (SQLite ``GLOB`` syntax,
+                e.g. ``orders_*``) and are evaluated in the query.
+                Compiled regular expressions (``re.Pattern``) are matched with ``re.search``.
+            exclude_patterns:
+                Skip tables whose names match any of the patterns.
+                Same syntax as ``include_patterns``.
+
         :return: List of table names in the database.
         :rtype: list
         """
 
-        self._con.row_factory = None
-        cur = self._con.cursor()
+        if schema_name == ALL_SCHEMAS:
+            return [
+                qualify_name(target_schema_name, table_name)
+                for target_schema_name in self.fetch_schema_names()
+                for table_name in self.fetch_table_names(
+                    include_system_table=include_system_table,
+                    include_view=include_view,
+                    schema_name=target_schema_name,
+                    include_shadow_table=include_shadow_table,
+                    include_patterns=include_patterns,
+                    exclude_patterns=exclude_patterns,
+                )
+            ]
+
+        cur = self._cursor()
 
         if include_view:
             where_query = "TYPE in ('table', 'view')"
         else:
             where_query = "TYPE='table'"
 
-        result = cur.execute(f"SELECT name FROM sqlite_master WHERE {where_query}")
+        name_filter = NameFilter(include_patterns, exclude_patterns)
+        filter_query, params = name_filter.to_sql("name")
+
+        result = cur.execute(
+            "SELECT name FROM {}.sqlite_master WHERE {}{}".format(
+                quote_identifier(schema_name), where_query, filter_query
+            ),
+            params,
+        )
         if result is None:
             return []
 
-        table_names = [record[0] for record in result.fetchall()]
+        table_names = [
+            record[0] for record in result.fetchall() if name_filter.match_unpushed(record[0])
+        ]
+
+        if not include_shadow_table:
+            shadow_table_names = self.__fetch_shadow_table_names(schema_name)
+            table_names = [table for table in table_names if table not in shadow_table_names]
 
         if include_system_table:
             return table_names
 
         return [table for table in table_names if table not in SQLITE_SYSTEM_TABLES]
 
-    @stash_row_factory
-    def fetch_view_names(self) -> list[str]:
+    @interruptible
+    def fetch_view_names(self, schema_name: str = DEFAULT_SCHEMA_NAME) -> list[str]:
         """
+        Args:
+            schema_name:
+                Schema name to fetch view names from.
+                ``"*"`` fetches view names of all of the schemas, qualified with
+                the schema names except for the ``main`` schema.
+
         :return: List of view names in the database.
         :rtype: list
         """
 
-        self._con.row_factory = None
-        cur = self._con.cursor()
+        cur = self._cursor()
+        view_names = []
 
-        result = cur.execute("SELECT name FROM sqlite_master WHERE TYPE='view'")
-        if result is None:
-            return []
+        for target_schema_name in self.__expand_schema_name(schema_name):
+            result = cur.execute(
+                "SELECT name FROM {}.sqlite_master WHERE TYPE='view'".format(
+                    quote_identifier(target_schema_name)
+                )
+            )
+            if result is None:
+                continue
+
+            view_names.extend(
+                record[0]
+                if schema_name != ALL_SCHEMAS
+                else qualify_name(target_schema_name, record[0])
+                for record in result.fetchall()
+            )
+
+        return view_names
 
-        return [record[0] for record in result.fetchall()]
+    @interruptible
+    def fetch_table_schema(
+        self,
+        table_name: str,
+        schema_name: str = DEFAULT_SCHEMA_NAME,
+        include_storage: bool = False,
+        type_profiler: Optional[TypeProfiler] = None,
+        include_stats: bool = False,
+    ) -> SQLiteTableSchema:
+        """
+        Args:
+            table_name:
+                Table or view name to extract the schema of.
+            schema_name:
+                Schema name of the table.
+            include_storage:
+                If |True|, attach storage information
+                (see :py:meth:`fetch_storage_infos`) to the table schema.
+            type_profiler:
+                If specified, attach the storage classes of sampled values
+                (see :py:meth:`fetch_type_profile`) to the table schema.
+            include_stats:
+                If |True|, attach column statistics
+                (see :py:meth:`fetch_column_stats`) to the table schema.
+        """
+
+        self.__validate_schema_name(schema_name)
+
+        storage_info = None
+        if include_storage:
+            storage_info = self.fetch_storage_infos(schema_name, table_names=[table_name]).get(
+                table_name
+            )
+
+        column_stats = None
+        if include_stats and not self.__is_view(table_name, schema_name):
+            column_stats = self.fetch_column_stats(schema_name, table_names=[table_name]).get(
+                table_name
+            )
+
+        return self.__create_table_schema(
+            table_name, schema_name, storage_info, type_profiler, column_stats
+        )
+
+    def __create_table_schema(
+        self,
+        table_name: str,
+        schema_name: str,
+        storage_info: Optional[TableStorageInfo] = None,
+        type_profiler: Optional[TypeProfiler] = None,
+        column_stats: Optional[TableStats] = None,
+    ) -> SQLiteTableSchema:
+        if self.__is_view(table_name, schema_name):
+            view_metadata = self.__fetch_view_metadata([schema_name], view_name=table_name)
+
+            return SQLiteTableSchema(
+                table_name,
+                schema_map={table_name: view_metadata.get((schema_name, table_name), [])},
+                max_workers=self.max_workers,
+                schema_name=schema_name,
+                is_view=True,
+                table_sql=self._fetch_table_schema_text(table_name, "view", schema_name),
+                schema_version=self.__get_schema_version(schema_name),
+            )
+
+        table_sql = self._fetch_table_schema_text(table_name, "table", schema_name)
 
-    def fetch_table_schema(self, table_name: str) -> SQLiteTableSchema:
         return SQLiteTableSchema(
             table_name,
-            schema_map=self.__fetch_table_metadata(table_name),
+            schema_map={
+                table_name: self._parse_table_schema_text(table_name, table_sql, schema_name)
+            },
             max_workers=self.max_workers,
+            schema_name=schema_name,
+            storage_info=storage_info,
+            type_profile=(
+                self.fetch_type_profile(table_name, schema_name, type_profiler)
+                if type_profiler is not None
+                else None
+            ),
+            column_stats=column_stats,
+            table_sql=table_sql,
+            index_sqls=self.__fetch_index_sqls(table_name, schema_name),
+            schema_version=self.__get_schema_version(schema_name),
+        )
+
+    @interruptible
+    def fetch_view_schemas(self, schema_name: str = DEFAULT_SCHEMA_NAME) -> list[SQLiteTableSchema]:
+        """
+        Extract column metadata (name, declared type and nullability) of views.
+        Columns of all of the views are resolved by a single
+        ``pragma_table_xinfo`` query.
+
+        Args:
+            schema_name:
+                Schema name to extract view schemas from.
+                ``"*"`` extracts view schemas of all of the schemas.
+
+        :return: List of view schemas. ``is_view`` of each schema is |True|.
+        :rtype: list
+        """
+
+        if schema_name == ALL_SCHEMAS:
+            schema_names = self.fetch_schema_names()
+        else:
+            schema_names = [schema_name]
+
+        return [
+            SQLiteTableSchema(
+                view_name,
+                schema_map={view_name: view_metadata},
+                max_workers=self.max_workers,
+                schema_name=view_schema_name,
+                is_view=True,
+                table_sql=self._fetch_table_schema_text(view_name, "view", view_schema_name),
+                schema_version=self.__get_schema_version(view_schema_name),
+            )
+            for (view_schema_name, view_name), view_metadata in self.__fetch_view_metadata(
+                schema_names
+            ).items()
+        ]
+
+    @interruptible
+    def fetch_table_infos(self, schema_name: str = DEFAULT_SCHEMA_NAME) -> list[SQLiteTableInfo]:
+        """
+        Classify the tables in the database: regular, virtual and shadow tables
+        with ``WITHOUT ROWID``/``STRICT`` table options.
+        The classification is built from the same ``sqlite_master`` read
+        as the table schema lookups.
+
+        Args:
+            schema_name:
+                Schema name to classify tables of. ``"*"`` for all of the schemas.
+
+        :return: List of table classifications.
+        :rtype: list
+        """
+
+        self.__update_sqlite_master_db()
+
+        return [
+            table_info
+            for table_info in self.__table_infos
+            if schema_name in (ALL_SCHEMAS, table_info.schema_name)
+        ]
+
+    @interruptible
+    def fetch_triggers(self, schema_name: str = DEFAULT_SCHEMA_NAME) -> list[SQLiteTrigger]:
+        """
+        Args:
+            schema_name:
+                Schema name to extract triggers from. ``"*"`` for all of the schemas.
+
+        :return: List of triggers in the database.
+        :rtype: list
+        """
+
+        self.__update_sqlite_master_db()
+
+        return [
+            trigger
+            for trigger in self.__triggers
+            if schema_name in (ALL_SCHEMAS, trigger.schema_name)
+        ]
+
+    @interruptible
+    def find_columns(
+        self,
+        name: Optional[str] = None,
+        type: Optional[str] = None,
+        affinity: Optional[str] = None,
+        primary_key: Optional[bool] = None,
+        unique: Optional[bool] = None,
+        indexed: Optional[bool] = None,
+        not_null: Optional[bool] = None,
+        schema_name: str = DEFAULT_SCHEMA_NAME,
+    ) -> list[ColumnRef]:
+        """
+        Find columns of the tables by name, type and key flags.
+        An inverted index of the columns of all of the tables is built with
+        a few batched ``pragma`` queries at the first call (and after the schema
+        changed), so that the following lookups are dictionary lookups.
+
+        Args:
+            name:
+                Column name to find. Compared case-insensitively.
+            type:
+                Declared type to find. Compared after normalization
+                (case-insensitive and without size parameters: ``VARCHAR`` matches
+                ``varchar(255)``).
+            affinity:
+                Type affinity to find: ``INTEGER``, ``TEXT``, ``BLOB``, ``REAL`` or ``NUMERIC``.
+            primary_key:
+                Filter columns that are (or are not) a part of the primary key.
+            unique:
+                Filter columns that are (or are not) unique by themselves.
+            indexed:
+                Filter columns that are (or are not) the leading column of an index.
+            not_null:
+                Filter columns that have (or do not have) ``NOT NULL`` constraints.
+            schema_name:
+                Schema name to find columns from. ``"*"`` for all of the schemas.
+
+        :return: Matched columns in the order of the tables and the columns.
+        :rtype: list of sqliteschema.ColumnRef
+
+        :Sample Code:
+            .. code:: python
+
+                from sqliteschema import SQLiteSchemaExtractor
+
+                extractor = SQLiteSchemaExtractor("sample.sqlite")
+                tenant_tables = [
+                    column.table_name for column in extractor.find_columns(name="tenant_id")
+                ]
+                blob_columns = extractor.find_columns(type="BLOB")
+        """
+
+        self.__update_sqlite_master_db()
+
+        if schema_name == ALL_SCHEMAS:
+            schema_names = self.fetch_schema_names()
+        else:
+            schema_names = [schema_name]
+
+        columns = []
+        for target_schema_name in schema_names:
+            with self.__lock:
+                column_index = self.__column_indexes.get(target_schema_name)
+
+            if column_index is None:
+                column_index = ColumnIndex(self.__fetch_column_refs(target_schema_name))
+                with self.__lock:
+                    self.__column_indexes[target_schema_name] = column_index
+
+            columns.extend(
+                column_index.find(
+                    name=name,
+                    type=type,
+                    affinity=affinity,
+                    primary_key=primary_key,
+                    unique=unique,
+                    indexed=indexed,
+                    not_null=not_null,
+                )
+            )
+
+        return columns
+
+    @interruptible
+    def fetch_foreign_key_graph(self, schema_name: str = DEFAULT_SCHEMA_NAME) -> ForeignKeyGraph:
+        """
+        Build a foreign key dependency graph of the tables in a schema.
+        Foreign keys of all of the tables are fetched by a single
+        ``pragma_foreign_key_list`` query.
+
+        Args:
+            schema_name:
+                Schema name to build the graph of.
+
+        :return:
+            Foreign key graph that provides a topological table order,
+            cycle detection and foreign keys without a covering index.
+        :rtype: sqliteschema.ForeignKeyGraph
+
+        :Sample Code:
+            .. code:: python
+
+                from sqliteschema import SQLiteSchemaExtractor
+
+                graph = SQLiteSchemaExtractor("sample.sqlite").fetch_foreign_key_graph()
+                load_order = graph.topological_order()
+                truncate_order = list(reversed(load_order))
+        """
+
+        self.__validate_schema_name(schema_name)
+
+        return self.__build_foreign_key_graph(schema_name)
+
+    def __build_foreign_key_graph(
+        self, schema_name: str, indexes: Optional[Sequence[SQLiteIndex]] = None
+    ) -> ForeignKeyGraph:
+        schema = quote_identifier(schema_name)
+        table_names = self.fetch_table_names(schema_name=schema_name)
+        cur = self._cursor()
+
+        foreign_key_records: dict[tuple[str, int], list] = OrderedDict()
+        for (
+            table_name,
+            fk_id,
+            referred_table_name,
+            column,
+            referred_column,
+            on_update,
+            on_delete,
+        ) in cur.execute(
+            dedent(
+                """\
+                    SELECT m.name, p.id, p."table", p."from", p."to", p.on_update, p.on_delete
+                    FROM {schema:s}.sqlite_master AS m, pragma_foreign_key_list(m.name, ?) AS p
+                    WHERE m.type = 'table'
+                    ORDER BY m.rowid, p.id, p.seq
+                    """
+            ).format(schema=schema),
+            [schema_name],
+        ).fetchall():
+            foreign_key_records.setdefault((table_name, fk_id), []).append(
+                (referred_table_name, column, referred_column, on_update, on_delete)
+            )
+
+        foreign_keys = [
+            ForeignKey(
+                table_name=table_name,
+                columns=[record[1] for record in records],
+                referred_table_name=records[0][0],
+                referred_columns=[record[2] for record in records],
+                on_update=records[0][3],
+                on_delete=records[0][4],
+            )
+            for (table_name, _fk_id), records in foreign_key_records.items()
+        ]
+
+        index_columns: dict[str, list[list[str]]] = OrderedDict()
+        for index in indexes if indexes is not None else self.fetch_indexes(schema_name):
+            lookup_columns = index.get_lookup_columns()
+            if lookup_columns:
+                index_columns.setdefault(index.table_name, []).append(lookup_columns)
+
+        # an INTEGER PRIMARY KEY column is an alias of the rowid and is not listed as an index
+        for table_name, column in cur.execute(
+            dedent(
+                """\
+                SELECT m.name, t.name
+                FROM {schema:s}.sqlite_master AS m, pragma_table_info(m.name, ?) AS t
+                WHERE m.type = 'table' AND t.pk = 1 AND upper(t.type) = 'INTEGER'
+                    AND NOT EXISTS (
+                        SELECT 1 FROM pragma_table_info(m.name, ?) AS t2 WHERE t2.pk > 1
+                    )
+                """
+            ).format(schema=schema),
+            [schema_name, schema_name],
+        ).fetchall():
+            index_columns.setdefault(table_name, []).append([column])
+
+        return ForeignKeyGraph(table_names, foreign_keys, index_columns)
+
+    @interruptible
+    def fetch_indexes(
+        self, schema_name: str = DEFAULT_SCHEMA_NAME, table_name: Optional[str] = None
+    ) -> list[SQLiteIndex]:
+        """
+        Extract the structure of the indexes of the tables: ordered key columns
+        (with collations and sort orders), uniqueness, ``WHERE`` clauses of partial indexes
+        and expressions of expression indexes. Automatic indexes of ``UNIQUE`` and
+        ``PRIMARY KEY`` constraints are included.
+        Key items of all of the indexes are fetched by a single
+        ``pragma_index_xinfo`` query.
+
+        Args:
+            schema_name:
+                Schema name to extract indexes from. ``"*"`` for all of the schemas.
+            table_name:
+                Extract only the indexes of the table if specified.
+
+        :return: List of indexes in the order of creation.
+        :rtype: list of sqliteschema.SQLiteIndex
+        """
+
+        if schema_name == ALL_SCHEMAS:
+            return [
+                index
+                for target_schema_name in self.fetch_schema_names()
+                for index in self.fetch_indexes(target_schema_name, table_name)
+            ]
+
+        schema = quote_identifier(schema_name)
+        query = dedent(
+            """\
+            SELECT m.name, il.name, il."unique", il.origin, s.sql,
+                ix.cid, ix.name, ix."desc", ix.coll
+            FROM {schema:s}.sqlite_master AS m,
+                pragma_index_list(m.name, ?) AS il,
+                pragma_index_xinfo(il.name, ?) AS ix
+            LEFT JOIN {schema:s}.sqlite_master AS s ON s.type = 'index' AND s.name = il.name
+            WHERE m.type = 'table' AND ix.key = 1 {table_filter:s}
+            ORDER BY s.rowid, ix.seqno
+            """
+        )
+        params = [schema_name, schema_name]
+        if table_name is None:
+            query = query.format(schema=schema, table_filter="")
+        else:
+            query = query.format(schema=schema, table_filter="AND m.name = ?")
+            params.append(table_name)
+
+        index_records: dict[str, list[tuple]] = OrderedDict()
+        for record in self._cursor().execute(query, params).fetchall():
+            index_records.setdefault(record[1], []).append(record)
+
+        indexes = []
+        for index_name, records in index_records.items():
+            table_name_, _, is_unique, origin, sql = records[0][:5]
+            expressions: list[str] = []
+            where = None
+            if sql:
+                expressions, where = split_index_sql(sql)
+
+            indexes.append(
+                SQLiteIndex(
+                    schema_name,
+                    index_name,
+                    table_name_,
+                    [
+                        SQLiteIndexColumn(
+                            name=column_name,
+                            # cid -2 denotes an expression
+                            expression=(
+                                expressions[seqno]
+                                if cid == -2 and seqno < len(expressions)
+                                else None
+                            ),
+                            collation=collation,
+                            is_descending=bool(is_descending),
+                        )
+                        for seqno, (*_, cid, column_name, is_descending, collation) in enumerate(
+                            records
+                        )
+                    ],
+                    is_unique=bool(is_unique),
+                    origin=origin,
+                    where=where,
+                    sql=sql,
+                )
+            )
+
+        return indexes
+
+    @interruptible
+    def analyze_indexes(self, schema_name: str = DEFAULT_SCHEMA_NAME) -> IndexAnalysis:
+        """
+        Find indexes that waste writes and disk space, and foreign keys that lack
+        an index, from the structure of the indexes without running any query on the data:
+
+        - exact duplicates of another index
+        - non-unique indexes that are left-prefixes of another index
+        - foreign keys whose columns are not the leading columns of any index
+          (see :py:meth:`~sqliteschema.ForeignKeyGraph.find_unindexed_foreign_keys`)
+
+        Args:
+            schema_name:
+                Schema name to analyze indexes of.
+
+        :return: Redundant indexes and unindexed foreign keys.
+        :rtype: sqliteschema.IndexAnalysis
+
+        :Sample Code:
+            .. code:: python
+
+                from sqliteschema import SQLiteSchemaExtractor
+
+                analysis = SQLiteSchemaExtractor("sample.sqlite").analyze_indexes()
+                for redundant_index in analysis.redundant_indexes:
+                    print(redundant_index)
+                for foreign_key in analysis.unindexed_foreign_keys:
+                    print(foreign_key)
+        """
+
+        self.__validate_schema_name(schema_name)
+
+        indexes = self.fetch_indexes(schema_name)
+
+        return IndexAnalysis(
+            find_redundant_indexes(indexes),
+            self.__build_foreign_key_graph(schema_name, indexes).find_unindexed_foreign_keys(),
         )
 
-    def fetch_database_schema(self) -> Iterator[SQLiteTableSchema]:
-        for table_name in self.fetch_table_names():
-            if table_name in self.fetch_view_names():
+    @interruptible
+    def fetch_storage_infos(
+        self,
+        schema_name: str = DEFAULT_SCHEMA_NAME,
+        use_dbstat: bool = True,
+        table_names: Optional[Sequence[str]] = None,
+    ) -> dict[str, TableStorageInfo]:
+        """
+        Get disk usage and approximate row counts of the tables without scanning the tables.
+
+        - Page counts and sizes of tables and indexes are read from the ``dbstat``
+          virtual table if the SQLite library is compiled with it.
+        - Row counts are estimated from the ``sqlite_stat1`` table (populated by ``ANALYZE``).
+          ``max(rowid)`` is used for rowid tables that have no statistics.
+
+        Args:
+            schema_name:
+                Schema name to get storage information of.
+                ``"*"`` for all of the schemas: table names of the other schemas than ``main``
+                are qualified with the schema names (e.g. ``aux.table``).
+            use_dbstat:
+                If |False|, skip reading ``dbstat``. ``dbstat`` visits every b-tree page
+                of the database.
+            table_names:
+                Table names to get storage information of. Defaults to all of the tables.
+                ``dbstat`` visits only the b-tree pages of the tables and their indexes.
+
+        :return: Mapping of table names to storage information.
+        :rtype: dict
+        """
+
+        if schema_name == ALL_SCHEMAS:
+            return OrderedDict(
+                (qualify_name(target_schema_name, table_name), storage_info)
+                for target_schema_name in self.fetch_schema_names()
+                for table_name, storage_info in self.fetch_storage_infos(
+                    target_schema_name, use_dbstat=use_dbstat, table_names=table_names
+                ).items()
+            )
+
+        schema = quote_identifier(schema_name)
+        cur = self._cursor()
+        table_infos = [
+            table_info
+            for table_info in self.fetch_table_infos(schema_name)
+            if table_info.name not in SQLITE_SYSTEM_TABLES
+            and (table_names is None or table_info.name in table_names)
+        ]
+
+        # the name constraints of dbstat and sqlite_stat1 limit the pages to visit
+        dbstat_filter = stat_filter = ""
+        dbstat_params: list[str] = []
+        stat_params: list[str] = []
+        if table_names is not None:
+            stat_params = [table_info.name for table_info in table_infos]
+            dbstat_params = [
+                record[0]
+                for record in cur.execute(
+                    "SELECT name FROM {:s}.sqlite_master "
+                    "WHERE type IN ('table', 'index') AND tbl_name IN ({:s})".format(
+                        schema, ", ".join("?" * len(stat_params))
+                    ),
+                    stat_params,
+                ).fetchall()
+            ]
+            dbstat_filter = " WHERE s.name IN ({:s})".format(", ".join("?" * len(dbstat_params)))
+            stat_filter = " WHERE tbl IN ({:s})".format(", ".join("?" * len(stat_params)))
+
+        pages: dict[str, int] = {}
+        sizes: dict[str, int] = {}
+        index_pages: dict[str, dict[str, int]] = {}
+        index_sizes: dict[str, dict[str, int]] = {}
+        has_dbstat = False
+
+        if use_dbstat:
+            for query in (
+                # aggregate mode of dbstat is available since SQLite 3.31.0
+                "SELECT m.type, m.tbl_name, m.name, s.pageno, s.pgsize "
+                "FROM dbstat(?, 1) AS s JOIN {schema:s}.sqlite_master AS m ON s.name = m.name"
+                "{filter:s}",
+                "SELECT m.type, m.tbl_name, m.name, count(*), sum(s.pgsize) "
+                "FROM dbstat(?) AS s JOIN {schema:s}.sqlite_master AS m ON s.name = m.name"
+                "{filter:s} GROUP BY m.name",
+            ):
+                try:
+                    records = cur.execute(
+                        query.format(schema=schema, filter=dbstat_filter),
+                        [schema_name] + dbstat_params,
+                    ).fetchall()
+                except sqlite3.OperationalError as e:
+                    self.__budget.check()
+                    logger.debug(f"failed to read dbstat: {e}")
+                    continue
+
+                for object_type, table_name, name, page_count, size in records:
+                    if object_type == "table":
+                        pages[table_name] = page_count
+                        sizes[table_name] = size
+                    elif object_type == "index":
+                        index_pages.setdefault(table_name, {})[name] = page_count
+                        index_sizes.setdefault(table_name, {})[name] = size
+
+                has_dbstat = True
+                break
+
+        row_estimates: dict[str, tuple[int, str]] = {}
+        try:
+            for table_name, row_estimate in cur.execute(
+                "SELECT tbl, max(CAST(stat AS INTEGER)) FROM {:s}.sqlite_stat1{:s} GROUP BY tbl".format(
+                    schema, stat_filter
+                ),
+                stat_params,
+            ).fetchall():
+                row_estimates[table_name] = (row_estimate, RowEstimateSource.SQLITE_STAT1)
+        except sqlite3.OperationalError:
+            self.__budget.check()
+            logger.debug(f"sqlite_stat1 not found in the '{schema_name}' schema")
+
+        for table_info in table_infos:
+            if table_info.name in row_estimates:
+                continue
+            if table_info.table_type == TableType.VIRTUAL or table_info.without_rowid:
                 continue
 
-            yield self.fetch_table_schema(table_name)
+            # max(rowid) is resolved by a single b-tree descent
+            max_rowid = cur.execute(
+                "SELECT max(rowid) FROM {:s}.{:s}".format(schema, quote_identifier(table_info.name))
+            ).fetchone()[0]
+            row_estimates[table_info.name] = (max_rowid or 0, RowEstimateSource.MAX_ROWID)
+
+        storage_infos: dict[str, TableStorageInfo] = OrderedDict()
+        for table_info in table_infos:
+            row_estimate, row_estimate_source = row_estimates.get(table_info.name, (None, None))
+            storage_infos[table_info.name] = TableStorageInfo(
+                table_info.name,
+                page_count=pages.get(table_info.name, 0) if has_dbstat else None,
+                size_bytes=sizes.get(table_info.name, 0) if has_dbstat else None,
+                index_page_counts=index_pages.get(table_info.name),
+                index_sizes=index_sizes.get(table_info.name),
+                row_estimate=row_estimate,
+                row_estimate_source=row_estimate_source,
+            )
 
-    def fetch_database_schema_as_dict(self) -> dict:
-        database_schema = {}
-        for table_schema in self.fetch_database_schema():
-            database_schema.update(table_schema.as_dict())
+        return storage_infos
+
+    @interruptible
+    def fetch_type_profile(
+        self,
+        table_name: str,
+        schema_name: str = DEFAULT_SCHEMA_NAME,
+        type_profiler: Optional[TypeProfiler] = None,
+    ) -> TableTypeProfile:
+        """
+        Profile the storage classes (``typeof()`` results) of the values of each column
+        by sampling rows of a table (see :py:class:`~sqliteschema.TypeProfiler`).
+        SQLite stores values of any storage class in a column regardless of
+        the declared type of the column unless the table is ``STRICT``.
+
+        Args:
+            table_name:
+                Table name to profile.
+            schema_name:
+                Schema name of the table.
+            type_profiler:
+                Profiler that determines the sample size and the time budget.
+                Defaults to a profiler with the default settings.
+
+        :return: Distribution of the storage classes of the sampled values.
+        :rtype: sqliteschema.TableTypeProfile
+        :raises sqliteschema.DataNotFoundError:
+            If the table not found in the database.
+        """
+
+        self.__validate_schema_name(schema_name)
+
+        if type_profiler is None:
+            type_profiler = TypeProfiler()
+
+        table_info = next(
+            (
+                table_info
+                for table_info in self.fetch_table_infos(schema_name)
+                if table_info.name == table_name
+            ),
+            None,
+        )
+        if table_info is None:
+            raise DataNotFoundError(f"table not found: '{table_name}'")
+
+        cur = self._cursor()
+        column_names = self.__fetch_value_column_names(cur, table_name, schema_name)
+
+        return type_profiler.profile(
+            cur,
+            schema_name,
+            table_name,
+            column_names,
+            has_rowid=table_info.table_type != TableType.VIRTUAL and not table_info.without_rowid,
+        )
+
+    @interruptible
+    def fetch_column_stats(
+        self,
+        schema_name: str = DEFAULT_SCHEMA_NAME,
+        table_names: Optional[Sequence[str]] = None,
+        stats_collector: Optional[ColumnStatsCollector] = None,
+    ) -> dict[str, TableStats]:
+        """
+        Compute statistics of the values of each column
+        (NULL fraction, minimum/maximum values, average length and approximate distinct count)
+        by streaming each table once (see :py:class:`~sqliteschema.ColumnStatsCollector`).
+        Memory usage is bounded regardless of the size of the tables.
+
+        Tables are processed in parallel with up to ``max_workers`` threads,
+        each of which reads on its own connection,
+        if the extractor is created from a database file path.
+        Tables of the other sources are processed sequentially on the connection.
+
+        Args:
+            schema_name:
+                Schema name of the tables.
+            table_names:
+                Table names to compute statistics of. Defaults to all of the tables.
+            stats_collector:
+                Collector that determines the precision of the distinct counts.
+
+        :return: Mapping of table names to column statistics.
+        :rtype: dict
+        """
+
+        self.__validate_schema_name(schema_name)
+
+        if stats_collector is None:
+            stats_collector = ColumnStatsCollector()
+        if table_names is None:
+            table_names = [
+                table_info.name
+                for table_info in self.fetch_table_infos(schema_name)
+                if table_info.name not in SQLITE_SYSTEM_TABLES
+            ]
+
+        # worker threads inherit the deadline of the call
+        call_deadline = self.__budget.call_deadline
+
+        def collect(table_name: str) -> TableStats:
+            with self.__budget.scope(call_deadline):
+                cur = self._cursor()
+                column_names = self.__fetch_value_column_names(cur, table_name, schema_name)
+
+                return stats_collector.collect(cur, schema_name, table_name, column_names)
+
+        table_stats: dict[str, TableStats] = OrderedDict()
+        try:
+            # connections of the other threads do not see attached/temp schemas
+            if (
+                self.__database_path is None
+                or schema_name != DEFAULT_SCHEMA_NAME
+                or len(table_names) <= 1
+                or self.max_workers == 1
+            ):
+                for table_name in table_names:
+                    table_stats[table_name] = collect(table_name)
+            else:
+                try:
+                    with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+                        for table_name, stats in zip(
+                            table_names, executor.map(collect, table_names)
+                        ):
+                            table_stats[table_name] = stats
+                finally:
+                    # the worker threads exited at the shutdown of the executor
+                    with self.__lock:
+                        self.__close_exited_thread_cons()
+        except ExtractionInterruptedError as e:
+            raise type(e)(*e.args, partial_result=table_stats) from e
+
+        return table_stats
+
+    @staticmethod
+    def __fetch_value_column_names(
+        cur: sqlite3.Cursor, table_name: str, schema_name: str
+    ) -> list[str]:
+        # hidden columns of virtual tables have no values
+        return [
+            record[0]
+            for record in cur.execute(
+                "SELECT name FROM pragma_table_xinfo(?, ?) WHERE hidden != 1 ORDER BY cid",
+                [table_name, schema_name],
+            ).fetchall()
+        ]
+
+    @interruptible_iterator
+    def fetch_database_schema(
+        self,
+        schema_name: str = DEFAULT_SCHEMA_NAME,
+        include_view: bool = False,
+        include_shadow_table: bool = True,
+        include_storage: bool = False,
+        include_patterns: Optional[Sequence[NamePattern]] = None,
+        exclude_patterns: Optional[Sequence[NamePattern]] = None,
+        type_profiler: Optional[TypeProfiler] = None,
+        include_stats: bool = False,
+        progress_callback: Optional[ProgressCallback] = None,
+    ) -> Iterator[SQLiteTableSchema]:
+        """
+        Args:
+            schema_name:
+                Schema name to extract table schemas from.
+                ``"*"`` extracts table schemas of all of the schemas
+                (``main``, ``temp`` and attached databases) of the connection.
+            include_view:
+                If |True|, yield view schemas after the table schemas.
+            include_shadow_table:
+                If |False|, skip shadow tables of virtual tables before parsing them.
+            include_storage:
+                If |True|, attach storage information
+                (see :py:meth:`fetch_storage_infos`) to the table schemas.
+            include_patterns:
+                Extract only tables/views whose names match any of the patterns
+                (see :py:meth:`fetch_table_names`).
+                Tables excluded by glob patterns are never fetched nor parsed.
+            exclude_patterns:
+                Skip tables/views whose names match any of the patterns.
+            type_profiler:
+                If specified, attach the storage classes of sampled values
+                (see :py:meth:`fetch_type_profile`) to the table schemas.
+            include_stats:
+                If |True|, attach column statistics
+                (see :py:meth:`fetch_column_stats`) to the table schemas.
+                Statistics of the tables of a schema are computed in parallel
+                before the first table schema of the schema is yielded.
+            progress_callback:
+                Function called with a :py:class:`~sqliteschema.ProgressInfo`
+                at most once per 0.1 seconds while tables are extracted,
+                and once at the end of the extraction.
+                The extraction finishes before the first table schema is yielded.
+                Views are not counted.
+
+        The extraction runs in a :py:meth:`snapshot`: all of the schemas are read
+        in the read transaction before the first one is yielded,
+        so that the transaction is not kept open by an iterator that is partially consumed.
+
+        :return:
+            Iterator of table schemas in the database.
+            Each table schema is tagged with the ``schema_version`` of the snapshot.
+        """
+
+        progress = None if progress_callback is None else ProgressReporter(progress_callback)
+
+        # read all of the table schemas before yielding them: the read transaction is not
+        # held by an iterator that the caller consumes partially
+        table_schemas: list[SQLiteTableSchema] = []
+        try:
+            with self.snapshot():
+                for table_schema in self.__fetch_database_schema(
+                    schema_name,
+                    include_view,
+                    include_shadow_table,
+                    include_storage,
+                    NameFilter(include_patterns, exclude_patterns),
+                    type_profiler,
+                    include_stats,
+                    progress,
+                ):
+                    table_schemas.append(table_schema)
+        except ExtractionInterruptedError as e:
+            raise type(e)(*e.args, partial_result=table_schemas) from e
+        finally:
+            if progress is not None:
+                progress.close()
+
+        yield from table_schemas
+
+    def __fetch_database_schema(
+        self,
+        schema_name: str,
+        include_view: bool,
+        include_shadow_table: bool,
+        include_storage: bool,
+        name_filter: NameFilter,
+        type_profiler: Optional[TypeProfiler],
+        include_stats: bool,
+        progress: Optional[ProgressReporter] = None,
+        fetched_storage_infos: Optional[Mapping[str, TableStorageInfo]] = None,
+    ) -> Iterator[SQLiteTableSchema]:
+        schema_table_names = self.__fetch_schema_table_names(schema_name, name_filter)
+        if not include_shadow_table:
+            shadow_tables = {
+                (table_info.schema_name, table_info.name)
+                for table_info in self.fetch_table_infos(schema_name)
+                if table_info.is_shadow
+            }
+            schema_table_names = [
+                schema_table_name
+                for schema_table_name in schema_table_names
+                if schema_table_name not in shadow_tables
+            ]
+
+        if progress is not None:
+            progress.set_total(len(schema_table_names))
+
+        storage_infos: dict[str, dict[str, TableStorageInfo]] = {}
+        table_stats: dict[str, dict[str, TableStats]] = {}
+        for table_schema_name, table_name in schema_table_names:
+            self.__budget.check()
+            if progress is not None:
+                progress.begin(table_schema_name, table_name)
+
+            storage_info = None
+            if fetched_storage_infos is not None:
+                storage_info = fetched_storage_infos.get(
+                    qualify_name(table_schema_name, table_name)
+                    if schema_name == ALL_SCHEMAS
+                    else table_name
+                )
+            elif include_storage:
+                if table_schema_name not in storage_infos:
+                    storage_infos[table_schema_name] = self.fetch_storage_infos(table_schema_name)
+                storage_info = storage_infos[table_schema_name].get(table_name)
+
+            column_stats = None
+            if include_stats:
+                if table_schema_name not in table_stats:
+                    table_stats[table_schema_name] = self.fetch_column_stats(
+                        table_schema_name,
+                        table_names=[
+                            name
+                            for schema, name in schema_table_names
+                            if schema == table_schema_name
+                        ],
+                    )
+                column_stats = table_stats[table_schema_name].get(table_name)
+
+            yield self.__create_table_schema(
+                table_name, table_schema_name, storage_info, type_profiler, column_stats
+            )
+
+            if progress is not None:
+                progress.end()
+
+        if include_view:
+            for view_schema in self.fetch_view_schemas(schema_name):
+                if name_filter.match(view_schema.table_name):
+                    yield view_schema
+
+    @interruptible_iterator
+    def dump_ddl(self, schema_name: str = DEFAULT_SCHEMA_NAME) -> Iterator[str]:
+        """
+        Regenerate the DDL statements of a schema in the canonical form
+        (see :py:meth:`SQLiteTableSchema.to_ddl`).
+        Tables are yielded in the foreign key dependency order, each followed by its indexes,
+        then views and triggers as defined.
+        Executing the statements on an empty database clones the schema without the data.
+        Shadow tables of virtual tables and SQLite system tables are skipped since
+        they are created by SQLite.
+
+        Args:
+            schema_name:
+                Schema name to dump the DDL of.
+
+        :return: Iterator of the statements.
+
+        :Sample Code:
+            .. code:: python
+
+                import sqlite3
+                from sqliteschema import SQLiteSchemaExtractor
+
+                replica = sqlite3.connect(":memory:")
+                replica.executescript("\\n".join(SQLiteSchemaExtractor("sample.sqlite").dump_ddl()))
+        """
+
+        self.__validate_schema_name(schema_name)
+
+        with self.snapshot():
+            table_infos = OrderedDict(
+                (table_info.name, table_info)
+                for table_info in self.fetch_table_infos(schema_name)
+                if not table_info.is_shadow and table_info.name not in SQLITE_SYSTEM_TABLES
+            )
+
+            try:
+                table_names = self.fetch_foreign_key_graph(schema_name).topological_order()
+            except ForeignKeyCycleError as e:
+                # SQLite does not require referred tables to exist when creating tables
+                logger.debug(f"dump tables in the order of sqlite_master: {e}")
+                table_names = list(table_infos)
+
+            for table_name in table_names:
+                if table_name not in table_infos:
+                    continue
+
+                self.__budget.check()
+
+                yield normalize_create_table(
+                    table_name, self._fetch_table_schema_text(table_name, "table", schema_name)
+                )
+
+                for index_sql in self.__fetch_index_sqls(table_name, schema_name):
+                    yield normalize_statement(index_sql)
+
+            for record in self.fetch_sqlite_master(schema_name):
+                if record["type"] in ("view", "trigger") and record["sql"]:
+                    yield to_verbatim_statement(record["sql"])
+
+    @interruptible
+    def fetch_database_schema_as_dict(
+        self,
+        schema_name: str = DEFAULT_SCHEMA_NAME,
+        include_patterns: Optional[Sequence[NamePattern]] = None,
+        exclude_patterns: Optional[Sequence[NamePattern]] = None,
+    ) -> dict:
+        database_schema: dict = {}
+        try:
+            for table_schema in self.fetch_database_schema(
+                schema_name, include_patterns=include_patterns, exclude_patterns=exclude_patterns
+            ):
+                if schema_name == ALL_SCHEMAS:
+                    database_schema[table_schema.qualified_name] = table_schema.as_dict()[
+                        table_schema.table_name
+                    ]
+                else:
+                    database_schema.update(table_schema.as_dict())
+        except ExtractionInterruptedError as e:
+            raise type(e)(*e.args, partial_result=database_schema) from e
 
         return database_schema
 
-    @stash_row_factory
-    def fetch_sqlite_master(self) -> list[dict]:
+    @interruptible
+    def fetch_sqlite_master(self, schema_name: Optional[str] = None) -> list[dict]:
         """
         Get sqlite_master table information as a list of dictionaries.
 
+        Args:
+            schema_name:
+                Schema name to read ``<schema_name>.sqlite_master`` from.
+                ``"*"`` reads ``sqlite_master`` tables of all of the schemas
+                with a single query.
+                Records include a ``schema_name`` key if the argument is specified.
+                Defaults to ``main``.
+
         :return: sqlite_master table information.
         :rtype: list
 
@@ -199,38 +1625,131 @@ class SQLiteSchemaExtractor:
         """
 
         sqlite_master_record_list = []
-        cur = self._con.cursor()
-        result = cur.execute(
-            "SELECT {:s} FROM sqlite_master".format(", ".join(self._SQLITE_MASTER_ATTR_NAME_LIST))
-        )
+        cur = self._cursor()
+
+        if schema_name is None:
+            attr_names = self._SQLITE_MASTER_ATTR_NAME_LIST
+            result = cur.execute("SELECT {:s} FROM sqlite_master".format(", ".join(attr_names)))
+        else:
+            if schema_name == ALL_SCHEMAS:
+                schema_names = self.fetch_schema_names()
+            else:
+                schema_names = [schema_name]
+
+            attr_names = ["schema_name"] + self._SQLITE_MASTER_ATTR_NAME_LIST
+            result = cur.execute(
+                " UNION ALL ".join(
+                    [
+                        "SELECT * FROM (SELECT ?, {:s} FROM {:s}.sqlite_master)".format(
+                            ", ".join(self._SQLITE_MASTER_ATTR_NAME_LIST),
+                            quote_identifier(name),
+                        )
+                        for name in schema_names
+                    ]
+                ),
+                schema_names,
+            )
 
         for record in result.fetchall():
             sqlite_master_record_list.append(
-                {
-                    attr_name: item
-                    for attr_name, item in zip(self._SQLITE_MASTER_ATTR_NAME_LIST, record)
-                }
+                {attr_name: item for attr_name, item in zip(attr_names, record)}
             )
 
         return sqlite_master_record_list
 
+    @interruptible
     def dumps(
         self,
         output_format: Optional[str] = None,
         verbosity_level: int = MAX_VERBOSITY_LEVEL,
+        schema_name: str = DEFAULT_SCHEMA_NAME,
+        include_storage: bool = False,
+        include_patterns: Optional[Sequence[NamePattern]] = None,
+        exclude_patterns: Optional[Sequence[NamePattern]] = None,
+        type_profiler: Optional[TypeProfiler] = None,
+        include_stats: bool = False,
+        progress_callback: Optional[ProgressCallback] = None,
+        storage_infos: Optional[Mapping[str, TableStorageInfo]] = None,
         **kwargs: Any,
     ) -> str:
+        """
+        Dump the table schemas of a schema as text.
+
+        Args:
+            progress_callback:
+                Function called with a :py:class:`~sqliteschema.ProgressInfo`
+                at most once per 0.1 seconds while tables are extracted and rendered,
+                and once at the end of the dump.
+            storage_infos:
+                Storage information returned by :py:meth:`fetch_storage_infos`
+                to attach to the table schemas instead of reading it again.
+
+        The other arguments are the same as :py:meth:`fetch_database_schema`
+        and :py:meth:`SQLiteTableSchema.dumps`.
+        """
+
         dump_list = []
+        progress = None if progress_callback is None else ProgressReporter(progress_callback)
 
-        for table_schema in self.fetch_database_schema():
-            dump_list.append(
-                table_schema.dumps(
-                    output_format=output_format, verbosity_level=verbosity_level, **kwargs
-                )
-            )
+        try:
+            with self.snapshot():
+                for table_schema in self.__fetch_database_schema(
+                    schema_name,
+                    False,
+                    True,
+                    include_storage,
+                    NameFilter(include_patterns, exclude_patterns),
+                    type_profiler,
+                    include_stats,
+                    progress,
+                    storage_infos,
+                ):
+                    dump = table_schema.dumps(
+                        output_format=output_format, verbosity_level=verbosity_level, **kwargs
+                    )
+                    dump_list.append(dump)
+                    if progress is not None:
+                        progress.add_bytes(len(dump))
+        except ExtractionInterruptedError as e:
+            raise type(e)(*e.args, partial_result="\n".join(dump_list)) from e
+        finally:
+            if progress is not None:
+                progress.close()
 
         return "\n".join(dump_list)
 
+    @interruptible
+    def dumps_storage(
+        self,
+        output_format: Optional[str] = None,
+        schema_name: str = DEFAULT_SCHEMA_NAME,
+        storage_infos: Optional[Mapping[str, TableStorageInfo]] = None,
+        **kwargs: Any,
+    ) -> str:
+        """
+        Dump storage information of the tables
+        (see :py:meth:`fetch_storage_infos`) as a table.
+
+        Args:
+            storage_infos:
+                Storage information returned by :py:meth:`fetch_storage_infos`
+                to dump instead of reading it again.
+        """
+
+        import pytablewriter as ptw
+
+        if not output_format:
+            output_format = ptw.TableFormat.RST_GRID_TABLE.names[0]
+
+        if "margin" not in kwargs:
+            kwargs["margin"] = 1
+        writer = ptw.TableWriterFactory.create_from_format_name(output_format, **kwargs)
+        if storage_infos is None:
+            storage_infos = self.fetch_storage_infos(schema_name)
+        writer.from_tabledata(storage_infos_as_tabledata(storage_infos, self.max_workers))
+
+        return writer.dumps()
+
     def _extract_attr_name(self, schema: str) -> str:
         _RE_SINGLE_QUOTES = re.compile("^'.+?'")
         _RE_DOUBLE_QUOTES = re.compile('^".+?"')
@@ -277,33 +1796,106 @@ class SQLiteSchemaExtractor:
 
         return " ".join(schema_wo_name.split()[1:])
 
-    @stash_row_factory
-    def _fetch_table_schema_text(self, table_name: str, schema_type: str) -> list[str]:
+    def _fetch_table_schema_text(
+        self, table_name: str, schema_type: str, schema_name: str = DEFAULT_SCHEMA_NAME
+    ) -> str:
         if table_name in SQLITE_SYSTEM_TABLES:
             logger.debug(f"skip fetching sqlite system table: {table_name:s}")
-            return []
+            return ""
 
         self.__update_sqlite_master_db()
 
         result = self.__execute_sqlite_master(
-            "SELECT {:s} FROM {:s} WHERE {:s} AND {:s}".format(
-                "sql",
-                self._SQLITE_MASTER_TABLE_NAME,
-                "{:s} = '{:s}'".format("tbl_name", table_name),
-                "{:s} = '{:s}'".format("type", schema_type),
-            ),
-            self.global_debug_query,
+            self.__LOOKUP_QUERY, self.global_debug_query, (schema_name, table_name, schema_type)
         )
 
         try:
-            return result.fetchone()[0]
-        except TypeError:
+            return result[0][0]
+        except IndexError:
             raise DataNotFoundError(f"data not found in '{self._SQLITE_MASTER_TABLE_NAME}' table")
 
-        raise RuntimeError("failed to fetch table schema")
+    @classmethod
+    def set_ddl_cache_size(cls, maxsize: int) -> None:
+        """
+        Set the maximum number of parsed ``CREATE TABLE`` statements held by
+        the process-wide cache. ``0`` disables the cache.
+        The cache is shared among all of the extractors: tables that have the same
+        DDL and index DDLs (e.g. shards of a database) are parsed only once.
+        """
+
+        _ddl_cache.resize(maxsize)
+
+    @classmethod
+    def clear_ddl_cache(cls) -> None:
+        _ddl_cache.clear()
 
-    def _parse_table_schema_text(self, table_name: str, table_schema_text: str) -> list[dict]:
-        index_query_list = self._fetch_index_schema(table_name)
+    @classmethod
+    def get_ddl_cache_info(cls) -> CacheInfo:
+        """
+        :return: Hits, misses, max size and current size of the DDL cache.
+        """
+
+        return _ddl_cache.info()
+
+    @interruptible
+    def refresh(self) -> SchemaChanges:
+        """
+        Update the ``sqlite_master`` snapshot of the extractor if the schema of
+        the database changed.
+        Parsed results of the tables are kept for tables whose DDL and index DDLs
+        are not changed, so that only the changed tables are parsed again.
+
+        :return:
+            Tables that were added, dropped or modified since the previous call.
+            All of the tables are reported as added at the first call.
+        """
+
+        self.__update_sqlite_master_db()
+
+        with self.__lock:
+            changes = SchemaChanges.from_digests(
+                self.__refreshed_table_digests, self.__table_digests
+            )
+            self.__refreshed_table_digests = self.__table_digests
+
+        return changes
+
+    def _parse_table_schema_text(
+        self, table_name: str, table_schema_text: str, schema_name: str = DEFAULT_SCHEMA_NAME
+    ) -> list[dict]:
+        key = (schema_name, table_name)
+        with self.__lock:
+            digest = self.__table_digests.get(key)
+            parsed_table = self.__parsed_tables.get(key)
+
+        if (
+            digest is not None
+            and parsed_table is not None
+            and parsed_table[:2] == (digest, table_schema_text)
+        ):
+            return [OrderedDict(items) for items in parsed_table[2]]
+
+        index_query_list = self._fetch_index_schema(table_name, schema_name)
+
+        # parsed results depend only on the statements (and the parser class)
+        cache_key = (type(self), table_schema_text, frozenset(index_query_list))
+        cached_metadata = _ddl_cache.get(cache_key)
+        if cached_metadata is None:
+            cached_metadata = tuple(
+                tuple(values.items())
+                for values in self.__parse_table_schema_text(table_schema_text, index_query_list)
+            )
+            _ddl_cache.put(cache_key, cached_metadata)
+
+        if digest is not None:
+            with self.__lock:
+                self.__parsed_tables[key] = (digest, table_schema_text, cached_metadata)
+
+        return [OrderedDict(items) for items in cached_metadata]
+
+    def __parse_table_schema_text(
+        self, table_schema_text: str, index_query_list: list[str]
+    ) -> list[dict]:
         table_metadata: list[dict] = []
 
         table_attr_text = table_schema_text.split("(", maxsplit=1)[1].rsplit(")", maxsplit=1)[0]
@@ -362,35 +1954,210 @@ class SQLiteSchemaExtractor:
 
         return table_metadata
 
-    def _fetch_index_schema(self, table_name: str) -> list[str]:
+    def _fetch_index_schema(
+        self, table_name: str, schema_name: str = DEFAULT_SCHEMA_NAME
+    ) -> list[str]:
+        return self.__fetch_index_sqls(table_name, schema_name)
+
+    def __fetch_index_sqls(self, table_name: str, schema_name: str) -> list[str]:
         self.__update_sqlite_master_db()
 
         result = self.__execute_sqlite_master(
-            "SELECT {:s} FROM {:s} WHERE {:s} AND {:s}".format(
-                "sql",
-                self._SQLITE_MASTER_TABLE_NAME,
-                "{:s} = '{:s}'".format("tbl_name", table_name),
-                "{:s} = '{:s}'".format("type", "index"),
-            ),
-            self.global_debug_query,
+            self.__LOOKUP_QUERY, self.global_debug_query, (schema_name, table_name, "index")
+        )
+
+        return [record[0] for record in result if typepy.is_not_empty_sequence(record[0])]
+
+    def __is_view(self, table_name: str, schema_name: str) -> bool:
+        self.__update_sqlite_master_db()
+
+        return bool(
+            self.__execute_sqlite_master(
+                self.__LOOKUP_QUERY, self.global_debug_query, (schema_name, table_name, "view")
+            )
         )
 
+    def __fetch_schema_table_names(
+        self, schema_name: str, name_filter: Optional[NameFilter] = None
+    ) -> list[tuple[str, str]]:
+        self.__update_sqlite_master_db()
+
+        if name_filter is None:
+            name_filter = NameFilter()
+
+        query = "SELECT schema_name, name FROM {:s} WHERE type = 'table'".format(
+            self._SQLITE_MASTER_TABLE_NAME
+        )
+        params: list[str] = []
+        if schema_name != ALL_SCHEMAS:
+            query += " AND schema_name = ?"
+            params.append(schema_name)
+
+        # tbl_name equals to name for tables: filter with tbl_name to use the index of the snapshot
+        filter_query, filter_params = name_filter.to_sql("tbl_name")
+        query += filter_query
+        params.extend(filter_params)
+        # keep the order of sqlite_master regardless of the query plan
+        query += " ORDER BY rowid"
+
+        result = self.__execute_sqlite_master(query, self.global_debug_query, params)
+
+        return [
+            (record[0], record[1])
+            for record in result
+            if record[1] not in SQLITE_SYSTEM_TABLES and name_filter.match_unpushed(record[1])
+        ]
+
+    def __fetch_shadow_table_names(self, schema_name: str) -> set[str]:
+        return {
+            table_info.name
+            for table_info in self.fetch_table_infos(schema_name)
+            if table_info.is_shadow
+        }
+
+    def __fetch_column_refs(
+        self, schema_name: str, table_name: Optional[str] = None
+    ) -> list[ColumnRef]:
+        schema = quote_identifier(schema_name)
+        where_query = "AND m.name = ?" if table_name else ""
+        table_params = [table_name] if table_name else []
+        cur = self._cursor()
+
         try:
-            return [
-                record[0] for record in result.fetchall() if typepy.is_not_empty_sequence(record[0])
-            ]
-        except TypeError:
-            raise DataNotFoundError(f"index not found in '{table_name}'")
+            column_records = cur.execute(
+                dedent(
+                    """\
+                    SELECT m.name, p.name, p.type, p."notnull", p.pk
+                    FROM {schema:s}.sqlite_master AS m, pragma_table_xinfo(m.name, ?) AS p
+                    WHERE m.type = 'table' AND p.hidden != 1 {where:s}
+                    ORDER BY m.rowid, p.cid
+                    """
+                ).format(schema=schema, where=where_query),
+                [schema_name] + table_params,
+            ).fetchall()
+            index_records = cur.execute(
+                dedent(
+                    """\
+                    SELECT m.name, il.name, il."unique", il.partial, ii.seqno, ii.name
+                    FROM {schema:s}.sqlite_master AS m,
+                        pragma_index_list(m.name, ?) AS il,
+                        pragma_index_info(il.name, ?) AS ii
+                    WHERE m.type = 'table' {where:s}
+                    """
+                ).format(schema=schema, where=where_query),
+                [schema_name, schema_name] + table_params,
+            ).fetchall()
+        except sqlite3.OperationalError as e:
+            self.__budget.check()
+            if table_name:
+                logger.debug(f"failed to fetch columns: table={table_name}, error={e}")
+                return []
+
+            # a virtual table of an unavailable module makes the whole batch fail:
+            # fall back to fetching table by table to skip only such tables
+            column_refs = []
+            for name in self.fetch_table_names(schema_name=schema_name):
+                column_refs.extend(self.__fetch_column_refs(schema_name, table_name=name))
+
+            return column_refs
+
+        indexed_columns: set[tuple[str, str]] = set()
+        unique_columns: set[tuple[str, str]] = set()
+        index_column_counts: dict[tuple[str, str], int] = {}
+        for table, index_name, _unique, _partial, _seqno, _column in index_records:
+            index_column_counts[(table, index_name)] = (
+                index_column_counts.get((table, index_name), 0) + 1
+            )
+        for table, index_name, is_unique, is_partial, seqno, column in index_records:
+            if seqno != 0 or column is None:
+                continue
+
+            indexed_columns.add((table, column))
+            if is_unique and not is_partial and index_column_counts[(table, index_name)] == 1:
+                unique_columns.add((table, column))
+
+        pk_counts: dict[str, int] = {}
+        for table, _column, _type, _notnull, pk in column_records:
+            if pk:
+                pk_counts[table] = pk_counts.get(table, 0) + 1
+
+        column_refs = []
+        for table, column, data_type, notnull, pk in column_records:
+            if table in SQLITE_SYSTEM_TABLES:
+                continue
+
+            is_single_pk = pk > 0 and pk_counts[table] == 1
+            # an INTEGER PRIMARY KEY column is an alias of the rowid and is not listed as an index
+            is_rowid_alias = is_single_pk and (data_type or "").upper() == "INTEGER"
+            column_refs.append(
+                ColumnRef(
+                    schema_name=schema_name,
+                    table_name=table,
+                    column_name=column,
+                    data_type=data_type if data_type else None,
+                    not_null=bool(notnull),
+                    primary_key=pk > 0,
+                    unique=is_single_pk or (table, column) in unique_columns,
+                    indexed=is_rowid_alias or (table, column) in indexed_columns,
+                )
+            )
 
-    def __fetch_table_metadata(self, table_name: str) -> Mapping[str, list[Mapping[str, Any]]]:
-        metadata: dict[str, list] = OrderedDict()
+        return column_refs
+
+    def __fetch_view_metadata(
+        self, schema_names: list[str], view_name: Optional[str] = None
+    ) -> dict[tuple[str, str], list[dict]]:
+        query_template = dedent(
+            """\
+            SELECT ?, m.name, p.name, p.type, p."notnull", p.dflt_value
+            FROM {schema:s}.sqlite_master AS m,
+                pragma_table_xinfo(m.name, ?) AS p
+            WHERE m.type = 'view' {where:s}
+            """
+        )
+        where_query = "AND m.name = ?" if view_name else ""
+        queries = []
+        params: list[Any] = []
+        for schema_name in schema_names:
+            queries.append(
+                query_template.format(schema=quote_identifier(schema_name), where=where_query)
+            )
+            params.extend([schema_name, schema_name])
+            if view_name:
+                params.append(view_name)
 
-        if table_name in self.fetch_view_names():
-            # can not extract metadata from views
-            return {}
+        metadata: dict[tuple[str, str], list[dict]] = OrderedDict()
+        cur = self._cursor()
+        try:
+            records = cur.execute(" UNION ALL ".join(queries), params).fetchall()
+        except sqlite3.OperationalError as e:
+            self.__budget.check()
+            if view_name:
+                logger.debug(f"failed to extract view metadata: view={view_name}, error={e}")
+                return {}
+
+            # a view that refers missing tables makes the whole batch fail:
+            # fall back to extracting view by view to skip only the broken views
+            for schema_name in schema_names:
+                for name in self.fetch_view_names(schema_name):
+                    metadata.update(self.__fetch_view_metadata([schema_name], view_name=name))
+
+            return metadata
+
+        for schema_name, name, attr_name, attr_type, notnull, default_value in records:
+            values: dict[str, Any] = OrderedDict()
+            values[SchemaHeader.ATTR_NAME] = attr_name
+            values[SchemaHeader.INDEX] = False
+            values[SchemaHeader.DATA_TYPE] = attr_type if attr_type else None
+            values[SchemaHeader.NULLABLE] = "NO" if notnull else "YES"
+            values[SchemaHeader.KEY] = ""
+            if default_value is not None:
+                values[SchemaHeader.DEFAULT] = default_value
+            else:
+                values[SchemaHeader.DEFAULT] = "" if notnull else "NULL"
+            values[SchemaHeader.EXTRA] = ""
 
-        table_schema_text = self._fetch_table_schema_text(table_name, "table")
-        metadata[table_name] = self._parse_table_schema_text(table_name, table_schema_text)
+            metadata.setdefault((schema_name, name), []).append(values)
 
         return metadata
 
@@ -422,45 +2189,69 @@ class SQLiteSchemaExtractor:
 
         return extra_list
 
-    def __execute_sqlite_master(self, query: str, is_logging: bool = True) -> sqlite3.Cursor:
+    def __execute_sqlite_master(
+        self, query: str, is_logging: bool = True, params: Sequence[Any] = ()
+    ) -> list[tuple]:
         if is_logging:
-            logger.debug(query)
+            logger.debug(f"{query} {tuple(params)}" if params else query)
+
+        with self.__lock:
+            assert self.__con_sqlite_master is not None
 
-        assert self.__con_sqlite_master is not None
+            return self.__con_sqlite_master.execute(query, params).fetchall()
 
-        return self.__con_sqlite_master.execute(query)
+    def __fetch_schema_versions(self) -> tuple[tuple[str, int], ...]:
+        return tuple(
+            (schema_name, self.fetch_schema_version(schema_name))
+            for schema_name in self.fetch_schema_names()
+        )
+
+    def __get_schema_version(self, schema_name: str) -> Optional[int]:
+        snapshot: Optional[SchemaSnapshot] = getattr(self.__thread_local, "snapshot", None)
+        if snapshot is not None:
+            return snapshot.get_schema_version(schema_name)
+
+        with self.__lock:
+            return dict(self.__schema_versions or ()).get(schema_name)
 
     def __update_sqlite_master_db(self) -> None:
-        try:
-            if self.__total_changes == self._con.total_changes:
-                """
-                logger.debug(
-                    "skipping the {} table update. updates not found after the last update.".format(
-                        self._SQLITE_MASTER_TABLE_NAME
-                    )
-                )
-                """
+        snapshot: Optional[SchemaSnapshot] = getattr(self.__thread_local, "snapshot", None)
+        if snapshot is not None:
+            # the schemas can not be changed by other connections in the read transaction
+            schema_versions = tuple(snapshot.schema_versions.items())
+        else:
+            schema_versions = self.__fetch_schema_versions()
+
+        with self.__lock:
+            if self.__schema_versions == schema_versions:
                 return
-        except AttributeError:
-            pass
 
+            self.__build_sqlite_master_db()
+            self.__schema_versions = schema_versions
+
+    def __build_sqlite_master_db(self) -> None:
         if self.__con_sqlite_master:
             self.__con_sqlite_master.close()
 
-        self.__con_sqlite_master = sqlite3.connect(":memory:")
-        sqlite_master = self.fetch_sqlite_master()
-
-        if typepy.is_empty_sequence(sqlite_master):
-            return
-
-        sqlite_master_records = [
-            [record[attr] for attr in self._SQLITE_MASTER_ATTR_NAME_LIST]
-            for record in sqlite_master
-        ]
+        # the snapshot is accessed from multiple threads under the lock
+        self.__con_sqlite_master = sqlite3.connect(":memory:", check_same_thread=False)
+        sqlite_master = self.fetch_sqlite_master(ALL_SCHEMAS)
+        self.__table_infos, self.__triggers = classify_sqlite_master(sqlite_master)
+
+        table_digests = calc_table_digests(sqlite_master)
+        # keep the parsed results only of the tables that are not changed
+        self.__parsed_tables = {
+            key: parsed_table
+            for key, parsed_table in self.__parsed_tables.items()
+            if table_digests.get(key) == parsed_table[0]
+        }
+        self.__table_digests = table_digests
+        self.__column_indexes = {}
         self.__execute_sqlite_master(
             dedent(
                 """\
                 CREATE TABLE {:s} (
+                    schema_name TEXT NOT NULL,
                     tbl_name TEXT NOT NULL,
                     sql TEXT,
                     type TEXT NOT NULL,
@@ -471,8 +2262,11 @@ class SQLiteSchemaExtractor:
             ).format(self._SQLITE_MASTER_TABLE_NAME),
             False,
         )
+
+        attr_names = ["schema_name"] + self._SQLITE_MASTER_ATTR_NAME_LIST
+        sqlite_master_records = [[record[attr] for attr in attr_names] for record in sqlite_master]
         self.__con_sqlite_master.executemany(
-            f"INSERT INTO {self._SQLITE_MASTER_TABLE_NAME:s} VALUES (?,?,?,?,?)",
+            f"INSERT INTO {self._SQLITE_MASTER_TABLE_NAME:s} VALUES (?,?,?,?,?,?)",
             sqlite_master_records,
         )
 
@@ -483,6 +2277,9 @@ class SQLiteSchemaExtractor:
                 )
             )
 
+        self.__con_sqlite_master.execute(
+            "CREATE INDEX {0:s}_lookup ON {0:s} (schema_name, tbl_name, type)".format(
+                self._SQLITE_MASTER_TABLE_NAME
+            )
+        )
         self.__con_sqlite_master.commit()
-
-        self.__total_changes = self._con.total_changes
@@ -0,0 +1,307 @@
+"""
+.. codeauthor:: Tsuyoshi Hombashi <tsuyoshi.hombashi@gmail.com>
+"""
+
+import mmap
+import os
+import struct
+from collections.abc import Iterator
+from types import TracebackType
+from typing import Any, Final, Optional, Union
+
+from ._error import DatabaseFileFormatError
+from ._logger import logger
+
+
+# https://www.sqlite.org/fileformat2.html
+_HEADER_MAGIC: Final = b"SQLite format 3\x00"
+_HEADER_SIZE: Final = 100
+_PAGE_TYPE_TABLE_INTERIOR: Final = 0x05
+_PAGE_TYPE_TABLE_LEAF: Final = 0x0D
+_TEXT_ENCODINGS: Final = {1: "utf-8", 2: "utf-16-le", 3: "utf-16-be"}
+
+# column order of the records in the sqlite_master table
+_SQLITE_MASTER_COLUMNS: Final = ("type", "name", "tbl_name", "rootpage", "sql")
+
+
+def _read_varint(buf: Union[bytes, mmap.mmap], offset: int) -> tuple[int, int]:
+    value = 0
+    for i in range(8):
+        byte = buf[offset + i]
+        value = (value << 7) | (byte & 0x7F)
+        if byte < 0x80:
+            return (value, offset + i + 1)
+
+    return ((value << 8) | buf[offset + 8], offset + 9)
+
+
+class SQLiteFileReader:
+    """
+    A reader of the ``sqlite_master`` table that parses a SQLite database file
+    directly, without the SQLite library.
+    The file is memory-mapped and only the pages of the schema b-tree
+    (rooted at page 1) and their overflow pages are read.
+    So the reader does not require any SQLite lock and works with files that
+    ``sqlite3.connect`` rejects as far as the schema pages are intact.
+
+    .. note::
+
+        Changes that exist only in a write-ahead log (``-wal`` file) and have not
+        been checkpointed yet are not visible to the reader.
+
+    Args:
+        database_path:
+            Path to a SQLite database file.
+
+    :Sample Code:
+        .. code:: python
+
+            from sqliteschema import SQLiteFileReader
+
+            with SQLiteFileReader("sample.sqlite") as reader:
+                print(reader.fetch_sqlite_master())
+    """
+
+    @property
+    def page_size(self) -> int:
+        return self.__page_size
+
+    @property
+    def page_count(self) -> int:
+        return self.__page_count
+
+    @property
+    def schema_version(self) -> int:
+        """
+        The schema cookie of the database file (same as ``PRAGMA schema_version``).
+        """
+
+        return self.__schema_version
+
+    @property
+    def text_encoding(self) -> str:
+        return self.__text_encoding
+
+    def __init__(self, database_path: str) -> None:
+        if not os.path.isfile(database_path):
+            raise OSError(f"file not found: {database_path}")
+
+        self.__file = open(database_path, "rb")
+        self.__buf: Optional[mmap.mmap] = None
+        self.__page_size = 0
+        self.__usable_size = 0
+        self.__page_count = 0
+        self.__schema_version = 0
+        self.__text_encoding = _TEXT_ENCODINGS[1]
+
+        try:
+            if os.fstat(self.__file.fileno()).st_size == 0:
+                # SQLite treats an empty file as an empty database
+                return
+
+            self.__buf = mmap.mmap(self.__file.fileno(), 0, access=mmap.ACCESS_READ)
+            self.__parse_header()
+        except Exception:
+            self.close()
+            raise
+
+    def __enter__(self) -> "SQLiteFileReader":
+        return self
+
+    def __exit__(
+        self,
+        exc_type: Optional[type[BaseException]],
+        exc_value: Optional[BaseException],
+        traceback: Optional[TracebackType],
+    ) -> None:
+        self.close()
+
+    def close(self) -> None:
+        if self.__buf is not None:
+            self.__buf.close()
+            self.__buf = None
+
+        self.__file.close()
+
+    def fetch_sqlite_master(self) -> list[dict[str, Any]]:
+        """
+        Get sqlite_master table information as a list of dictionaries.
+        Records have the same format as
+        :py:meth:`~sqliteschema.SQLiteSchemaExtractor.fetch_sqlite_master`.
+
+        :return: sqlite_master table information.
+        :rtype: list
+        """
+
+        if self.__buf is None:
+            return []
+
+        records = []
+        for payload in self.__iter_table_payloads(1):
+            values = self.__parse_record(payload)
+            values += [None] * (len(_SQLITE_MASTER_COLUMNS) - len(values))
+            record = dict(zip(_SQLITE_MASTER_COLUMNS, values))
+            records.append(
+                {
+                    "tbl_name": record["tbl_name"],
+                    "sql": record["sql"],
+                    "type": record["type"],
+                    "name": record["name"],
+                    "rootpage": record["rootpage"],
+                }
+            )
+
+        return records
+
+    def __parse_header(self) -> None:
+        assert self.__buf is not None
+
+        if len(self.__buf) < _HEADER_SIZE or self.__buf[:16] != _HEADER_MAGIC:
+            raise DatabaseFileFormatError("not a SQLite database file")
+
+        page_size = struct.unpack_from(">H", self.__buf, 16)[0]
+        if page_size == 1:
+            page_size = 65536
+        if page_size < 512 or page_size & (page_size - 1):
+            raise DatabaseFileFormatError(f"invalid page size: {page_size}")
+
+        self.__page_size = page_size
+        self.__usable_size = page_size - self.__buf[20]
+        self.__schema_version = struct.unpack_from(">I", self.__buf, 40)[0]
+        self.__text_encoding = _TEXT_ENCODINGS.get(
+            struct.unpack_from(">I", self.__buf, 56)[0], _TEXT_ENCODINGS[1]
+        )
+        self.__page_count = len(self.__buf) // page_size
+
+    def __get_page_offset(self, page_no: int) -> int:
+        if page_no < 1 or page_no > self.__page_count:
+            raise DatabaseFileFormatError(f"page number out of range: {page_no}")
+
+        return (page_no - 1) * self.__page_size
+
+    def __iter_table_payloads(self, root_page_no: int) -> Iterator[bytes]:
+        assert self.__buf is not None
+
+        buf = self.__buf
+        visited: set[int] = set()
+        page_stack = [root_page_no]
+
+        while page_stack:
+            page_no = page_stack.pop()
+            if page_no in visited:
+                logger.debug(f"skip a page that is already visited: {page_no}")
+                continue
+            visited.add(page_no)
+
+            try:
+                page_offset = self.__get_page_offset(page_no)
+            except DatabaseFileFormatError as e:
+                logger.debug(f"skip a broken page: {e}")
+                continue
+
+            header_offset = page_offset + (_HEADER_SIZE if page_no == 1 else 0)
+            page_type = buf[header_offset]
+            cell_count = struct.unpack_from(">H", buf, header_offset + 3)[0]
+
+            if page_type == _PAGE_TYPE_TABLE_INTERIOR:
+                cell_pointer_offset = header_offset + 12
+                child_page_nos = []
+                try:
+                    for i in range(cell_count):
+                        cell_offset = (
+                            page_offset
+                            + struct.unpack_from(">H", buf, cell_pointer_offset + i * 2)[0]
+                        )
+                        child_page_nos.append(struct.unpack_from(">I", buf, cell_offset)[0])
+                    child_page_nos.append(struct.unpack_from(">I", buf, header_offset + 8)[0])
+                except (IndexError, struct.error) as e:
+                    logger.debug(f"broken interior page: page={page_no}, error={e}")
+
+                # push in reverse order to visit the children from left to right
+                page_stack.extend(reversed(child_page_nos))
+                continue
+
+            if page_type != _PAGE_TYPE_TABLE_LEAF:
+                logger.debug(f"skip a page that is not a table b-tree page: {page_no}")
+                continue
+
+            cell_pointer_offset = header_offset + 8
+            for i in range(cell_count):
+                cell_offset = (
+                    page_offset + struct.unpack_from(">H", buf, cell_pointer_offset + i * 2)[0]
+                )
+                try:
+                    yield self.__read_leaf_payload(cell_offset)
+                except (DatabaseFileFormatError, IndexError, struct.error) as e:
+                    logger.debug(f"skip a broken cell: page={page_no}, error={e}")
+
+    def __read_leaf_payload(self, cell_offset: int) -> bytes:
+        assert self.__buf is not None
+
+        buf = self.__buf
+        payload_size, offset = _read_varint(buf, cell_offset)
+        _rowid, offset = _read_varint(buf, offset)
+
+        usable_size = self.__usable_size
+        max_local = usable_size - 35
+        if payload_size <= max_local:
+            return bytes(buf[offset : offset + payload_size])
+
+        min_local = ((usable_size - 12) * 32 // 255) - 23
+        local_size = min_local + ((payload_size - min_local) % (usable_size - 4))
+        if local_size > max_local:
+            local_size = min_local
+
+        chunks = [buf[offset : offset + local_size]]
+        remaining = payload_size - local_size
+        overflow_page_no = struct.unpack_from(">I", buf, offset + local_size)[0]
+        visited: set[int] = set()
+
+        while remaining > 0:
+            if overflow_page_no in visited:
+                raise DatabaseFileFormatError("overflow page loop detected")
+            visited.add(overflow_page_no)
+
+            page_offset = self.__get_page_offset(overflow_page_no)
+            chunk_size = min(remaining, usable_size - 4)
+            chunks.append(buf[page_offset + 4 : page_offset + 4 + chunk_size])
+            remaining -= chunk_size
+            overflow_page_no = struct.unpack_from(">I", buf, page_offset)[0]
+
+        return b"".join(chunks)
+
+    def __parse_record(self, payload: bytes) -> list[Any]:
+        header_size, offset = _read_varint(payload, 0)
+        serial_types = []
+        while offset < header_size:
+            serial_type, offset = _read_varint(payload, offset)
+            serial_types.append(serial_type)
+
+        values: list[Any] = []
+        offset = header_size
+        for serial_type in serial_types:
+            if serial_type == 0:
+                values.append(None)
+            elif 1 <= serial_type <= 6:
+                size = (0, 1, 2, 3, 4, 6, 8)[serial_type]
+                values.append(int.from_bytes(payload[offset : offset + size], "big", signed=True))
+                offset += size
+            elif serial_type == 7:
+                values.append(struct.unpack_from(">d", payload, offset)[0])
+                offset += 8
+            elif serial_type in (8, 9):
+                values.append(serial_type - 8)
+            elif serial_type >= 12 and serial_type % 2 == 0:
+                size = (serial_type - 12) // 2
+                values.append(bytes(payload[offset : offset + size]))
+                offset += size
+            elif serial_type >= 13:
+                size = (serial_type - 13) // 2
+                values.append(
+                    payload[offset : offset + size].decode(self.__text_encoding, errors="replace")
+                )
+                offset += size
+            else:
+                raise DatabaseFileFormatError(f"invalid serial type: {serial_type}")
+
+        return values
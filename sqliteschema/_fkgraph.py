@@ -0,0 +1,272 @@
+"""
+.. codeauthor:: Tsuyoshi Hombashi <tsuyoshi.hombashi@gmail.com>
+"""
+
+from collections import OrderedDict
+from collections.abc import Mapping, Sequence
+from typing import Any, Optional
+
+from ._error import ForeignKeyCycleError
+
+
+class ForeignKey:
+    """
+    A foreign key constraint of a table.
+    """
+
+    @property
+    def table_name(self) -> str:
+        return self.__table_name
+
+    @property
+    def columns(self) -> tuple[str, ...]:
+        return self.__columns
+
+    @property
+    def referred_table_name(self) -> str:
+        return self.__referred_table_name
+
+    @property
+    def referred_columns(self) -> tuple[Optional[str], ...]:
+        """
+        Columns of the referred table.
+        An item is |None| if the constraint refers to the primary key implicitly.
+        """
+
+        return self.__referred_columns
+
+    @property
+    def on_update(self) -> str:
+        return self.__on_update
+
+    @property
+    def on_delete(self) -> str:
+        return self.__on_delete
+
+    def __init__(
+        self,
+        table_name: str,
+        columns: Sequence[str],
+        referred_table_name: str,
+        referred_columns: Sequence[Optional[str]],
+        on_update: str = "NO ACTION",
+        on_delete: str = "NO ACTION",
+    ) -> None:
+        self.__table_name = table_name
+        self.__columns = tuple(columns)
+        self.__referred_table_name = referred_table_name
+        self.__referred_columns = tuple(referred_columns)
+        self.__on_update = on_update
+        self.__on_delete = on_delete
+
+    def __repr__(self) -> str:
+        return "ForeignKey({}({}) -> {}({}))".format(
+            self.table_name,
+            ", ".join(self.columns),
+            self.referred_table_name,
+            ", ".join(str(column) for column in self.referred_columns),
+        )
+
+    def __eq__(self, other: Any) -> bool:
+        if not isinstance(other, ForeignKey):
+            return False
+
+        return self.as_dict() == other.as_dict()
+
+    def as_dict(self) -> dict[str, Any]:
+        return {
+            "table_name": self.table_name,
+            "columns": list(self.columns),
+            "referred_table_name": self.referred_table_name,
+            "referred_columns": list(self.referred_columns),
+            "on_update": self.on_update,
+            "on_delete": self.on_delete,
+        }
+
+
+class ForeignKeyGraph:
+    """
+    A dependency graph of tables built from foreign key constraints.
+    An edge goes from a referred (parent) table to a referring (child) table.
+
+    Args:
+        table_names:
+            Table names in the database. The order is used to break ties of
+            the topological order.
+        foreign_keys:
+            Foreign key constraints of the tables.
+        index_columns:
+            Mapping of a table name to the column lists of the indexes that
+            are usable to look up rows of the table.
+    """
+
+    @property
+    def table_names(self) -> list[str]:
+        return list(self.__table_names)
+
+    @property
+    def foreign_keys(self) -> list[ForeignKey]:
+        return list(self.__foreign_keys)
+
+    def __init__(
+        self,
+        table_names: Sequence[str],
+        foreign_keys: Sequence[ForeignKey],
+        index_columns: Optional[Mapping[str, Sequence[Sequence[str]]]] = None,
+    ) -> None:
+        self.__table_names = list(table_names)
+        self.__foreign_keys = list(foreign_keys)
+        self.__index_columns = index_columns or {}
+
+        # SQLite identifiers are case-insensitive
+        self.__name_map = {table_name.lower(): table_name for table_name in self.__table_names}
+        self.__children: dict[str, list[str]] = OrderedDict(
+            (table_name, []) for table_name in self.__table_names
+        )
+        self.__parents: dict[str, list[str]] = OrderedDict(
+            (table_name, []) for table_name in self.__table_names
+        )
+
+        for foreign_key in self.__foreign_keys:
+            child = self.__name_map.get(foreign_key.table_name.lower())
+            parent = self.__name_map.get(foreign_key.referred_table_name.lower())
+            if child is None or parent is None or child == parent:
+                # self references and references to missing tables do not affect the order
+                continue
+
+            if child not in self.__children[parent]:
+                self.__children[parent].append(child)
+                self.__parents[child].append(parent)
+
+    def get_referred_table_names(self, table_name: str) -> list[str]:
+        """
+        :return: Table names that are referred by the table.
+        """
+
+        return list(self.__parents.get(self.__name_map.get(table_name.lower(), table_name), []))
+
+    def get_referring_table_names(self, table_name: str) -> list[str]:
+        """
+        :return: Table names that refer to the table.
+        """
+
+        return list(self.__children.get(self.__name_map.get(table_name.lower(), table_name), []))
+
+    def find_cycles(self) -> list[list[str]]:
+        """
+        Find groups of tables that refer to each other (strongly connected components
+        of the graph with two or more tables).
+
+        :return: List of table name groups. Empty if the graph is acyclic.
+        """
+
+        index_counter = 0
+        indices: dict[str, int] = {}
+        lowlinks: dict[str, int] = {}
+        stack: list[str] = []
+        on_stack: set[str] = set()
+        cycles: list[list[str]] = []
+        order = {table_name: i for i, table_name in enumerate(self.__table_names)}
+
+        # iterative Tarjan's algorithm to avoid hitting the recursion limit on large schemas
+        for root in self.__table_names:
+            if root in indices:
+                continue
+
+            work: list[tuple[str, int]] = [(root, 0)]
+            while work:
+                node, child_idx = work.pop()
+                if child_idx == 0:
+                    indices[node] = lowlinks[node] = index_counter
+                    index_counter += 1
+                    stack.append(node)
+                    on_stack.add(node)
+
+                children = self.__children[node]
+                if child_idx < len(children):
+                    work.append((node, child_idx + 1))
+                    child = children[child_idx]
+                    if child not in indices:
+                        work.append((child, 0))
+                    elif child in on_stack:
+                        lowlinks[node] = min(lowlinks[node], indices[child])
+                    continue
+
+                if work:
+                    parent = work[-1][0]
+                    lowlinks[parent] = min(lowlinks[parent], lowlinks[node])
+
+                if lowlinks[node] == indices[node]:
+                    component = []
+                    while True:
+                        member = stack.pop()
+                        on_stack.discard(member)
+                        component.append(member)
+                        if member == node:
+                            break
+
+                    if len(component) > 1:
+                        cycles.append(sorted(component, key=lambda name: order[name]))
+
+        return cycles
+
+    def topological_order(self) -> list[str]:
+        """
+        Sort tables so that every table comes after the tables it refers to.
+        This is a valid order to load data into the tables. Reverse the order
+        to delete rows from the tables.
+
+        :return: List of table names.
+        :raises sqliteschema.ForeignKeyCycleError:
+            If tables refer to each other.
+        """
+
+        in_degrees = {table_name: len(parents) for table_name, parents in self.__parents.items()}
+        ready = [table_name for table_name in self.__table_names if in_degrees[table_name] == 0]
+        order = []
+
+        while ready:
+            next_ready = []
+            for table_name in ready:
+                order.append(table_name)
+                for child in self.__children[table_name]:
+                    in_degrees[child] -= 1
+                    if in_degrees[child] == 0:
+                        next_ready.append(child)
+            ready = next_ready
+
+        if len(order) != len(self.__table_names):
+            cycles = self.find_cycles()
+            raise ForeignKeyCycleError(
+                "foreign key cycles found: {}".format(
+                    "; ".join(" <-> ".join(cycle) for cycle in cycles)
+                ),
+                cycles=cycles,
+            )
+
+        return order
+
+    def find_unindexed_foreign_keys(self) -> list[ForeignKey]:
+        """
+        Find foreign keys whose columns are not the leading columns of any index
+        of the referring table. Deleting or updating a row of the referred table
+        requires a full scan of the referring table for such foreign keys.
+
+        :return: List of foreign keys without a covering index.
+        """
+
+        unindexed = []
+        for foreign_key in self.__foreign_keys:
+            fk_columns = {column.lower() for column in foreign_key.columns}
+            is_covered = False
+
+            for columns in self.__index_columns.get(foreign_key.table_name, []):
+                leading_columns = {column.lower() for column in columns[: len(fk_columns)]}
+                if leading_columns == fk_columns:
+                    is_covered = True
+                    break
+
+            if not is_covered:
+                unindexed.append(foreign_key)
+
+        return unindexed
@@ -0,0 +1,451 @@
+"""
+.. codeauthor:: Tsuyoshi Hombashi <tsuyoshi.hombashi@gmail.com>
+"""
+
+import re
+from collections.abc import Sequence
+from typing import Any, Final, Optional
+
+from ._fkgraph import ForeignKey
+
+
+_RE_WHERE: Final = re.compile(r"^\s*WHERE\s+(?P<where>.+?)[\s;]*$", re.IGNORECASE | re.DOTALL)
+_RE_KEY_SUFFIX: Final = re.compile(
+    r"(\s+COLLATE\s+(\"[^\"]*\"|'[^']*'|`[^`]*`|\[[^\]]*\]|\w+))?(\s+(ASC|DESC))?\s*$",
+    re.IGNORECASE,
+)
+_QUOTE_PAIRS: Final = {'"': '"', "'": "'", "`": "`", "[": "]"}
+
+
+def split_index_sql(sql: str) -> tuple[list[str], Optional[str]]:
+    """
+    Split a ``CREATE INDEX`` statement into the indexed items
+    (column names or expressions, without ``COLLATE``/``ASC``/``DESC``)
+    and the ``WHERE`` clause of a partial index.
+    """
+
+    items: list[str] = []
+    depth = 0
+    start = 0
+    i = 0
+
+    while i < len(sql):
+        char = sql[i]
+        if char in _QUOTE_PAIRS:
+            end = sql.find(_QUOTE_PAIRS[char], i + 1)
+            i = len(sql) if end < 0 else end + 1
+            continue
+
+        if char == "(":
+            depth += 1
+            if depth == 1:
+                start = i + 1
+        elif char == ")":
+            depth -= 1
+            if depth == 0:
+                items.append(sql[start:i])
+                match = _RE_WHERE.search(sql[i + 1 :])
+                return (
+                    [_RE_KEY_SUFFIX.sub("", item.strip()) for item in items],
+                    match.group("where") if match else None,
+                )
+        elif char == "," and depth == 1:
+            items.append(sql[start:i])
+            start = i + 1
+
+        i += 1
+
+    return ([], None)
+
+
+def _normalize_expression(expression: str) -> str:
+    return " ".join(expression.split()).lower()
+
+
+class IndexOrigin:
+    CREATE_INDEX: Final = "c"
+    UNIQUE: Final = "u"
+    PRIMARY_KEY: Final = "pk"
+
+
+class RedundancyType:
+    DUPLICATE: Final = "duplicate"
+    LEFT_PREFIX: Final = "left-prefix"
+
+
+class SQLiteIndexColumn:
+    """
+    A key item of an index: a column or an expression.
+    """
+
+    @property
+    def name(self) -> Optional[str]:
+        """
+        Column name. |None| if the item is an expression.
+        """
+
+        return self.__name
+
+    @property
+    def expression(self) -> Optional[str]:
+        """
+        Expression of an expression index item. |None| if the item is a column.
+        """
+
+        return self.__expression
+
+    @property
+    def collation(self) -> str:
+        return self.__collation
+
+    @property
+    def is_descending(self) -> bool:
+        return self.__is_descending
+
+    @property
+    def is_expression(self) -> bool:
+        return self.__name is None
+
+    def __init__(
+        self,
+        name: Optional[str],
+        expression: Optional[str] = None,
+        collation: str = "BINARY",
+        is_descending: bool = False,
+    ) -> None:
+        self.__name = name
+        self.__expression = expression
+        self.__collation = collation
+        self.__is_descending = is_descending
+
+    def __repr__(self) -> str:
+        return "SQLiteIndexColumn({}{})".format(
+            self.name if self.name is not None else self.expression,
+            " DESC" if self.is_descending else "",
+        )
+
+    def __eq__(self, other: Any) -> bool:
+        if not isinstance(other, SQLiteIndexColumn):
+            return False
+
+        return self.as_dict() == other.as_dict()
+
+    def to_key(self) -> tuple[str, str, bool]:
+        """
+        :return:
+            Comparable key of the item: identifiers and expressions are case-insensitive.
+        """
+
+        if self.__name is not None:
+            target = self.__name.lower()
+        else:
+            target = _normalize_expression(self.__expression or "")
+
+        return (target, self.__collation.upper(), self.__is_descending)
+
+    def as_dict(self) -> dict[str, Any]:
+        return {
+            "name": self.name,
+            "expression": self.expression,
+            "collation": self.collation,
+            "is_descending": self.is_descending,
+        }
+
+
+class SQLiteIndex:
+    """
+    An index of a table, including the automatic indexes that implement
+    ``UNIQUE`` and ``PRIMARY KEY`` constraints.
+    """
+
+    @property
+    def schema_name(self) -> str:
+        return self.__schema_name
+
+    @property
+    def name(self) -> str:
+        return self.__name
+
+    @property
+    def table_name(self) -> str:
+        return self.__table_name
+
+    @property
+    def columns(self) -> list[SQLiteIndexColumn]:
+        """
+        Key items of the index in the order of the index.
+        """
+
+        return list(self.__columns)
+
+    @property
+    def column_names(self) -> list[Optional[str]]:
+        """
+        Names of the key columns. An item is |None| for an expression.
+        """
+
+        return [column.name for column in self.__columns]
+
+    @property
+    def is_unique(self) -> bool:
+        return self.__is_unique
+
+    @property
+    def origin(self) -> str:
+        """
+        One of the :py:class:`~sqliteschema.IndexOrigin` values.
+        """
+
+        return self.__origin
+
+    @property
+    def where(self) -> Optional[str]:
+        """
+        ``WHERE`` clause of a partial index. |None| if the index is not partial.
+        """
+
+        return self.__where
+
+    @property
+    def sql(self) -> Optional[str]:
+        """
+        ``CREATE INDEX`` statement. |None| for automatic indexes.
+        """
+
+        return self.__sql
+
+    @property
+    def is_partial(self) -> bool:
+        return self.__where is not None
+
+    @property
+    def has_expression(self) -> bool:
+        return any(column.is_expression for column in self.__columns)
+
+    @property
+    def is_droppable(self) -> bool:
+        """
+        |True| if the index is created by ``CREATE INDEX``, i.e. not an automatic index
+        of a constraint.
+        """
+
+        return self.__origin == IndexOrigin.CREATE_INDEX
+
+    def __init__(
+        self,
+        schema_name: str,
+        name: str,
+        table_name: str,
+        columns: Sequence[SQLiteIndexColumn],
+        is_unique: bool = False,
+        origin: str = IndexOrigin.CREATE_INDEX,
+        where: Optional[str] = None,
+        sql: Optional[str] = None,
+    ) -> None:
+        self.__schema_name = schema_name
+        self.__name = name
+        self.__table_name = table_name
+        self.__columns = tuple(columns)
+        self.__is_unique = is_unique
+        self.__origin = origin
+        self.__where = where
+        self.__sql = sql
+
+    def __repr__(self) -> str:
+        return "SQLiteIndex(schema={}, name={}, table={}, columns=[{}]{}{})".format(
+            self.schema_name,
+            self.name,
+            self.table_name,
+            ", ".join(repr(column) for column in self.__columns),
+            ", unique" if self.is_unique else "",
+            ", partial" if self.is_partial else "",
+        )
+
+    def __eq__(self, other: Any) -> bool:
+        if not isinstance(other, SQLiteIndex):
+            return False
+
+        return self.as_dict() == other.as_dict()
+
+    def to_key(self) -> tuple[tuple[str, str, bool], ...]:
+        return tuple(column.to_key() for column in self.__columns)
+
+    def get_lookup_columns(self) -> list[str]:
+        """
+        :return:
+            Leading key columns of the index that are usable to look up rows,
+            i.e. the key columns before the first expression.
+            Empty for partial indexes since they do not cover every row.
+        """
+
+        if self.is_partial:
+            return []
+
+        lookup_columns = []
+        for column in self.__columns:
+            if column.name is None:
+                break
+            lookup_columns.append(column.name)
+
+        return lookup_columns
+
+    def as_dict(self) -> dict[str, Any]:
+        return {
+            "schema_name": self.schema_name,
+            "name": self.name,
+            "table_name": self.table_name,
+            "columns": [column.as_dict() for column in self.__columns],
+            "is_unique": self.is_unique,
+            "origin": self.origin,
+            "where": self.where,
+        }
+
+
+class RedundantIndex:
+    """
+    An index that is unnecessary because another index covers it.
+    Every redundant index costs writes and disk space without speeding up any query.
+    """
+
+    @property
+    def index(self) -> SQLiteIndex:
+        return self.__index
+
+    @property
+    def covering_index(self) -> SQLiteIndex:
+        return self.__covering_index
+
+    @property
+    def redundancy_type(self) -> str:
+        """
+        One of the :py:class:`~sqliteschema.RedundancyType` values.
+        """
+
+        return self.__redundancy_type
+
+    def __init__(
+        self, index: SQLiteIndex, covering_index: SQLiteIndex, redundancy_type: str
+    ) -> None:
+        self.__index = index
+        self.__covering_index = covering_index
+        self.__redundancy_type = redundancy_type
+
+    def __repr__(self) -> str:
+        return "RedundantIndex({} is a {} of {})".format(
+            self.index.name, self.redundancy_type, self.covering_index.name
+        )
+
+    def as_dict(self) -> dict[str, Any]:
+        return {
+            "index": self.index.name,
+            "covering_index": self.covering_index.name,
+            "table_name": self.index.table_name,
+            "redundancy_type": self.redundancy_type,
+        }
+
+
+class IndexAnalysis:
+    """
+    Result of :py:meth:`~sqliteschema.SQLiteSchemaExtractor.analyze_indexes`.
+    """
+
+    @property
+    def redundant_indexes(self) -> list[RedundantIndex]:
+        return list(self.__redundant_indexes)
+
+    @property
+    def duplicate_indexes(self) -> list[RedundantIndex]:
+        return [
+            redundant_index
+            for redundant_index in self.__redundant_indexes
+            if redundant_index.redundancy_type == RedundancyType.DUPLICATE
+        ]
+
+    @property
+    def left_prefix_indexes(self) -> list[RedundantIndex]:
+        return [
+            redundant_index
+            for redundant_index in self.__redundant_indexes
+            if redundant_index.redundancy_type == RedundancyType.LEFT_PREFIX
+        ]
+
+    @property
+    def unindexed_foreign_keys(self) -> list[ForeignKey]:
+        return list(self.__unindexed_foreign_keys)
+
+    def __init__(
+        self,
+        redundant_indexes: Sequence[RedundantIndex],
+        unindexed_foreign_keys: Sequence[ForeignKey],
+    ) -> None:
+        self.__redundant_indexes = list(redundant_indexes)
+        self.__unindexed_foreign_keys = list(unindexed_foreign_keys)
+
+    def __repr__(self) -> str:
+        return "IndexAnalysis(duplicate={}, left_prefix={}, unindexed_foreign_keys={})".format(
+            len(self.duplicate_indexes),
+            len(self.left_prefix_indexes),
+            len(self.__unindexed_foreign_keys),
+        )
+
+    def __bool__(self) -> bool:
+        return bool(self.__redundant_indexes or self.__unindexed_foreign_keys)
+
+    def as_dict(self) -> dict[str, Any]:
+        return {
+            "redundant_indexes": [
+                redundant_index.as_dict() for redundant_index in self.__redundant_indexes
+            ],
+            "unindexed_foreign_keys": [
+                foreign_key.as_dict() for foreign_key in self.__unindexed_foreign_keys
+            ],
+        }
+
+
+def find_redundant_indexes(indexes: Sequence[SQLiteIndex]) -> list[RedundantIndex]:
+    """
+    Find indexes that are covered by another index of the same table
+    with the same ``WHERE`` clause:
+
+    - duplicates: indexes that have the same key as another index.
+      Indexes of constraints, then unique indexes, then earlier indexes are kept.
+    - left-prefixes: non-unique indexes whose keys are the leading keys of another index.
+      Unique indexes are never left-prefixes since they enforce the uniqueness.
+    """
+
+    table_indexes: dict[tuple[str, str, Optional[str]], list[SQLiteIndex]] = {}
+    for index in indexes:
+        where = None if index.where is None else _normalize_expression(index.where)
+        table_indexes.setdefault((index.schema_name, index.table_name.lower(), where), []).append(
+            index
+        )
+
+    redundant_indexes = []
+    for group in table_indexes.values():
+        # the first index of each key is kept
+        ranked = sorted(
+            enumerate(group),
+            key=lambda item: (item[1].is_droppable, not item[1].is_unique, item[0]),
+        )
+        kept: dict[tuple, SQLiteIndex] = {}
+        for _, index in ranked:
+            key = index.to_key()
+            if key in kept:
+                redundant_indexes.append(RedundantIndex(index, kept[key], RedundancyType.DUPLICATE))
+            else:
+                kept[key] = index
+
+        for key, index in kept.items():
+            if index.is_unique:
+                continue
+
+            for other_key, other in kept.items():
+                if len(other_key) > len(key) and other_key[: len(key)] == key:
+                    redundant_indexes.append(
+                        RedundantIndex(index, other, RedundancyType.LEFT_PREFIX)
+                    )
+                    break
+
+    order = {id(index): i for i, index in enumerate(indexes)}
+
+    return sorted(redundant_indexes, key=lambda item: order[id(item.index)])
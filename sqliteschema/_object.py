@@ -0,0 +1,429 @@
+"""
+.. codeauthor:: Tsuyoshi Hombashi <tsuyoshi.hombashi@gmail.com>
+"""
+
+import hashlib
+import re
+from collections import defaultdict
+from collections.abc import Mapping, Sequence
+from typing import Any, Final, Optional
+
+from ._const import DEFAULT_SCHEMA_NAME, SHADOW_TABLE_SUFFIXES, SQLITE_SYSTEM_TABLES
+from ._sql import qualify_name
+
+
+class TableType:
+    REGULAR: Final = "regular"
+    VIRTUAL: Final = "virtual"
+    SHADOW: Final = "shadow"
+
+
+class SQLiteTableInfo:
+    """
+    Classification of a table in a ``sqlite_master`` table.
+    """
+
+    @property
+    def schema_name(self) -> str:
+        return self.__schema_name
+
+    @property
+    def name(self) -> str:
+        return self.__name
+
+    @property
+    def table_type(self) -> str:
+        """
+        One of the :py:class:`~sqliteschema.TableType` values.
+        """
+
+        return self.__table_type
+
+    @property
+    def without_rowid(self) -> bool:
+        return self.__without_rowid
+
+    @property
+    def strict(self) -> bool:
+        return self.__strict
+
+    @property
+    def module(self) -> Optional[str]:
+        """
+        Module name of a virtual table (e.g. ``fts5``).
+        """
+
+        return self.__module
+
+    @property
+    def parent(self) -> Optional[str]:
+        """
+        Name of the virtual table that owns a shadow table.
+        """
+
+        return self.__parent
+
+    @property
+    def is_shadow(self) -> bool:
+        return self.__table_type == TableType.SHADOW
+
+    def __init__(
+        self,
+        schema_name: str,
+        name: str,
+        table_type: str,
+        without_rowid: bool = False,
+        strict: bool = False,
+        module: Optional[str] = None,
+        parent: Optional[str] = None,
+    ) -> None:
+        self.__schema_name = schema_name
+        self.__name = name
+        self.__table_type = table_type
+        self.__without_rowid = without_rowid
+        self.__strict = strict
+        self.__module = module
+        self.__parent = parent
+
+    def __repr__(self) -> str:
+        return "SQLiteTableInfo(schema={}, name={}, type={}, without_rowid={}, strict={})".format(
+            self.schema_name, self.name, self.table_type, self.without_rowid, self.strict
+        )
+
+    def __eq__(self, other: Any) -> bool:
+        if not isinstance(other, SQLiteTableInfo):
+            return False
+
+        return self.as_dict() == other.as_dict()
+
+    def as_dict(self) -> dict[str, Any]:
+        return {
+            "schema_name": self.schema_name,
+            "name": self.name,
+            "table_type": self.table_type,
+            "without_rowid": self.without_rowid,
+            "strict": self.strict,
+            "module": self.module,
+            "parent": self.parent,
+        }
+
+
+class SQLiteTrigger:
+    """
+    A trigger defined in a ``sqlite_master`` table.
+    """
+
+    @property
+    def schema_name(self) -> str:
+        return self.__schema_name
+
+    @property
+    def name(self) -> str:
+        return self.__name
+
+    @property
+    def table_name(self) -> str:
+        return self.__table_name
+
+    @property
+    def timing(self) -> str:
+        """
+        ``BEFORE``, ``AFTER`` or ``INSTEAD OF``.
+        """
+
+        return self.__timing
+
+    @property
+    def event(self) -> str:
+        """
+        ``DELETE``, ``INSERT`` or ``UPDATE``.
+        """
+
+        return self.__event
+
+    @property
+    def sql(self) -> str:
+        return self.__sql
+
+    def __init__(
+        self, schema_name: str, name: str, table_name: str, timing: str, event: str, sql: str
+    ) -> None:
+        self.__schema_name = schema_name
+        self.__name = name
+        self.__table_name = table_name
+        self.__timing = timing
+        self.__event = event
+        self.__sql = sql
+
+    def __repr__(self) -> str:
+        return "SQLiteTrigger(schema={}, name={}, table={}, {} {})".format(
+            self.schema_name, self.name, self.table_name, self.timing, self.event
+        )
+
+    def __eq__(self, other: Any) -> bool:
+        if not isinstance(other, SQLiteTrigger):
+            return False
+
+        return self.as_dict() == other.as_dict()
+
+    def as_dict(self) -> dict[str, Any]:
+        return {
+            "schema_name": self.schema_name,
+            "name": self.name,
+            "table_name": self.table_name,
+            "timing": self.timing,
+            "event": self.event,
+            "sql": self.sql,
+        }
+
+
+class SchemaChanges:
+    """
+    Tables that were added, dropped or modified (the table DDL or
+    the DDLs of the indexes of the table changed) between two snapshots of
+    ``sqlite_master`` tables.
+    Table names are qualified with the schema name except for the ``main`` schema.
+    """
+
+    @property
+    def added(self) -> list[str]:
+        return list(self.__added)
+
+    @property
+    def dropped(self) -> list[str]:
+        return list(self.__dropped)
+
+    @property
+    def modified(self) -> list[str]:
+        return list(self.__modified)
+
+    def __init__(
+        self,
+        added: Sequence[str] = (),
+        dropped: Sequence[str] = (),
+        modified: Sequence[str] = (),
+    ) -> None:
+        self.__added = list(added)
+        self.__dropped = list(dropped)
+        self.__modified = list(modified)
+
+    def __repr__(self) -> str:
+        return "SchemaChanges(added={}, dropped={}, modified={})".format(
+            self.added, self.dropped, self.modified
+        )
+
+    def __bool__(self) -> bool:
+        return bool(self.__added or self.__dropped or self.__modified)
+
+    def __eq__(self, other: Any) -> bool:
+        if not isinstance(other, SchemaChanges):
+            return False
+
+        return self.as_dict() == other.as_dict()
+
+    def as_dict(self) -> dict[str, list[str]]:
+        return {"added": self.added, "dropped": self.dropped, "modified": self.modified}
+
+    @classmethod
+    def from_digests(
+        cls,
+        old_digests: Mapping[tuple[str, str], str],
+        new_digests: Mapping[tuple[str, str], str],
+    ) -> "SchemaChanges":
+        def to_name(key: tuple[str, str]) -> str:
+            return qualify_name(*key)
+
+        return cls(
+            added=[to_name(key) for key in new_digests if key not in old_digests],
+            dropped=[to_name(key) for key in old_digests if key not in new_digests],
+            modified=[
+                to_name(key)
+                for key, digest in new_digests.items()
+                if key in old_digests and old_digests[key] != digest
+            ],
+        )
+
+
+class SchemaSnapshot:
+    """
+    A consistent view of the schemas of a connection taken in a single read transaction
+    (see :py:meth:`~sqliteschema.SQLiteSchemaExtractor.snapshot`).
+    """
+
+    @property
+    def schema_versions(self) -> dict[str, int]:
+        """
+        Mapping of schema names to ``PRAGMA schema_version`` values at the snapshot.
+        """
+
+        return dict(self.__schema_versions)
+
+    @property
+    def schema_version(self) -> int:
+        """
+        ``PRAGMA schema_version`` of the ``main`` schema at the snapshot.
+        """
+
+        return self.__schema_versions[DEFAULT_SCHEMA_NAME]
+
+    @property
+    def is_transaction_owner(self) -> bool:
+        """
+        |False| if the snapshot joined a transaction that was already open
+        on the connection.
+        """
+
+        return self.__is_transaction_owner
+
+    def __init__(self, schema_versions: Mapping[str, int], is_transaction_owner: bool) -> None:
+        self.__schema_versions = dict(schema_versions)
+        self.__is_transaction_owner = is_transaction_owner
+
+    def __repr__(self) -> str:
+        return "SchemaSnapshot(schema_versions={})".format(self.__schema_versions)
+
+    def get_schema_version(self, schema_name: str) -> Optional[int]:
+        return self.__schema_versions.get(schema_name)
+
+    def as_dict(self) -> dict[str, Any]:
+        return {"schema_versions": self.schema_versions}
+
+
+def calc_table_digests(records: Sequence[Mapping[str, Any]]) -> dict[tuple[str, str], str]:
+    """
+    Calculate a digest of the DDL of each table (except for system tables)
+    and the DDLs of its indexes.
+
+    Args:
+        records:
+            Records returned by
+            :py:meth:`~sqliteschema.SQLiteSchemaExtractor.fetch_sqlite_master`.
+
+    Returns:
+        Mapping of ``(schema name, table name)`` to a digest.
+    """
+
+    index_sqls: dict[tuple[str, str], list[str]] = defaultdict(list)
+    table_sqls: dict[tuple[str, str], str] = {}
+
+    for record in records:
+        key = (record.get("schema_name", DEFAULT_SCHEMA_NAME), record["tbl_name"])
+        if record["type"] == "table":
+            if record["name"] not in SQLITE_SYSTEM_TABLES:
+                table_sqls[key] = record["sql"] or ""
+        elif record["type"] == "index" and record["sql"]:
+            index_sqls[key].append(record["sql"])
+
+    return {
+        key: hashlib.sha256(
+            "\0".join([table_sql] + sorted(index_sqls.get(key, []))).encode("utf-8")
+        ).hexdigest()
+        for key, table_sql in table_sqls.items()
+    }
+
+
+_RE_VIRTUAL_TABLE: Final = re.compile(
+    r"^\s*CREATE\s+VIRTUAL\s+TABLE\s.+?\sUSING\s+(?P<module>\w+)", re.IGNORECASE | re.DOTALL
+)
+_RE_WITHOUT_ROWID: Final = re.compile(r"\bWITHOUT\s+ROWID\b", re.IGNORECASE)
+_RE_STRICT: Final = re.compile(r"\bSTRICT\b", re.IGNORECASE)
+_RE_TRIGGER: Final = re.compile(
+    r"\s(?:(?P<timing>BEFORE|AFTER|INSTEAD\s+OF)\s+)?(?P<event>DELETE|INSERT|UPDATE)\b"
+    r"(?:\s+OF\s.+?)?\s+ON\s",
+    re.IGNORECASE | re.DOTALL,
+)
+_RE_TRIGGER_BODY: Final = re.compile(r"\sBEGIN\s", re.IGNORECASE)
+
+
+def _extract_table_options(sql: str) -> str:
+    # table options (WITHOUT ROWID, STRICT) follow the closing parenthesis of the column list
+    return sql.rsplit(")", maxsplit=1)[-1]
+
+
+def _parse_trigger(schema_name: str, record: Mapping[str, Any]) -> SQLiteTrigger:
+    sql = record["sql"] or ""
+    match = _RE_TRIGGER.search(_RE_TRIGGER_BODY.split(sql, maxsplit=1)[0])
+    timing = "BEFORE"
+    event = ""
+    if match:
+        if match.group("timing"):
+            timing = " ".join(match.group("timing").upper().split())
+        event = match.group("event").upper()
+
+    return SQLiteTrigger(
+        schema_name=schema_name,
+        name=record["name"],
+        table_name=record["tbl_name"],
+        timing=timing,
+        event=event,
+        sql=sql,
+    )
+
+
+def classify_sqlite_master(
+    records: Sequence[Mapping[str, Any]],
+) -> tuple[list[SQLiteTableInfo], list[SQLiteTrigger]]:
+    """
+    Classify tables and extract triggers from ``sqlite_master`` records.
+    Shadow tables are detected from the module of the virtual tables,
+    so no additional queries are required.
+
+    Args:
+        records:
+            Records returned by
+            :py:meth:`~sqliteschema.SQLiteSchemaExtractor.fetch_sqlite_master`.
+
+    Returns:
+        A tuple of table classifications and triggers.
+    """
+
+    shadow_parents: dict[tuple[str, str], str] = {}
+    table_records = []
+    triggers = []
+
+    for record in records:
+        schema_name = record.get("schema_name", DEFAULT_SCHEMA_NAME)
+
+        if record["type"] == "trigger":
+            triggers.append(_parse_trigger(schema_name, record))
+            continue
+
+        if record["type"] != "table":
+            continue
+
+        table_records.append((schema_name, record))
+
+        match = _RE_VIRTUAL_TABLE.search(record["sql"] or "")
+        if match is None:
+            continue
+
+        for suffix in SHADOW_TABLE_SUFFIXES.get(match.group("module").lower(), ()):
+            shadow_parents[(schema_name, "{}_{}".format(record["name"], suffix))] = record["name"]
+
+    table_infos = []
+    for schema_name, record in table_records:
+        sql = record["sql"] or ""
+        name = record["name"]
+        match = _RE_VIRTUAL_TABLE.search(sql)
+
+        if match is not None:
+            table_infos.append(
+                SQLiteTableInfo(
+                    schema_name, name, TableType.VIRTUAL, module=match.group("module").lower()
+                )
+            )
+            continue
+
+        table_options = _extract_table_options(sql)
+        table_infos.append(
+            SQLiteTableInfo(
+                schema_name,
+                name,
+                TableType.SHADOW if (schema_name, name) in shadow_parents else TableType.REGULAR,
+                without_rowid=_RE_WITHOUT_ROWID.search(table_options) is not None,
+                strict=_RE_STRICT.search(table_options) is not None,
+                parent=shadow_parents.get((schema_name, name)),
+            )
+        )
+
+    return (table_infos, triggers)
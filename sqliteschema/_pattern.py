@@ -0,0 +1,102 @@
+"""
+.. codeauthor:: Tsuyoshi Hombashi <tsuyoshi.hombashi@gmail.com>
+"""
+
+import fnmatch
+import re
+from collections.abc import Sequence
+from typing import Optional, Union
+
+
+NamePattern = Union[str, "re.Pattern[str]"]
+
+
+def _glob_match(pattern: str, name: str) -> bool:
+    # SQLite GLOB negates a character class with '^' instead of '!'
+    return fnmatch.fnmatchcase(name, pattern.replace("[^", "[!"))
+
+
+class NameFilter:
+    """
+    A filter of table names with include/exclude patterns.
+    ``str`` patterns are case-sensitive globs in the SQLite ``GLOB`` syntax,
+    and compiled regular expressions are matched with ``re.search``.
+    A name is selected if it matches any of the include patterns
+    (or no include patterns are given) and none of the exclude patterns.
+
+    Glob patterns are translated into a ``WHERE`` clause (see :py:meth:`to_sql`),
+    so that tables excluded by them are never fetched from a database.
+    The rest of the patterns are applied with :py:meth:`match_unpushed` to the fetched names.
+    """
+
+    def __init__(
+        self,
+        include_patterns: Optional[Sequence[NamePattern]] = None,
+        exclude_patterns: Optional[Sequence[NamePattern]] = None,
+    ) -> None:
+        self.__include_patterns = list(include_patterns or [])
+        self.__exclude_patterns = list(exclude_patterns or [])
+
+        self.__is_include_pushdown = all(
+            isinstance(pattern, str) for pattern in self.__include_patterns
+        )
+        self.__exclude_globs = [
+            pattern for pattern in self.__exclude_patterns if isinstance(pattern, str)
+        ]
+        self.__exclude_regexes = [
+            pattern for pattern in self.__exclude_patterns if not isinstance(pattern, str)
+        ]
+
+    def to_sql(self, column: str) -> tuple[str, list[str]]:
+        """
+        :return:
+            A tuple of a ``WHERE`` clause (an empty string or a string that starts
+            with `` AND ``) and its bound parameters.
+        """
+
+        clauses = []
+        params: list[str] = []
+
+        if self.__include_patterns and self.__is_include_pushdown:
+            clauses.append(
+                "({})".format(" OR ".join([f"{column} GLOB ?"] * len(self.__include_patterns)))
+            )
+            params.extend(str(pattern) for pattern in self.__include_patterns)
+
+        for pattern in self.__exclude_globs:
+            clauses.append(f"{column} NOT GLOB ?")
+            params.append(pattern)
+
+        return ("".join(f" AND {clause}" for clause in clauses), params)
+
+    def match(self, name: str) -> bool:
+        """
+        :return: |True| if the name passes all of the patterns.
+        """
+
+        if self.__include_patterns and not any(
+            self.__match_pattern(pattern, name) for pattern in self.__include_patterns
+        ):
+            return False
+
+        return not any(self.__match_pattern(pattern, name) for pattern in self.__exclude_patterns)
+
+    def match_unpushed(self, name: str) -> bool:
+        """
+        :return:
+            |True| if the name passes the patterns that are not applied by
+            the ``WHERE`` clause of :py:meth:`to_sql`.
+        """
+
+        if self.__include_patterns and not self.__is_include_pushdown:
+            if not any(self.__match_pattern(pattern, name) for pattern in self.__include_patterns):
+                return False
+
+        return not any(pattern.search(name) for pattern in self.__exclude_regexes)
+
+    @staticmethod
+    def __match_pattern(pattern: NamePattern, name: str) -> bool:
+        if isinstance(pattern, str):
+            return _glob_match(pattern, name)
+
+        return pattern.search(name) is not None
@@ -0,0 +1,276 @@
+"""
+.. codeauthor:: Tsuyoshi Hombashi <tsuyoshi.hombashi@gmail.com>
+"""
+
+import os
+import threading
+import time
+from collections import OrderedDict
+from collections.abc import Iterator
+from contextlib import contextmanager
+from typing import Optional
+
+from ._budget import CancellationToken
+from ._extractor import SQLiteSchemaExtractor
+from ._logger import logger
+from ._retry import RetryPolicy
+
+
+class _PoolEntry:
+    def __init__(
+        self, key: str, extractor: SQLiteSchemaExtractor, file_id: tuple[int, int]
+    ) -> None:
+        self.key = key
+        self.extractor = extractor
+        self.file_id = file_id
+        self.last_used = time.monotonic()
+        self.lease_count = 0
+        self.is_evicted = False
+
+
+class SQLiteSchemaExtractorPool:
+    """
+    A registry of :py:class:`~sqliteschema.SQLiteSchemaExtractor` instances
+    keyed by database file paths, for long-running processes that extract
+    schemas of the same files repeatedly.
+
+    An extractor (its connections and ``sqlite_master`` snapshot) is reused
+    across calls until it is evicted. Evicted extractors are closed.
+    Extractors leased by :py:meth:`.checkout` are not closed until the last
+    lease is released, and are not evicted as idle while leased.
+    Each extractor refreshes its snapshot when the ``schema_version`` of the
+    database changes, and the pool replaces an extractor when its file is
+    replaced with another file (e.g. by a rename).
+    The pool can be shared among threads.
+
+    Args:
+        max_size:
+            Maximum number of extractors in the pool.
+            The least recently used extractor is evicted when the pool is full.
+        idle_timeout:
+            Extractors that are not used for longer than the seconds are evicted.
+            |None| to disable idle eviction.
+        max_workers:
+            Passed to extractors created by the pool.
+        call_time_budget:
+            Passed to extractors created by the pool: the budget restarts at each
+            public method call. A whole-lifetime ``time_budget`` is not supported
+            since pooled extractors live longer than a single use.
+        cancellation_token:
+            Passed to extractors created by the pool.
+        busy_timeout:
+            Passed to extractors created by the pool.
+        retry_policy:
+            Passed to extractors created by the pool.
+
+    :Sample Code:
+        .. code:: python
+
+            from sqliteschema import SQLiteSchemaExtractorPool
+
+            pool = SQLiteSchemaExtractorPool(max_size=16, idle_timeout=600)
+            with pool.checkout("sample.sqlite") as extractor:
+                print(extractor.fetch_table_names())
+    """
+
+    @property
+    def max_size(self) -> int:
+        return self.__max_size
+
+    @property
+    def idle_timeout(self) -> Optional[float]:
+        return self.__idle_timeout
+
+    def __init__(
+        self,
+        max_size: int = 32,
+        idle_timeout: Optional[float] = 300.0,
+        max_workers: Optional[int] = None,
+        call_time_budget: Optional[float] = None,
+        cancellation_token: Optional[CancellationToken] = None,
+        busy_timeout: Optional[float] = None,
+        retry_policy: Optional[RetryPolicy] = None,
+    ) -> None:
+        if max_size < 1:
+            raise ValueError(f"max_size must be greater than zero: {max_size}")
+
+        self.__max_size = max_size
+        self.__idle_timeout = idle_timeout
+        self.__max_workers = max_workers
+        self.__call_time_budget = call_time_budget
+        self.__cancellation_token = cancellation_token
+        self.__busy_timeout = busy_timeout
+        self.__retry_policy = retry_policy
+        self.__entries: OrderedDict[str, _PoolEntry] = OrderedDict()
+        self.__lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self.__entries)
+
+    def __contains__(self, database_path: str) -> bool:
+        return os.path.realpath(database_path) in self.__entries
+
+    def get(self, database_path: str) -> SQLiteSchemaExtractor:
+        """
+        Get the extractor of a database file.
+        An extractor is created at the first call for the file.
+        The extractor is not leased: it is closed when it is evicted from the pool.
+        Use :py:meth:`.checkout` when other threads may evict the extractor during the use.
+
+        Args:
+            database_path:
+                Path to a SQLite database file.
+
+        :return: Extractor of the database file.
+        :raises OSError: If the file not found.
+        """
+
+        with self.__lock:
+            return self.__get_entry(database_path).extractor
+
+    @contextmanager
+    def checkout(self, database_path: str) -> Iterator[SQLiteSchemaExtractor]:
+        """
+        Lease the extractor of a database file for the duration of a ``with`` block.
+        A leased extractor is not closed by evictions until the block exits.
+
+        Args:
+            database_path:
+                Path to a SQLite database file.
+
+        :return: Context manager that yields the extractor of the database file.
+        :raises OSError: If the file not found.
+
+        :Sample Code:
+            .. code:: python
+
+                with pool.checkout("sample.sqlite") as extractor:
+                    print(extractor.dumps())
+        """
+
+        with self.__lock:
+            entry = self.__get_entry(database_path)
+            entry.lease_count += 1
+
+        try:
+            yield entry.extractor
+        finally:
+            with self.__lock:
+                entry.lease_count -= 1
+                entry.last_used = time.monotonic()
+                if not entry.is_evicted:
+                    # keep the entries ordered from the least recently used
+                    self.__entries.move_to_end(entry.key)
+                is_closing = entry.is_evicted and entry.lease_count == 0
+
+            if is_closing:
+                logger.debug(f"close an evicted extractor at the last release: {entry.key}")
+                entry.extractor.close()
+
+    def __get_entry(self, database_path: str) -> _PoolEntry:
+        # the caller must hold the lock of the pool
+        key = os.path.realpath(database_path)
+        stat = os.stat(key)
+        file_id = (stat.st_dev, stat.st_ino)
+
+        self.__evict_idle()
+
+        entry = self.__entries.get(key)
+        if entry is not None and entry.file_id == file_id:
+            self.__entries.move_to_end(key)
+            entry.last_used = time.monotonic()
+            return entry
+
+        if entry is not None:
+            logger.debug(f"database file replaced: {key}")
+            self.__release(entry)
+
+        entry = _PoolEntry(
+            key,
+            SQLiteSchemaExtractor(
+                key,
+                max_workers=self.__max_workers,
+                call_time_budget=self.__call_time_budget,
+                cancellation_token=self.__cancellation_token,
+                busy_timeout=self.__busy_timeout,
+                retry_policy=self.__retry_policy,
+            ),
+            file_id,
+        )
+        self.__entries[key] = entry
+        self.__entries.move_to_end(key)
+
+        while len(self.__entries) > self.__max_size:
+            evicted_key, evicted_entry = self.__entries.popitem(last=False)
+            logger.debug(f"evict the least recently used extractor: {evicted_key}")
+            self.__release(evicted_entry)
+
+        return entry
+
+    def evict(self, database_path: str) -> bool:
+        """
+        Remove the extractor of a database file from the pool and close it.
+        A leased extractor is closed when the last lease is released.
+
+        :return: |True| if the extractor was in the pool.
+        """
+
+        with self.__lock:
+            entry = self.__entries.pop(os.path.realpath(database_path), None)
+            if entry is None:
+                return False
+
+            self.__release(entry)
+
+        return True
+
+    def evict_idle(self) -> int:
+        """
+        Remove extractors that exceed the idle timeout and close them.
+        Leased extractors are not idle.
+
+        :return: Number of the evicted extractors.
+        """
+
+        with self.__lock:
+            return self.__evict_idle()
+
+    def clear(self) -> None:
+        """
+        Remove all of the extractors from the pool and close them.
+        Leased extractors are closed when the last lease is released.
+        """
+
+        with self.__lock:
+            entries = list(self.__entries.values())
+            self.__entries.clear()
+
+            for entry in entries:
+                self.__release(entry)
+
+    def __release(self, entry: _PoolEntry) -> None:
+        # close an entry removed from the pool, or defer it to the last release of the leases
+        entry.is_evicted = True
+        if entry.lease_count == 0:
+            entry.extractor.close()
+
+    def __evict_idle(self) -> int:
+        if self.__idle_timeout is None:
+            return 0
+
+        deadline = time.monotonic() - self.__idle_timeout
+        evict_count = 0
+
+        # entries are ordered from the least recently used
+        for key, entry in list(self.__entries.items()):
+            if entry.last_used > deadline:
+                break
+            if entry.lease_count > 0:
+                continue
+
+            del self.__entries[key]
+            evict_count += 1
+            logger.debug(f"evict an idle extractor: {key}")
+            self.__release(entry)
+
+        return evict_count
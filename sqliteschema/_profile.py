@@ -0,0 +1,242 @@
+"""
+.. codeauthor:: Tsuyoshi Hombashi <tsuyoshi.hombashi@gmail.com>
+"""
+
+import random
+import sqlite3
+import time
+from collections.abc import Mapping, Sequence
+from typing import Any, Optional
+
+from ._logger import logger
+from ._sql import quote_identifier
+
+
+class TableTypeProfile:
+    """
+    Distribution of the storage classes (``typeof()`` results) of the values
+    of each column in sampled rows of a table.
+    """
+
+    @property
+    def table_name(self) -> str:
+        return self.__table_name
+
+    @property
+    def sampled_rows(self) -> int:
+        return self.__sampled_rows
+
+    @property
+    def is_full_scan(self) -> bool:
+        """
+        |True| if all of the rows of the table are profiled.
+        """
+
+        return self.__is_full_scan
+
+    @property
+    def is_time_budget_exceeded(self) -> bool:
+        """
+        |True| if the sampling stopped before the sample size by the time budget.
+        """
+
+        return self.__is_time_budget_exceeded
+
+    @property
+    def column_names(self) -> list[str]:
+        return list(self.__type_counts)
+
+    def __init__(
+        self,
+        table_name: str,
+        type_counts: Mapping[str, Mapping[str, int]],
+        sampled_rows: int,
+        is_full_scan: bool = False,
+        is_time_budget_exceeded: bool = False,
+    ) -> None:
+        self.__table_name = table_name
+        self.__type_counts = {column: dict(counts) for column, counts in type_counts.items()}
+        self.__sampled_rows = sampled_rows
+        self.__is_full_scan = is_full_scan
+        self.__is_time_budget_exceeded = is_time_budget_exceeded
+
+    def __repr__(self) -> str:
+        return "TableTypeProfile(table={}, sampled_rows={}, full_scan={})".format(
+            self.table_name, self.sampled_rows, self.is_full_scan
+        )
+
+    def get_type_counts(self, column_name: str) -> dict[str, int]:
+        """
+        :return: Mapping of storage classes to the number of the sampled values.
+        """
+
+        return dict(self.__type_counts.get(column_name, {}))
+
+    def get_type_ratios(self, column_name: str) -> dict[str, float]:
+        """
+        :return: Mapping of storage classes to the ratios of the sampled values.
+        """
+
+        if not self.__sampled_rows:
+            return {}
+
+        return {
+            storage_class: count / self.__sampled_rows
+            for storage_class, count in self.get_type_counts(column_name).items()
+        }
+
+    def to_summary(self, column_name: str) -> str:
+        """
+        :return: Storage classes in descending order of the ratios (e.g. ``integer 98%, text 2%``).
+        """
+
+        ratios = sorted(self.get_type_ratios(column_name).items(), key=lambda item: -item[1])
+
+        return ", ".join(f"{storage_class} {ratio:.0%}" for storage_class, ratio in ratios)
+
+    def as_dict(self) -> dict[str, Any]:
+        return {
+            "table_name": self.table_name,
+            "sampled_rows": self.sampled_rows,
+            "is_full_scan": self.is_full_scan,
+            "is_time_budget_exceeded": self.is_time_budget_exceeded,
+            "type_counts": {column: self.get_type_counts(column) for column in self.column_names},
+        }
+
+
+class TypeProfiler:
+    """
+    Profile the storage classes actually stored in columns by sampling rows.
+    Rows of a rowid table are sampled from random rowid ranges:
+    each range is a ``rowid >= ? ORDER BY rowid LIMIT ?`` seek on the table b-tree,
+    so that tables are never scanned in full.
+    Rows of ``WITHOUT ROWID`` and virtual tables are sampled from the first rows.
+
+    Args:
+        sample_size:
+            Maximum number of rows to sample per table.
+        time_budget:
+            Maximum seconds to spend on sampling per table.
+            Sampling stops with a partial result when the budget is exceeded.
+        chunk_size:
+            Number of consecutive rows read from each random rowid range.
+        seed:
+            Random seed to choose rowid ranges.
+    """
+
+    @property
+    def sample_size(self) -> int:
+        return self.__sample_size
+
+    @property
+    def time_budget(self) -> float:
+        return self.__time_budget
+
+    def __init__(
+        self,
+        sample_size: int = 1000,
+        time_budget: float = 1.0,
+        chunk_size: int = 64,
+        seed: Optional[int] = None,
+    ) -> None:
+        if sample_size < 1:
+            raise ValueError(f"sample_size must be greater than zero: {sample_size}")
+        if chunk_size < 1:
+            raise ValueError(f"chunk_size must be greater than zero: {chunk_size}")
+
+        self.__sample_size = sample_size
+        self.__time_budget = time_budget
+        self.__chunk_size = chunk_size
+        self.__random = random.Random(seed)
+
+    def profile(
+        self,
+        cur: sqlite3.Cursor,
+        schema_name: str,
+        table_name: str,
+        column_names: Sequence[str],
+        has_rowid: bool = True,
+    ) -> TableTypeProfile:
+        """
+        Profile a table.
+
+        Args:
+            cur:
+                Cursor of the database connection.
+            schema_name:
+                Schema name of the table.
+            table_name:
+                Table name to profile.
+            column_names:
+                Columns to profile.
+            has_rowid:
+                |False| for ``WITHOUT ROWID`` and virtual tables.
+        """
+
+        deadline = time.monotonic() + self.__time_budget
+        type_counts: dict[str, dict[str, int]] = {column: {} for column in column_names}
+        table = f"{quote_identifier(schema_name)}.{quote_identifier(table_name)}"
+        typeof_columns = ", ".join(f"typeof({quote_identifier(column)})" for column in column_names)
+
+        def count(records: list[tuple]) -> None:
+            for record in records:
+                for column, storage_class in zip(column_names, record):
+                    counts = type_counts[column]
+                    counts[storage_class] = counts.get(storage_class, 0) + 1
+
+        if not column_names:
+            return TableTypeProfile(table_name, type_counts, 0)
+
+        if not has_rowid:
+            records = cur.execute(
+                f"SELECT {typeof_columns} FROM {table} LIMIT ?", [self.__sample_size + 1]
+            ).fetchall()
+            is_full_scan = len(records) <= self.__sample_size
+            records = records[: self.__sample_size]
+            count(records)
+
+            return TableTypeProfile(table_name, type_counts, len(records), is_full_scan)
+
+        # min()/max() of the rowid are single b-tree seeks
+        min_rowid = cur.execute(f"SELECT min(rowid) FROM {table}").fetchone()[0]
+        max_rowid = cur.execute(f"SELECT max(rowid) FROM {table}").fetchone()[0]
+        if min_rowid is None:
+            return TableTypeProfile(table_name, type_counts, 0, is_full_scan=True)
+
+        if max_rowid - min_rowid < self.__sample_size:
+            records = cur.execute(f"SELECT {typeof_columns} FROM {table}").fetchall()
+            count(records)
+
+            return TableTypeProfile(table_name, type_counts, len(records), is_full_scan=True)
+
+        query = "SELECT rowid, {} FROM {} WHERE rowid >= ? ORDER BY rowid LIMIT ?".format(
+            typeof_columns, table
+        )
+        sampled_rowids: set[int] = set()
+        # bound the number of the ranges for sparse rowids
+        max_attempts = (self.__sample_size // self.__chunk_size + 1) * 4
+        is_time_budget_exceeded = False
+
+        for _ in range(max_attempts):
+            if len(sampled_rowids) >= self.__sample_size:
+                break
+            if time.monotonic() > deadline:
+                is_time_budget_exceeded = True
+                logger.debug(f"time budget exceeded while profiling a table: {table_name}")
+                break
+
+            limit = min(self.__chunk_size, self.__sample_size - len(sampled_rowids))
+            start_rowid = self.__random.randint(min_rowid, max_rowid)
+            records = []
+            for rowid, *storage_classes in cur.execute(query, [start_rowid, limit]):
+                if rowid not in sampled_rowids:
+                    sampled_rowids.add(rowid)
+                    records.append(storage_classes)
+            count(records)
+
+        return TableTypeProfile(
+            table_name,
+            type_counts,
+            len(sampled_rowids),
+            is_time_budget_exceeded=is_time_budget_exceeded,
+        )
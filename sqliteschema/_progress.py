@@ -0,0 +1,184 @@
+"""
+.. codeauthor:: Tsuyoshi Hombashi <tsuyoshi.hombashi@gmail.com>
+"""
+
+import sys
+import time
+from typing import IO, Callable, Final, NamedTuple, Optional
+
+
+# minimum seconds between the calls of a progress callback
+DEFAULT_PROGRESS_INTERVAL: Final = 0.1
+
+
+class ProgressInfo(NamedTuple):
+    #: number of the tables completed
+    tables_done: int
+    #: number of the tables to extract
+    tables_total: int
+    #: total length of the rendered table schemas (characters) of ``dumps()``
+    bytes_rendered: int
+    #: schema name of the table in progress
+    schema_name: Optional[str]
+    #: name of the table in progress. |None| when the run is finished
+    current_table: Optional[str]
+    #: seconds elapsed since the start of the run
+    elapsed_seconds: float
+
+    @property
+    def is_finished(self) -> bool:
+        return self.current_table is None and self.tables_done >= self.tables_total
+
+
+ProgressCallback = Callable[[ProgressInfo], None]
+
+
+class ProgressReporter:
+    """
+    Track the progress of a run and call a callback at most once per ``interval`` seconds.
+    The first and the last states of a run are always reported.
+
+    Args:
+        callback:
+            Function called with a :py:class:`ProgressInfo`.
+        interval:
+            Minimum seconds between the calls of the callback.
+    """
+
+    def __init__(
+        self, callback: ProgressCallback, interval: float = DEFAULT_PROGRESS_INTERVAL
+    ) -> None:
+        self.__callback = callback
+        self.__interval = interval
+        self.__start_time = time.monotonic()
+        self.__last_report_time: Optional[float] = None
+        self.__is_dirty = False
+
+        self.__tables_done = 0
+        self.__tables_total = 0
+        self.__bytes_rendered = 0
+        self.__schema_name: Optional[str] = None
+        self.__current_table: Optional[str] = None
+
+    def set_total(self, tables_total: int) -> None:
+        self.__tables_total = tables_total
+        self.__is_dirty = True
+        self.__report()
+
+    def begin(self, schema_name: str, table_name: str) -> None:
+        self.__schema_name = schema_name
+        self.__current_table = table_name
+        self.__is_dirty = True
+        self.__report()
+
+    def add_bytes(self, rendered_bytes: int) -> None:
+        self.__bytes_rendered += rendered_bytes
+        self.__is_dirty = True
+
+    def end(self) -> None:
+        self.__tables_done += 1
+        self.__current_table = None
+        self.__is_dirty = True
+        self.__report()
+
+    def close(self) -> None:
+        """
+        Report the last state if it is not reported yet.
+        """
+
+        self.__current_table = None
+        if self.__is_dirty:
+            self.__report(force=True)
+
+    def get_info(self) -> ProgressInfo:
+        return ProgressInfo(
+            tables_done=self.__tables_done,
+            tables_total=self.__tables_total,
+            bytes_rendered=self.__bytes_rendered,
+            schema_name=self.__schema_name,
+            current_table=self.__current_table,
+            elapsed_seconds=time.monotonic() - self.__start_time,
+        )
+
+    def __report(self, force: bool = False) -> None:
+        now = time.monotonic()
+        if (
+            not force
+            and self.__last_report_time is not None
+            and now - self.__last_report_time < self.__interval
+        ):
+            return
+
+        self.__last_report_time = now
+        self.__is_dirty = False
+        self.__callback(self.get_info())
+
+
+def _format_size(size: int) -> str:
+    value = float(size)
+    for unit in ("B", "KiB", "MiB"):
+        if value < 1024:
+            return f"{value:.0f} {unit}" if unit == "B" else f"{value:.1f} {unit}"
+        value /= 1024
+
+    return f"{value:.1f} GiB"
+
+
+class ProgressBar:
+    """
+    A progress callback that draws a progress bar on a terminal (``stderr`` by default).
+
+    :Sample Code:
+        .. code:: python
+
+            from sqliteschema import ProgressBar, SQLiteSchemaExtractor
+
+            extractor = SQLiteSchemaExtractor("sample.sqlite")
+            print(extractor.dumps(progress_callback=ProgressBar()))
+    """
+
+    def __init__(self, stream: Optional[IO[str]] = None, width: int = 30) -> None:
+        self.__stream = stream
+        self.__width = width
+        self.__line_length = 0
+
+    def __call__(self, info: ProgressInfo) -> None:
+        stream = self.__stream if self.__stream is not None else sys.stderr
+
+        if info.tables_total > 0:
+            filled = self.__width * min(info.tables_done, info.tables_total) // info.tables_total
+        else:
+            filled = self.__width if info.is_finished else 0
+
+        line = "[{}{}] {}/{} tables, {}, {:.1f}s".format(
+            "#" * filled,
+            "-" * (self.__width - filled),
+            info.tables_done,
+            info.tables_total,
+            _format_size(info.bytes_rendered),
+            info.elapsed_seconds,
+        )
+        if info.current_table is not None:
+            line += f": {info.current_table}"
+
+        # overwrite the previous line, including a longer table name
+        stream.write("\r" + line.ljust(self.__line_length))
+        self.__line_length = len(line)
+
+        if info.is_finished:
+            self.close()
+
+        stream.flush()
+
+    def close(self) -> None:
+        """
+        End the line of the progress bar, e.g. when a run is interrupted.
+        """
+
+        if self.__line_length == 0:
+            return
+
+        stream = self.__stream if self.__stream is not None else sys.stderr
+        stream.write("\n")
+        stream.flush()
+        self.__line_length = 0
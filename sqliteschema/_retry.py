@@ -0,0 +1,187 @@
+"""
+.. codeauthor:: Tsuyoshi Hombashi <tsuyoshi.hombashi@gmail.com>
+"""
+
+import random
+import sqlite3
+import threading
+import time
+from collections.abc import Iterable
+from typing import Any, Callable, Final, NamedTuple, Optional, TypeVar
+
+from ._logger import logger
+
+
+T = TypeVar("T")
+
+_SQLITE_BUSY: Final = 5
+_SQLITE_LOCKED: Final = 6
+_BUSY_MESSAGES: Final = ("database is locked", "database table is locked", "database is busy")
+
+
+def is_busy_error(error: BaseException) -> bool:
+    """
+    :return: |True| if the error is ``SQLITE_BUSY`` or ``SQLITE_LOCKED`` (including extended codes).
+    """
+
+    if not isinstance(error, sqlite3.OperationalError):
+        return False
+
+    error_code = getattr(error, "sqlite_errorcode", None)
+    if error_code is not None:
+        return error_code & 0xFF in (_SQLITE_BUSY, _SQLITE_LOCKED)
+
+    return str(error).startswith(_BUSY_MESSAGES)
+
+
+class RetryStats(NamedTuple):
+    #: number of statement executions that failed with busy/locked errors
+    busy_errors: int
+    #: number of retried executions
+    retries: int
+    #: number of statements that failed after all of the retries
+    exhausted: int
+    #: total seconds slept between the retries
+    wait_seconds: float
+
+
+class RetryPolicy:
+    """
+    Retry of statements that fail with ``SQLITE_BUSY``/``SQLITE_LOCKED``
+    (``database is locked``) with exponential backoff and full jitter:
+    the n-th retry waits a random time between zero and
+    ``min(max_delay, initial_delay * 2 ** n)`` seconds,
+    so that concurrent readers do not retry in lockstep.
+
+    Args:
+        max_retries:
+            Maximum number of retries of a statement. ``0`` disables retries.
+        initial_delay:
+            Upper bound of the wait seconds before the first retry.
+        max_delay:
+            Upper bound of the wait seconds before a retry.
+        seed:
+            Random seed of the jitter.
+    """
+
+    @property
+    def max_retries(self) -> int:
+        return self.__max_retries
+
+    @property
+    def initial_delay(self) -> float:
+        return self.__initial_delay
+
+    @property
+    def max_delay(self) -> float:
+        return self.__max_delay
+
+    def __init__(
+        self,
+        max_retries: int = 5,
+        initial_delay: float = 0.05,
+        max_delay: float = 2.0,
+        seed: Optional[int] = None,
+    ) -> None:
+        if max_retries < 0:
+            raise ValueError(f"max_retries must be greater than or equal to zero: {max_retries}")
+        if initial_delay < 0 or max_delay < 0:
+            raise ValueError("delays must be greater than or equal to zero")
+
+        self.__max_retries = max_retries
+        self.__initial_delay = initial_delay
+        self.__max_delay = max_delay
+        self.__random = random.Random(seed)
+        self.__lock = threading.Lock()
+
+    def __repr__(self) -> str:
+        return "RetryPolicy(max_retries={}, initial_delay={}, max_delay={})".format(
+            self.max_retries, self.initial_delay, self.max_delay
+        )
+
+    def calc_delay(self, attempt: int) -> float:
+        """
+        :return: Seconds to wait before the retry of the attempt (starts from zero).
+        """
+
+        upper_bound = min(self.__max_delay, self.__initial_delay * (2**attempt))
+        with self.__lock:
+            return self.__random.uniform(0, upper_bound)
+
+
+class StatementRetrier:
+    """
+    Execute statements with a :py:class:`RetryPolicy` and count the retries.
+
+    Args:
+        policy:
+            Retry policy.
+        check:
+            Function called before each retry to abort the retries by raising an exception.
+    """
+
+    def __init__(self, policy: RetryPolicy, check: Optional[Callable[[], None]] = None) -> None:
+        self.__policy = policy
+        self.__check = check
+        self.__lock = threading.Lock()
+        self.__busy_errors = 0
+        self.__retries = 0
+        self.__exhausted = 0
+        self.__wait_seconds = 0.0
+
+    def call(self, func: Callable[..., T], *args: Any) -> T:
+        attempt = 0
+        while True:
+            try:
+                return func(*args)
+            except sqlite3.OperationalError as e:
+                if not is_busy_error(e):
+                    raise
+
+                with self.__lock:
+                    self.__busy_errors += 1
+                    if attempt >= self.__policy.max_retries:
+                        self.__exhausted += 1
+                        raise
+
+                delay = self.__policy.calc_delay(attempt)
+                logger.debug(f"retry a statement in {delay:.3f} seconds: {e}")
+                time.sleep(delay)
+                if self.__check is not None:
+                    self.__check()
+
+                with self.__lock:
+                    self.__retries += 1
+                    self.__wait_seconds += delay
+                attempt += 1
+
+    def get_stats(self) -> RetryStats:
+        with self.__lock:
+            return RetryStats(
+                busy_errors=self.__busy_errors,
+                retries=self.__retries,
+                exhausted=self.__exhausted,
+                wait_seconds=self.__wait_seconds,
+            )
+
+
+class RetryingCursor(sqlite3.Cursor):
+    """
+    A cursor that executes statements with a :py:class:`StatementRetrier`.
+    Only the execution, which takes the locks, is retried:
+    fetching rows is never retried, so that no row is returned twice.
+    """
+
+    retrier: Optional[StatementRetrier] = None
+
+    def execute(self, sql: str, parameters: Any = (), /) -> "RetryingCursor":
+        if self.retrier is None:
+            return super().execute(sql, parameters)
+
+        return self.retrier.call(super().execute, sql, parameters)
+
+    def executemany(self, sql: str, seq_of_parameters: Iterable[Any], /) -> "RetryingCursor":
+        if self.retrier is None:
+            return super().executemany(sql, seq_of_parameters)
+
+        return self.retrier.call(super().executemany, sql, list(seq_of_parameters))
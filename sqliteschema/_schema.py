@@ -3,14 +3,33 @@
 """
 
 import io
-from collections.abc import Mapping
-from typing import Any, Optional
+from collections.abc import Mapping, Sequence
+from typing import Any, Final, Optional
 
 from mbstrdecoder import MultiByteStrDecoder
 from tabledata import TableData
 
-from ._const import MAX_VERBOSITY_LEVEL, SQLITE_SYSTEM_TABLES, SchemaHeader
+from ._const import (
+    DEFAULT_SCHEMA_NAME,
+    MAX_VERBOSITY_LEVEL,
+    SQLITE_SYSTEM_TABLES,
+    STATS_VERBOSITY_LEVEL,
+    SchemaHeader,
+)
+from ._ddl import normalize_create_table, normalize_statement, to_verbatim_statement
 from ._logger import logger
+from ._profile import TableTypeProfile
+from ._stats import TableStats
+from ._storage import TableStorageInfo
+
+
+_STATS_ATTR_KEYS: Final = {
+    SchemaHeader.NULL_FRACTION: "null_fraction",
+    SchemaHeader.DISTINCT_COUNT: "distinct_count",
+    SchemaHeader.MIN_VALUE: "min_value",
+    SchemaHeader.MAX_VALUE: "max_value",
+    SchemaHeader.AVG_LENGTH: "avg_length",
+}
 
 
 def bool_to_checkmark(value: Any) -> str:
@@ -27,6 +46,61 @@ class SQLiteTableSchema:
     def table_name(self) -> str:
         return self.__table_name
 
+    @property
+    def schema_name(self) -> Optional[str]:
+        return self.__schema_name
+
+    @property
+    def is_view(self) -> bool:
+        return self.__is_view
+
+    @property
+    def qualified_name(self) -> str:
+        """
+        Table name qualified with the schema name (e.g. ``aux.table``).
+        Tables in the ``main`` schema are not qualified.
+        """
+
+        if self.__schema_name in (None, DEFAULT_SCHEMA_NAME):
+            return self.__table_name
+
+        return f"{self.__schema_name}.{self.__table_name}"
+
+    @property
+    def storage_info(self) -> Optional[TableStorageInfo]:
+        """
+        Disk usage and approximate row count of the table.
+        |None| if the schema is extracted without storage information.
+        """
+
+        return self.__storage_info
+
+    @property
+    def type_profile(self) -> Optional[TableTypeProfile]:
+        """
+        Distribution of the storage classes of the sampled values of each column.
+        |None| if the schema is extracted without type profiling.
+        """
+
+        return self.__type_profile
+
+    @property
+    def column_stats(self) -> Optional[TableStats]:
+        """
+        Statistics of the values of each column.
+        |None| if the schema is extracted without column statistics.
+        """
+
+        return self.__column_stats
+
+    @property
+    def schema_version(self) -> Optional[int]:
+        """
+        ``PRAGMA schema_version`` of the schema that the table schema was extracted from.
+        """
+
+        return self.__schema_version
+
     @property
     def primary_key(self) -> Optional[str]:
         for attribute in self.__schema_map[self.__table_name]:
@@ -46,11 +120,27 @@ class SQLiteTableSchema:
     def __init__(
         self,
         table_name: str,
-        schema_map: Mapping[str, list[Mapping[str, Any]]],
+        schema_map: Mapping[str, Sequence[Mapping[str, Any]]],
         max_workers: Optional[int] = None,
+        schema_name: Optional[str] = None,
+        is_view: bool = False,
+        storage_info: Optional[TableStorageInfo] = None,
+        type_profile: Optional[TableTypeProfile] = None,
+        column_stats: Optional[TableStats] = None,
+        table_sql: Optional[str] = None,
+        index_sqls: Optional[Sequence[str]] = None,
+        schema_version: Optional[int] = None,
     ) -> None:
         self.__table_name = table_name
         self.__schema_map = schema_map
+        self.__schema_name = schema_name
+        self.__is_view = is_view
+        self.__storage_info = storage_info
+        self.__type_profile = type_profile
+        self.__column_stats = column_stats
+        self.__table_sql = table_sql
+        self.__index_sqls = list(index_sqls or [])
+        self.__schema_version = schema_version
         if max_workers is None or max_workers < 1:
             self.__max_workers = 1
         else:
@@ -78,25 +168,49 @@ class SQLiteTableSchema:
         return self.as_dict() != other.as_dict()
 
     def as_dict(self) -> dict[str, list[Mapping[str, Any]]]:
-        return {self.table_name: self.__schema_map[self.table_name]}
+        return {self.table_name: list(self.__schema_map[self.table_name])}
 
     def as_tabledata(self, verbosity_level: int = 0) -> TableData:
         value_matrix = []
         for attribute in self.__schema_map[self.__table_name]:
             value_matrix.append(
                 [
-                    attribute.get(attr_key)
+                    self.__get_attr_value(attribute, attr_key)
                     for attr_key in self.__get_target_schema_attr_keys(verbosity_level)
                 ]
             )
 
         return TableData(
-            self.__table_name,
+            self.__get_title(),
             self.__get_target_schema_attr_keys(verbosity_level),
             value_matrix,
             max_workers=self.__max_workers,
         )
 
+    def to_ddl(self) -> str:
+        """
+        Regenerate the ``CREATE TABLE`` statement of the table and the ``CREATE INDEX``
+        statements of its indexes in the canonical form:
+        normalized quoting, keyword/type case, column constraint order and layout.
+        Comments in the table definition are preserved.
+        Views and virtual tables are returned as defined.
+
+        :return: Statements separated by newlines.
+        :raises ValueError:
+            If the schema is not extracted from a database.
+        """
+
+        if self.__table_sql is None:
+            raise ValueError(f"the statement of '{self.qualified_name}' is not available")
+
+        if self.__is_view:
+            return to_verbatim_statement(self.__table_sql)
+
+        return "\n".join(
+            [normalize_create_table(self.__table_name, self.__table_sql)]
+            + [normalize_statement(index_sql) for index_sql in self.__index_sqls]
+        )
+
     def get_attr_names(self) -> list[str]:
         return [
             MultiByteStrDecoder(attribute[SchemaHeader.ATTR_NAME]).unicode_str
@@ -140,6 +254,8 @@ class SQLiteTableSchema:
             center_align_attr_keys = set(self.__get_target_schema_attr_keys(verbosity_level)) - {
                 SchemaHeader.ATTR_NAME,
                 SchemaHeader.DATA_TYPE,
+                SchemaHeader.STORAGE_CLASS,
+                *_STATS_ATTR_KEYS,
                 SchemaHeader.NULLABLE,
                 SchemaHeader.KEY,
                 SchemaHeader.DEFAULT,
@@ -161,60 +277,114 @@ class SQLiteTableSchema:
 
         return writer.stream.getvalue()
 
+    def __get_title(self) -> str:
+        if self.__storage_info is None:
+            return self.qualified_name
+
+        summary = self.__storage_info.to_summary()
+        if not summary:
+            return self.qualified_name
+
+        return f"{self.qualified_name:s} ({summary:s})"
+
+    def __get_attr_value(self, attribute: Mapping[str, Any], attr_key: str) -> Any:
+        if attr_key == SchemaHeader.STORAGE_CLASS:
+            return self.__get_storage_class_summary(attribute)
+        if attr_key in _STATS_ATTR_KEYS:
+            return self.__get_stats_value(attribute, attr_key)
+
+        return attribute.get(attr_key)
+
+    def __get_storage_class_summary(self, attribute: Mapping[str, Any]) -> str:
+        if self.__type_profile is None:
+            return ""
+
+        return self.__type_profile.to_summary(attribute[SchemaHeader.ATTR_NAME])
+
+    def __get_stats_value(self, attribute: Mapping[str, Any], attr_key: str) -> Any:
+        if self.__column_stats is None:
+            return ""
+
+        column_stats = self.__column_stats.get(attribute[SchemaHeader.ATTR_NAME])
+        if column_stats is None:
+            return ""
+
+        return column_stats.to_display_values()[_STATS_ATTR_KEYS[attr_key]]
+
     def __get_target_schema_attr_keys(self, verbosity_level: int) -> tuple:
+        if self.__type_profile is None:
+            type_attr_keys: tuple = (SchemaHeader.DATA_TYPE,)
+        else:
+            type_attr_keys = (SchemaHeader.DATA_TYPE, SchemaHeader.STORAGE_CLASS)
+
         if verbosity_level <= 0:
-            return (SchemaHeader.ATTR_NAME, SchemaHeader.DATA_TYPE)
+            return (SchemaHeader.ATTR_NAME,) + type_attr_keys
 
-        return (
+        attr_keys = (
             SchemaHeader.ATTR_NAME,
-            SchemaHeader.DATA_TYPE,
+            *type_attr_keys,
             SchemaHeader.NULLABLE,
             SchemaHeader.KEY,
             SchemaHeader.DEFAULT,
             SchemaHeader.INDEX,
             SchemaHeader.EXTRA,
         )
+        if self.__column_stats is None or verbosity_level < STATS_VERBOSITY_LEVEL:
+            return attr_keys
+
+        return attr_keys + tuple(_STATS_ATTR_KEYS)
+
+    def __get_type_text(self, attr_map: Mapping[str, Any]) -> str:
+        # columns of views defined by expressions have no type
+        data_type = attr_map[SchemaHeader.DATA_TYPE] or ""
+        summary = self.__get_storage_class_summary(attr_map)
+        if not summary:
+            return data_type
+
+        return "{:s} [{:s}]".format(data_type, summary)
 
     def __dumps_text(self, verbosity_level: int) -> str:
         if verbosity_level <= 0:
-            return self.table_name
+            return self.__get_title()
 
         attr_map_list = self.as_dict()[self.table_name]
 
         if verbosity_level == 1:
             attr_desc_list = [attr_map[SchemaHeader.ATTR_NAME] for attr_map in attr_map_list]
 
-            return "{:s} ({:s})".format(self.table_name, ", ".join(attr_desc_list))
+            return "{:s} ({:s})".format(self.__get_title(), ", ".join(attr_desc_list))
 
         if verbosity_level == 2:
             attr_desc_list = [
-                "{:s} {:s}".format(
-                    attr_map[SchemaHeader.ATTR_NAME], attr_map[SchemaHeader.DATA_TYPE]
+                " ".join(
+                    item
+                    for item in (attr_map[SchemaHeader.ATTR_NAME], self.__get_type_text(attr_map))
+                    if item
                 )
                 for attr_map in attr_map_list
             ]
 
-            return "{:s} ({:s})".format(self.table_name, ", ".join(attr_desc_list))
+            return "{:s} ({:s})".format(self.__get_title(), ", ".join(attr_desc_list))
 
         if verbosity_level >= 3:
             attr_desc_list = []
             for attr_map in attr_map_list:
                 attr_item_list = [
                     attr_map[SchemaHeader.ATTR_NAME],
-                    attr_map[SchemaHeader.DATA_TYPE],
+                    self.__get_type_text(attr_map),
                 ]
                 for key in [SchemaHeader.KEY, SchemaHeader.NULLABLE]:
                     if attr_map.get(key):
                         attr_item_list.append(key)
 
-                attr_desc_list.append(" ".join(attr_item_list))
+                attr_desc_list.append(" ".join(item for item in attr_item_list if item))
 
             if verbosity_level == 3:
-                return "{:s} ({:s})".format(self.table_name, ", ".join(attr_desc_list))
+                return "{:s} ({:s})".format(self.__get_title(), ", ".join(attr_desc_list))
 
             if verbosity_level >= 4:
                 return "\n".join(
-                    [f"{self.table_name:s} ("]
+                    [f"{self.__get_title():s} ("]
                     + [",\n".join([f"    {line:s}" for line in attr_desc_list])]
                     + [")\n"]
                 )
@@ -0,0 +1,370 @@
+"""
+.. codeauthor:: Tsuyoshi Hombashi <tsuyoshi.hombashi@gmail.com>
+"""
+
+import codecs
+import itertools
+import re
+import sqlite3
+import zlib
+from collections.abc import Iterable, Iterator
+from typing import IO, Any, Callable, Final, Optional
+
+from ._logger import logger
+from ._source import _MAGIC_GZIP, _MAGIC_SIZE, _MAGIC_ZSTD, _iter_chunks
+
+
+SQL_SCRIPT_EXTENSIONS: Final = (".sql", ".sql.gz", ".sql.zst")
+
+# statements are classified by the leading words within this length
+_MAX_HEAD_SIZE: Final = 4096
+# e.g. INSERT OR REPLACE INTO main.sqlite_schema
+_MAX_HEAD_WORDS: Final = 6
+
+_DDL_KEYWORDS: Final = frozenset(["CREATE", "ALTER", "DROP"])
+_SCHEMA_TABLE_NAMES: Final = frozenset(["sqlite_master", "sqlite_schema"])
+
+# plain text and complete quoted strings: an escaped quote ('') is lexed
+# as two adjacent strings, which does not change where statements end
+_PLAIN_PATTERN: Final = (
+    r"(?:[^;'\"`\[\-/]+|'[^']*'|\"[^\"]*\"|`[^`]*`|\[[^\]]*\]|-(?=[^-])|/(?=[^*]))*"
+)
+_RE_PLAIN: Final = re.compile(_PLAIN_PATTERN)
+# a whole data statement without comments, to skip data rows with a single match
+_RE_DATA_STATEMENT: Final = re.compile(
+    r"\s*(?:INSERT|REPLACE)\s+(?:OR\s+\w+\s+)?INTO\s+"
+    r"(?![^\s(]*sqlite_(?:master|schema)\b)" + _PLAIN_PATTERN + ";",
+    re.IGNORECASE,
+)
+_RE_HEAD_WORD: Final = re.compile(r"\"[^\"]*\"|`[^`]*`|\[[^\]]*\]|[A-Za-z_]\w*")
+_QUOTE_ENDS: Final = {"'": "'", '"': '"', "`": "`", "[": "]"}
+
+_KEEP: Final = "keep"
+_SKIP: Final = "skip"
+
+
+def _unquote(word: str) -> str:
+    if word[:1] in _QUOTE_ENDS:
+        return word[1:-1]
+
+    return word
+
+
+def _classify(head: str, is_complete: bool) -> Optional[str]:
+    # decide whether a statement is a part of the schema from its leading words:
+    # DDL, and the sqlite_schema rows and writable_schema pragmas that
+    # the .dump command of the sqlite3 shell writes for virtual tables
+    matches = list(itertools.islice(_RE_HEAD_WORD.finditer(head), _MAX_HEAD_WORDS))
+    is_undecidable = is_complete or len(head) >= _MAX_HEAD_SIZE
+    if matches and matches[-1].end() == len(head) and not is_undecidable:
+        # the last word may continue in the next chunk
+        matches.pop()
+    words = [_unquote(match.group()) for match in matches]
+
+    if not words:
+        return _SKIP if is_undecidable else None
+
+    keyword = words[0].upper()
+
+    if keyword in _DDL_KEYWORDS:
+        return _KEEP
+
+    if keyword in ("INSERT", "REPLACE"):
+        upper_words = [word.upper() for word in words]
+        if "INTO" in upper_words[:-2] or ("INTO" in upper_words[:-1] and is_undecidable):
+            # the table name may be qualified by a schema name
+            into = upper_words.index("INTO")
+            table_names = {word.lower() for word in words[into + 1 : into + 3]}
+            return _KEEP if table_names & _SCHEMA_TABLE_NAMES else _SKIP
+    elif keyword == "PRAGMA":
+        if len(words) > 1:
+            return _KEEP if words[1].lower() == "writable_schema" else _SKIP
+    else:
+        return _SKIP
+
+    return _SKIP if is_undecidable else None
+
+
+class SQLScriptSplitter:
+    """
+    Split a SQL script fed by chunks into the schema statements
+    (``CREATE``/``ALTER``/``DROP``).
+    Other statements, such as ``INSERT`` of data rows, are scanned without
+    being buffered, so that the memory usage is bounded by the size of
+    the largest schema statement regardless of the size of the script.
+    """
+
+    def __init__(self) -> None:
+        self.__pending = ""
+        self.__quote: Optional[str] = None
+        self.__comment: Optional[str] = None
+        self.__reset()
+
+    def feed(self, chunk: str) -> Iterator[str]:
+        """
+        Feed a chunk of the script.
+
+        :return: Schema statements completed by the chunk.
+        """
+
+        text = self.__pending + chunk
+        self.__pending = ""
+
+        yield from self.__scan(text, is_final=False)
+
+    def close(self) -> Iterator[str]:
+        """
+        :return: The last schema statement if the script does not end with a semicolon.
+        """
+
+        text = self.__pending
+        self.__pending = ""
+
+        yield from self.__scan(text, is_final=True)
+
+        if self.__mode != _SKIP and self.__buf.strip():
+            self.__decide(is_complete=True)
+            if self.__mode == _KEEP:
+                yield self.__buf.strip()
+
+        self.__reset()
+
+    def __reset(self) -> None:
+        self.__buf = ""
+        self.__mode: Optional[str] = None
+
+    def __append(self, text: str) -> None:
+        if self.__mode == _SKIP:
+            return
+
+        self.__buf += text
+        if self.__mode is None:
+            self.__decide(is_complete=False)
+
+    def __decide(self, is_complete: bool) -> None:
+        self.__mode = _classify(self.__buf, is_complete)
+        if self.__mode == _SKIP:
+            self.__buf = ""
+
+    def __scan(self, text: str, is_final: bool) -> Iterator[str]:
+        pos = 0
+        end = len(text)
+
+        while pos < end:
+            if self.__comment == "--":
+                newline = text.find("\n", pos)
+                if newline < 0:
+                    self.__append_comment(text[pos:])
+                    return
+                self.__append_comment(text[pos : newline + 1])
+                self.__comment = None
+                pos = newline + 1
+                continue
+
+            if self.__comment == "/*":
+                close = text.find("*/", pos)
+                if close < 0:
+                    # keep a trailing "*" that may be a part of "*/" in the next chunk
+                    split = end if is_final or not text.endswith("*") else end - 1
+                    self.__append_comment(text[pos:split])
+                    self.__pending = text[split:]
+                    return
+                self.__append_comment(text[pos : close + 2])
+                self.__comment = None
+                pos = close + 2
+                continue
+
+            if self.__quote is not None:
+                close = text.find(_QUOTE_ENDS[self.__quote], pos)
+                if close < 0:
+                    self.__append(text[pos:])
+                    return
+                self.__append(text[pos : close + 1])
+                self.__quote = None
+                pos = close + 1
+                continue
+
+            if self.__mode is None and not self.__buf:
+                match = _RE_DATA_STATEMENT.match(text, pos)
+                if match is not None:
+                    pos = match.end()
+                    continue
+
+            plain_end = _RE_PLAIN.match(text, pos).end()  # type: ignore[union-attr]
+            if plain_end > pos:
+                self.__append(text[pos:plain_end])
+                pos = plain_end
+                if pos == end:
+                    return
+
+            if text.startswith(("--", "/*"), pos):
+                self.__comment = text[pos : pos + 2]
+                self.__append_comment(self.__comment)
+                pos += 2
+            elif text[pos] == ";":
+                self.__append(";")
+                pos += 1
+                statement = self.__end_statement()
+                if statement:
+                    yield statement
+            elif text[pos] in _QUOTE_ENDS:
+                self.__append(text[pos])
+                self.__quote = text[pos]
+                pos += 1
+            elif is_final:
+                self.__append(text[pos:])
+                return
+            else:
+                # a trailing "-" or "/" may start a comment in the next chunk
+                self.__pending = text[pos:]
+                return
+
+    def __append_comment(self, text: str) -> None:
+        # comments before the leading words of a statement are not a part of the statement
+        if self.__mode == _KEEP:
+            self.__buf += text
+        elif self.__mode is None and self.__buf:
+            # a comment separates words
+            self.__buf += " "
+
+    def __end_statement(self) -> Optional[str]:
+        if self.__mode is None:
+            self.__decide(is_complete=True)
+
+        if self.__mode != _KEEP:
+            self.__reset()
+            return None
+
+        # semicolons in the body of a CREATE TRIGGER statement do not end the statement
+        if not sqlite3.complete_statement(self.__buf):
+            return None
+
+        statement = self.__buf.strip()
+        self.__reset()
+
+        return statement
+
+
+def iter_schema_statements(chunks: Iterable[str]) -> Iterator[str]:
+    """
+    Extract the schema statements from a SQL script given by chunks of text.
+    """
+
+    splitter = SQLScriptSplitter()
+
+    for chunk in chunks:
+        yield from splitter.feed(chunk)
+
+    yield from splitter.close()
+
+
+def _decompress_gzip_chunks(chunks: Iterator[bytes]) -> Iterator[bytes]:
+    decompressor = zlib.decompressobj(16 + zlib.MAX_WBITS)
+
+    for chunk in chunks:
+        while chunk:
+            yield decompressor.decompress(chunk)
+            # a gzip file may consist of multiple members
+            chunk = decompressor.unused_data
+            if chunk:
+                decompressor = zlib.decompressobj(16 + zlib.MAX_WBITS)
+
+    yield decompressor.flush()
+
+
+def _decompress_zstd_chunks(chunks: Iterator[bytes]) -> Iterator[bytes]:
+    try:
+        import zstandard  # type: ignore[import-not-found]
+    except ImportError:
+        raise RuntimeError(
+            "zstandard package required to read zstd compressed sources: "
+            "pip install sqliteschema[zstd]"
+        )
+
+    decompressor: Any = zstandard.ZstdDecompressor().decompressobj()
+    for chunk in chunks:
+        yield decompressor.decompress(chunk)
+
+
+def iter_script_chunks(stream: IO[bytes], encoding: str = "utf-8") -> Iterator[str]:
+    """
+    Read a SQL script from a binary stream by chunks.
+    gzip/zstd compressed streams are decompressed on the fly.
+    Undecodable bytes, which can be only in the skipped data statements
+    of a schema, are replaced.
+    """
+
+    head = stream.read(_MAGIC_SIZE)
+    chunks = _iter_chunks(head, stream)
+
+    if head.startswith(_MAGIC_GZIP):
+        chunks = _decompress_gzip_chunks(chunks)
+    elif head.startswith(_MAGIC_ZSTD):
+        chunks = _decompress_zstd_chunks(chunks)
+
+    decoder = codecs.getincrementaldecoder(encoding)(errors="replace")
+    for chunk in chunks:
+        text = decoder.decode(chunk)
+        if text:
+            yield text
+
+    text = decoder.decode(b"", final=True)
+    if text:
+        yield text
+
+
+def iter_text_chunks(stream: IO[str], chunk_size: int = 1024 * 1024) -> Iterator[str]:
+    while True:
+        chunk = stream.read(chunk_size)
+        if not chunk:
+            break
+        yield chunk
+
+
+def _iter_checked_chunks(chunks: Iterable[str], check: Callable[[], None]) -> Iterator[str]:
+    for chunk in chunks:
+        check()
+        yield chunk
+
+
+def load_sql_script(
+    chunks: Iterable[str], check: Optional[Callable[[], None]] = None
+) -> sqlite3.Connection:
+    """
+    Execute the schema statements of a SQL script into a new in-memory connection.
+    Data statements are skipped, so that the connection has the schema only.
+
+    Args:
+        chunks:
+            Chunks of the script.
+        check:
+            Function called before reading each chunk to abort the load by raising an exception.
+    """
+
+    if check is not None:
+        chunks = _iter_checked_chunks(chunks, check)
+
+    con = sqlite3.connect(":memory:", isolation_level=None, check_same_thread=False)
+    statement_count = 0
+
+    try:
+        con.execute("BEGIN")
+        for statement in iter_schema_statements(chunks):
+            try:
+                con.execute(statement)
+            except sqlite3.Error as e:
+                raise sqlite3.OperationalError(
+                    "failed to execute a statement of the SQL script: {}: {}".format(
+                        e, statement[:_MAX_HEAD_SIZE]
+                    )
+                )
+            statement_count += 1
+        con.execute("PRAGMA writable_schema = OFF")
+        con.execute("COMMIT")
+    except BaseException:
+        con.close()
+        raise
+
+    logger.debug(f"loaded a SQL script: statements={statement_count}")
+
+    return con
@@ -0,0 +1,170 @@
+"""
+.. codeauthor:: Tsuyoshi Hombashi <tsuyoshi.hombashi@gmail.com>
+"""
+
+import io
+import sqlite3
+import zipfile
+import zlib
+from collections.abc import Iterator
+from typing import IO, Any, Final, Union
+
+from ._logger import logger
+
+
+BytesSource = Union[bytes, bytearray, memoryview]
+
+_CHUNK_SIZE: Final = 1024 * 1024
+
+_MAGIC_GZIP: Final = b"\x1f\x8b"
+_MAGIC_ZIP: Final = b"PK\x03\x04"
+_MAGIC_ZSTD: Final = b"\x28\xb5\x2f\xfd"
+_MAGIC_SIZE: Final = 4
+
+# offsets of the file format write/read versions in the database header: 2 for WAL mode
+_WAL_VERSION_OFFSETS: Final = (18, 19)
+_LEGACY_VERSION: Final = 1
+
+
+def _is_compressed(magic: bytes) -> bool:
+    return any(magic.startswith(m) for m in (_MAGIC_GZIP, _MAGIC_ZIP, _MAGIC_ZSTD))
+
+
+def is_compressed_file(file_path: str) -> bool:
+    with open(file_path, "rb") as f:
+        return _is_compressed(f.read(_MAGIC_SIZE))
+
+
+def _iter_chunks(head: bytes, stream: IO[bytes]) -> Iterator[bytes]:
+    if head:
+        yield head
+
+    while True:
+        chunk = stream.read(_CHUNK_SIZE)
+        if not chunk:
+            break
+        yield chunk
+
+
+def _decompress_gzip(chunks: Iterator[bytes]) -> bytearray:
+    buf = bytearray()
+    decompressor = zlib.decompressobj(16 + zlib.MAX_WBITS)
+
+    for chunk in chunks:
+        while chunk:
+            buf += decompressor.decompress(chunk)
+            # a gzip file may consist of multiple members
+            chunk = decompressor.unused_data
+            if chunk:
+                decompressor = zlib.decompressobj(16 + zlib.MAX_WBITS)
+
+    buf += decompressor.flush()
+
+    return buf
+
+
+def _decompress_zstd(chunks: Iterator[bytes]) -> bytearray:
+    try:
+        import zstandard  # type: ignore[import-not-found]
+    except ImportError:
+        raise RuntimeError(
+            "zstandard package required to read zstd compressed sources: "
+            "pip install sqliteschema[zstd]"
+        )
+
+    buf = bytearray()
+    decompressor: Any = zstandard.ZstdDecompressor().decompressobj()
+    for chunk in chunks:
+        buf += decompressor.decompress(chunk)
+
+    return buf
+
+
+def _decompress_zip(stream: IO[bytes]) -> bytearray:
+    with zipfile.ZipFile(stream) as zip_file:
+        members = [info for info in zip_file.infolist() if not info.is_dir()]
+        if not members:
+            raise ValueError("no database file found in the zip archive")
+
+        member = members[0]
+        logger.debug(f"read a database file from a zip archive: {member.filename}")
+
+        buf = bytearray()
+        with zip_file.open(member) as f:
+            for chunk in _iter_chunks(b"", f):
+                buf += chunk
+
+        return buf
+
+
+def read_database_stream(stream: IO[bytes]) -> bytearray:
+    """
+    Read a database image from a binary stream.
+    gzip/zstd compressed streams are decompressed on the fly by chunks, so the
+    compressed data is never held in memory as a whole.
+    zip archives (the first file in the archive is read) require a seekable stream.
+    """
+
+    head = stream.read(_MAGIC_SIZE)
+
+    if head.startswith(_MAGIC_GZIP):
+        return _decompress_gzip(_iter_chunks(head, stream))
+
+    if head.startswith(_MAGIC_ZSTD):
+        return _decompress_zstd(_iter_chunks(head, stream))
+
+    if head.startswith(_MAGIC_ZIP):
+        if not stream.seekable():
+            raise ValueError("zip archive sources must be seekable")
+
+        stream.seek(-len(head), io.SEEK_CUR)
+        return _decompress_zip(stream)
+
+    buf = bytearray()
+    for chunk in _iter_chunks(head, stream):
+        buf += chunk
+
+    return buf
+
+
+def _is_wal_image(data: BytesSource) -> bool:
+    return any(
+        len(data) > offset and data[offset] != _LEGACY_VERSION for offset in _WAL_VERSION_OFFSETS
+    )
+
+
+def deserialize(data: BytesSource, is_owner: bool = False) -> sqlite3.Connection:
+    """
+    Load a database image into a new in-memory connection.
+    Compressed images are decompressed before loading.
+
+    Args:
+        data:
+            Database image.
+        is_owner:
+            If |True|, ``data`` is a ``bytearray`` that may be modified in place.
+    """
+
+    # the connection may be shared among threads
+    con = sqlite3.connect(":memory:", check_same_thread=False)
+    if not hasattr(con, "deserialize"):
+        con.close()
+        raise RuntimeError("loading a database from bytes requires Python 3.11 or later")
+
+    if _is_compressed(bytes(data[:_MAGIC_SIZE])):
+        data = read_database_stream(io.BytesIO(data))
+        is_owner = True
+
+    if _is_wal_image(data):
+        # an in-memory database cannot be opened in WAL mode:
+        # mark the image as a rollback journal mode database
+        if not (is_owner and isinstance(data, bytearray)):
+            data = bytearray(data)
+        for offset in _WAL_VERSION_OFFSETS:
+            data[offset] = _LEGACY_VERSION
+
+    # pass the buffer as is: the image is copied only once, into the SQLite heap
+    # (images of WAL mode databases are copied once more to modify the header)
+    con.deserialize(data)  # type: ignore[attr-defined]
+
+    return con
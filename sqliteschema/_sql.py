@@ -0,0 +1,21 @@
+"""
+.. codeauthor:: Tsuyoshi Hombashi <tsuyoshi.hombashi@gmail.com>
+"""
+
+from ._const import DEFAULT_SCHEMA_NAME
+
+
+def quote_identifier(name: str) -> str:
+    return '"{}"'.format(name.replace('"', '""'))
+
+
+def qualify_name(schema_name: str, name: str) -> str:
+    """
+    Qualify a name with the schema name (e.g. ``aux.table``).
+    Names in the ``main`` schema are not qualified.
+    """
+
+    if schema_name == DEFAULT_SCHEMA_NAME:
+        return name
+
+    return f"{schema_name}.{name}"
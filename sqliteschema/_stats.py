@@ -0,0 +1,365 @@
+"""
+.. codeauthor:: Tsuyoshi Hombashi <tsuyoshi.hombashi@gmail.com>
+"""
+
+import decimal
+import hashlib
+import math
+import numbers
+import sqlite3
+from collections.abc import Iterable, Sequence
+from typing import Any, Final, Optional
+
+from ._logger import logger
+from ._sql import quote_identifier
+
+
+_HASH_BITS: Final = 64
+_MAX_DISPLAY_LENGTH: Final = 32
+
+# SQLite sorts values of different storage classes in this order
+_STORAGE_CLASS_RANKS: Final = {int: 0, float: 0, str: 1, bytes: 2}
+
+
+def _encode_value(value: Any) -> bytes:
+    if isinstance(value, bytes):
+        return b"b" + value
+    if isinstance(value, str):
+        return b"s" + value.encode("utf-8", "surrogatepass")
+    if isinstance(value, float) and value.is_integer():
+        # 1 and 1.0 are the same value for SQLite
+        value = int(value)
+
+    return b"n" + repr(value).encode("ascii")
+
+
+def _to_storage_value(value: Any) -> Any:
+    # values converted by the detect_types/converters of a connection (e.g. datetime, Decimal)
+    # are handled as the storage class that SQLite stores them as
+    if type(value) in _STORAGE_CLASS_RANKS:
+        return value
+    if isinstance(value, numbers.Integral):
+        return int(value)
+    if isinstance(value, (numbers.Real, decimal.Decimal)):
+        return float(value)
+    if isinstance(value, (bytes, bytearray, memoryview)):
+        return bytes(value)
+
+    return str(value)
+
+
+def _calc_length(value: Any) -> int:
+    # follows length() of SQLite: characters of text, bytes of blob,
+    # and characters of the text representation of numbers
+    if isinstance(value, (str, bytes)):
+        return len(value)
+
+    return len(str(value))
+
+
+def _to_display_value(value: Any) -> Any:
+    if isinstance(value, bytes):
+        hex_value = value[: _MAX_DISPLAY_LENGTH // 2].hex()
+        return "x'{}'{}".format(hex_value, "..." if len(value) > _MAX_DISPLAY_LENGTH // 2 else "")
+    if isinstance(value, str) and len(value) > _MAX_DISPLAY_LENGTH:
+        return value[:_MAX_DISPLAY_LENGTH] + "..."
+
+    return value
+
+
+class HyperLogLog:
+    """
+    HyperLogLog sketch to estimate the number of distinct values with
+    a constant memory (``2 ** precision`` bytes).
+    The standard error of the estimation is about ``1.04 / sqrt(2 ** precision)``.
+
+    Args:
+        precision:
+            Number of bits of hash values to choose a register (4 to 16).
+    """
+
+    @property
+    def precision(self) -> int:
+        return self.__precision
+
+    def __init__(self, precision: int = 12) -> None:
+        if not 4 <= precision <= 16:
+            raise ValueError(f"precision must be in [4, 16]: {precision}")
+
+        self.__precision = precision
+        self.__num_registers = 1 << precision
+        self.__registers = bytearray(self.__num_registers)
+        self.__rank_bits = _HASH_BITS - precision
+        self.__rank_mask = (1 << self.__rank_bits) - 1
+
+    def add(self, value: Any) -> None:
+        hash_value = int.from_bytes(
+            hashlib.blake2b(_encode_value(value), digest_size=8).digest(), "little"
+        )
+        index = hash_value >> self.__rank_bits
+        rank = self.__rank_bits - (hash_value & self.__rank_mask).bit_length() + 1
+
+        if rank > self.__registers[index]:
+            self.__registers[index] = rank
+
+    def merge(self, other: "HyperLogLog") -> None:
+        if other.precision != self.precision:
+            raise ValueError("precisions of the sketches must be the same")
+
+        self.__registers = bytearray(map(max, self.__registers, other.__registers))
+
+    def estimate(self) -> int:
+        m = self.__num_registers
+        if m >= 128:
+            alpha = 0.7213 / (1 + 1.079 / m)
+        else:
+            alpha = {16: 0.673, 32: 0.697, 64: 0.709}[m]
+
+        raw_estimate = alpha * m * m / sum(2.0**-register for register in self.__registers)
+        zero_count = self.__registers.count(0)
+        if raw_estimate <= 2.5 * m and zero_count:
+            # linear counting is more accurate for small cardinalities
+            return round(m * math.log(m / zero_count))
+
+        return round(raw_estimate)
+
+
+class ColumnStats:
+    """
+    Statistics of the values of a column.
+    Minimum/maximum values are compared in the same order as SQLite:
+    numbers, then texts, then blobs.
+    """
+
+    @property
+    def column_name(self) -> str:
+        return self.__column_name
+
+    @property
+    def row_count(self) -> int:
+        return self.__row_count
+
+    @property
+    def null_count(self) -> int:
+        return self.__null_count
+
+    @property
+    def null_fraction(self) -> Optional[float]:
+        if not self.__row_count:
+            return None
+
+        return self.__null_count / self.__row_count
+
+    @property
+    def min_value(self) -> Any:
+        return self.__min_value
+
+    @property
+    def max_value(self) -> Any:
+        return self.__max_value
+
+    @property
+    def avg_length(self) -> Optional[float]:
+        """
+        Average ``length()`` of the non-NULL values.
+        """
+
+        value_count = self.__row_count - self.__null_count
+        if not value_count:
+            return None
+
+        return self.__total_length / value_count
+
+    @property
+    def distinct_count(self) -> int:
+        """
+        Approximate number of the distinct non-NULL values.
+        """
+
+        return self.__distinct_count
+
+    def __init__(
+        self,
+        column_name: str,
+        row_count: int,
+        null_count: int,
+        min_value: Any,
+        max_value: Any,
+        total_length: int,
+        distinct_count: int,
+    ) -> None:
+        self.__column_name = column_name
+        self.__row_count = row_count
+        self.__null_count = null_count
+        self.__min_value = min_value
+        self.__max_value = max_value
+        self.__total_length = total_length
+        self.__distinct_count = distinct_count
+
+    def __repr__(self) -> str:
+        return "ColumnStats(column={}, null_fraction={}, distinct_count={})".format(
+            self.column_name, self.null_fraction, self.distinct_count
+        )
+
+    def as_dict(self) -> dict[str, Any]:
+        return {
+            "column_name": self.column_name,
+            "row_count": self.row_count,
+            "null_count": self.null_count,
+            "null_fraction": self.null_fraction,
+            "min_value": self.min_value,
+            "max_value": self.max_value,
+            "avg_length": self.avg_length,
+            "distinct_count": self.distinct_count,
+        }
+
+    def to_display_values(self) -> dict[str, Any]:
+        """
+        :return:
+            Mapping of ``null_fraction``, ``distinct_count``, ``min_value``, ``max_value``
+            and ``avg_length`` to human readable values.
+        """
+
+        return {
+            "null_fraction": (
+                "" if self.null_fraction is None else "{:.1%}".format(self.null_fraction)
+            ),
+            "distinct_count": self.distinct_count,
+            "min_value": _to_display_value(self.min_value),
+            "max_value": _to_display_value(self.max_value),
+            "avg_length": "" if self.avg_length is None else round(self.avg_length, 1),
+        }
+
+
+class TableStats:
+    """
+    Statistics of the columns of a table.
+    """
+
+    @property
+    def table_name(self) -> str:
+        return self.__table_name
+
+    @property
+    def row_count(self) -> int:
+        return self.__row_count
+
+    @property
+    def column_names(self) -> list[str]:
+        return list(self.__column_stats)
+
+    def __init__(
+        self, table_name: str, row_count: int, column_stats: Iterable[ColumnStats]
+    ) -> None:
+        self.__table_name = table_name
+        self.__row_count = row_count
+        self.__column_stats = {stats.column_name: stats for stats in column_stats}
+
+    def __repr__(self) -> str:
+        return "TableStats(table={}, rows={}, columns={})".format(
+            self.table_name, self.row_count, len(self.__column_stats)
+        )
+
+    def get(self, column_name: str) -> Optional[ColumnStats]:
+        return self.__column_stats.get(column_name)
+
+    def as_dict(self) -> dict[str, Any]:
+        return {
+            "table_name": self.table_name,
+            "row_count": self.row_count,
+            "columns": [stats.as_dict() for stats in self.__column_stats.values()],
+        }
+
+
+class _ColumnAccumulator:
+    def __init__(self, column_name: str, precision: int) -> None:
+        self.column_name = column_name
+        self.null_count = 0
+        self.total_length = 0
+        self.min_key: Optional[tuple] = None
+        self.max_key: Optional[tuple] = None
+        self.sketch = HyperLogLog(precision)
+
+    def update(self, value: Any) -> None:
+        if value is None:
+            self.null_count += 1
+            return
+
+        value = _to_storage_value(value)
+        key = (_STORAGE_CLASS_RANKS[type(value)], value)
+        if self.min_key is None or key < self.min_key:
+            self.min_key = key
+        if self.max_key is None or key > self.max_key:
+            self.max_key = key
+
+        self.total_length += _calc_length(value)
+        self.sketch.add(value)
+
+    def to_stats(self, row_count: int) -> ColumnStats:
+        return ColumnStats(
+            self.column_name,
+            row_count=row_count,
+            null_count=self.null_count,
+            min_value=None if self.min_key is None else self.min_key[1],
+            max_value=None if self.max_key is None else self.max_key[1],
+            total_length=self.total_length,
+            distinct_count=self.sketch.estimate(),
+        )
+
+
+class ColumnStatsCollector:
+    """
+    Compute statistics of the columns of tables by streaming each table once.
+    Memory usage per column is constant regardless of the number of rows:
+    distinct counts are estimated by :py:class:`HyperLogLog` sketches.
+
+    Args:
+        precision:
+            Precision of the :py:class:`HyperLogLog` sketches.
+        fetch_size:
+            Number of rows to fetch from a cursor at once.
+    """
+
+    def __init__(self, precision: int = 12, fetch_size: int = 1024) -> None:
+        HyperLogLog(precision)  # validate the precision
+
+        self.__precision = precision
+        self.__fetch_size = fetch_size
+
+    def collect(
+        self,
+        cur: sqlite3.Cursor,
+        schema_name: str,
+        table_name: str,
+        column_names: Sequence[str],
+    ) -> TableStats:
+        """
+        Stream the rows of a table and compute statistics of the columns.
+        """
+
+        logger.debug(f"collect column statistics: table={schema_name}.{table_name}")
+
+        accumulators = [_ColumnAccumulator(column, self.__precision) for column in column_names]
+        row_count = 0
+
+        if column_names:
+            cur.execute(
+                "SELECT {} FROM {}.{}".format(
+                    ", ".join(quote_identifier(column) for column in column_names),
+                    quote_identifier(schema_name),
+                    quote_identifier(table_name),
+                )
+            )
+            while True:
+                records = cur.fetchmany(self.__fetch_size)
+                if not records:
+                    break
+
+                row_count += len(records)
+                for record in records:
+                    for accumulator, value in zip(accumulators, record):
+                        accumulator.update(value)
+
+        return TableStats(
+            table_name, row_count, [accumulator.to_stats(row_count) for accumulator in accumulators]
+        )
@@ -0,0 +1,132 @@
+"""
+.. codeauthor:: Tsuyoshi Hombashi <tsuyoshi.hombashi@gmail.com>
+"""
+
+from collections.abc import Mapping
+from typing import Any, Final, Optional
+
+from tabledata import TableData
+
+
+class RowEstimateSource:
+    SQLITE_STAT1: Final = "sqlite_stat1"
+    MAX_ROWID: Final = "max(rowid)"
+
+
+class TableStorageInfo:
+    """
+    Disk usage and approximate row count of a table and its indexes.
+    Page counts and sizes are |None| if the ``dbstat`` virtual table is not
+    available in the SQLite library.
+    """
+
+    @property
+    def table_name(self) -> str:
+        return self.__table_name
+
+    @property
+    def page_count(self) -> Optional[int]:
+        return self.__page_count
+
+    @property
+    def size_bytes(self) -> Optional[int]:
+        return self.__size_bytes
+
+    @property
+    def index_page_counts(self) -> dict[str, int]:
+        return dict(self.__index_page_counts)
+
+    @property
+    def index_sizes(self) -> dict[str, int]:
+        """
+        Mapping of index names to the sizes of the indexes in bytes.
+        """
+
+        return dict(self.__index_sizes)
+
+    @property
+    def index_size_bytes(self) -> Optional[int]:
+        if self.__size_bytes is None:
+            return None
+
+        return sum(self.__index_sizes.values())
+
+    @property
+    def row_estimate(self) -> Optional[int]:
+        return self.__row_estimate
+
+    @property
+    def row_estimate_source(self) -> Optional[str]:
+        """
+        One of the :py:class:`~sqliteschema.RowEstimateSource` values.
+        """
+
+        return self.__row_estimate_source
+
+    def __init__(
+        self,
+        table_name: str,
+        page_count: Optional[int] = None,
+        size_bytes: Optional[int] = None,
+        index_page_counts: Optional[Mapping[str, int]] = None,
+        index_sizes: Optional[Mapping[str, int]] = None,
+        row_estimate: Optional[int] = None,
+        row_estimate_source: Optional[str] = None,
+    ) -> None:
+        self.__table_name = table_name
+        self.__page_count = page_count
+        self.__size_bytes = size_bytes
+        self.__index_page_counts = dict(index_page_counts or {})
+        self.__index_sizes = dict(index_sizes or {})
+        self.__row_estimate = row_estimate
+        self.__row_estimate_source = row_estimate_source
+
+    def __repr__(self) -> str:
+        return "TableStorageInfo(table={}, rows~{}, size={}, index_size={})".format(
+            self.table_name, self.row_estimate, self.size_bytes, self.index_size_bytes
+        )
+
+    def as_dict(self) -> dict[str, Any]:
+        return {
+            "table_name": self.table_name,
+            "page_count": self.page_count,
+            "size_bytes": self.size_bytes,
+            "index_page_counts": self.index_page_counts,
+            "index_sizes": self.index_sizes,
+            "row_estimate": self.row_estimate,
+            "row_estimate_source": self.row_estimate_source,
+        }
+
+    def to_summary(self) -> str:
+        items = []
+        if self.row_estimate is not None:
+            items.append(f"rows: ~{self.row_estimate:d}")
+        if self.size_bytes is not None:
+            items.append(f"size: {self.size_bytes:d} bytes")
+            items.append(f"index size: {self.index_size_bytes:d} bytes")
+
+        return ", ".join(items)
+
+
+STORAGE_HEADERS: Final = ("Table", "Rows", "Row Source", "Pages", "Size", "Index Size")
+
+
+def storage_infos_as_tabledata(
+    storage_infos: Mapping[str, TableStorageInfo], max_workers: Optional[int] = None
+) -> TableData:
+    return TableData(
+        "storage",
+        STORAGE_HEADERS,
+        [
+            [
+                table_name,
+                storage_info.row_estimate,
+                storage_info.row_estimate_source,
+                storage_info.page_count,
+                storage_info.size_bytes,
+                storage_info.index_size_bytes,
+            ]
+            for table_name, storage_info in storage_infos.items()
+        ],
+        max_workers=max_workers if max_workers else 1,
+    )
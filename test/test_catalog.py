@@ -0,0 +1,84 @@
+"""
+.. codeauthor:: Tsuyoshi Hombashi <tsuyoshi.hombashi@gmail.com>
+"""
+
+import os
+import sqlite3
+
+import pytest
+
+from sqliteschema import SQLiteSchemaCatalog
+from sqliteschema._error import OperationalError
+
+from .fixture import database_path, mb_database_path  # noqa: W0611
+
+
+@pytest.fixture
+def catalog(tmpdir):
+    with SQLiteSchemaCatalog(str(tmpdir.join("catalog.db"))) as catalog:
+        yield catalog
+
+
+class Test_SQLiteSchemaCatalog_build:
+    def test_normal(self, catalog, database_path, mb_database_path):
+        database_paths = [database_path, mb_database_path]
+
+        assert catalog.build(database_paths) == database_paths
+        assert catalog.fetch_file_paths() == sorted(database_paths)
+
+        # unchanged files are skipped
+        assert catalog.build(database_paths) == []
+
+    def test_normal_schema_change(self, catalog, database_path):
+        catalog.build([database_path])
+
+        con = sqlite3.connect(database_path)
+        con.execute("INSERT INTO testdb0 VALUES (5, 6)")
+        con.commit()
+        assert catalog.build([database_path]) == []
+
+        con.execute("CREATE INDEX bar_index ON testdb1(bar)")
+        con.commit()
+        con.close()
+        assert catalog.build([database_path]) == [database_path]
+        assert catalog.find_files_without_index("bar_index") == []
+
+    def test_normal_prune(self, catalog, database_path, mb_database_path):
+        catalog.build([database_path, mb_database_path])
+        os.remove(mb_database_path)
+
+        assert catalog.prune() == [mb_database_path]
+        assert catalog.fetch_file_paths() == [database_path]
+        assert catalog.find_tables("テーブル") == []
+
+    def test_normal_not_database(self, catalog, tmpdir):
+        text_path = str(tmpdir.join("text.txt"))
+        with open(text_path, "w") as f:
+            f.write("not a database file" * 100)
+
+        assert catalog.build([text_path, str(tmpdir.join("not_exist.db"))]) == []
+        assert catalog.fetch_file_paths() == []
+
+    def test_exception(self, tmpdir):
+        with pytest.raises(OperationalError):
+            SQLiteSchemaCatalog(str(tmpdir))
+
+
+class Test_SQLiteSchemaCatalog_query:
+    def test_normal(self, catalog, database_path, mb_database_path):
+        with sqlite3.connect(database_path) as con:
+            con.execute("CREATE INDEX bar_index ON testdb1(bar)")
+        catalog.build([database_path, mb_database_path])
+
+        assert catalog.find_columns("FOO") == [
+            {
+                "path": database_path,
+                "table_name": "testdb1",
+                "column_name": "foo",
+                "data_type": "INTEGER",
+            }
+        ]
+        assert catalog.find_columns("foo", data_type="text") == []
+        assert [record["path"] for record in catalog.find_columns("いち")] == [mb_database_path]
+        assert catalog.find_tables("testdb0") == [database_path]
+        assert catalog.find_files_without_index("BAR_INDEX") == [mb_database_path]
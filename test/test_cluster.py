@@ -0,0 +1,79 @@
+"""
+.. codeauthor:: Tsuyoshi Hombashi <tsuyoshi.hombashi@gmail.com>
+"""
+
+import sqlite3
+
+import pytest
+
+from sqliteschema import SchemaClusterer, SQLiteSchemaExtractor
+
+from .fixture import database_path  # noqa: W0611
+
+
+def create_shard(path, extra_ddls=()):
+    con = sqlite3.connect(path)
+    for i in range(10):
+        con.execute(
+            f"CREATE TABLE table{i} (id INTEGER PRIMARY KEY, tenant_id INTEGER, value TEXT)"
+        )
+    con.execute("CREATE INDEX tenant_index ON table0(tenant_id)")
+    for ddl in extra_ddls:
+        con.execute(ddl)
+    con.commit()
+    con.close()
+
+    return path
+
+
+class Test_SchemaClusterer_cluster:
+    def test_normal(self, tmpdir, database_path):
+        shard_paths = [create_shard(str(tmpdir.join(f"shard{i}.db"))) for i in range(5)]
+        straggler_path = create_shard(
+            str(tmpdir.join("straggler.db")), ["ALTER TABLE table1 ADD COLUMN new_col REAL"]
+        )
+
+        clusterer = SchemaClusterer(threshold=0.8)
+        for path in shard_paths + [straggler_path, database_path]:
+            clusterer.add_database(path)
+
+        clusters = clusterer.cluster()
+
+        assert len(clusters) == 2
+        assert clusters[0].exemplar == shard_paths[0]
+        assert sorted(clusters[0].members) == sorted(shard_paths + [straggler_path])
+        assert clusters[1].members == [database_path]
+
+        stragglers = clusters[0].stragglers
+        assert len(stragglers) == 1
+        assert stragglers[0].key == straggler_path
+        assert stragglers[0].missing == []
+        assert stragglers[0].extra == ["column table1.new_col REAL"]
+        assert 0.8 < stragglers[0].similarity < 1
+
+    def test_normal_signature(self, database_path):
+        clusterer = SchemaClusterer(num_perm=64)
+        features = ["table a", "column a.b INTEGER"]
+
+        signature = clusterer.calc_signature(features)
+        assert len(signature) == 64
+        assert signature == clusterer.calc_signature(reversed(features))
+        assert signature == SchemaClusterer(num_perm=64).calc_signature(features)
+
+    def test_normal_add(self, database_path):
+        extractor = SQLiteSchemaExtractor(database_path)
+        clusterer = SchemaClusterer()
+        clusterer.add("a", extractor.fetch_database_schema())
+        clusterer.add("b", [])
+
+        clusters = clusterer.cluster()
+
+        assert len(clusterer) == 2
+        assert [cluster.members for cluster in clusters] == [["a"], ["b"]]
+
+    @pytest.mark.parametrize(
+        ["kwargs"], [[{"threshold": 0}], [{"threshold": 1.1}], [{"num_perm": 0}]]
+    )
+    def test_exception(self, kwargs):
+        with pytest.raises(ValueError):
+            SchemaClusterer(**kwargs)
@@ -17,7 +17,7 @@ pytablewriter = pytest.importorskip("pytablewriter", minversion="0.38.0")
 from pytablewriter import TableFormat  # isort:skip
 
 
-def patch_attr(self, table_name, schema_type):
+def patch_attr(self, table_name, schema_type, schema_name="main"):
     return "CREATE TABLE testschema('Primary Key ID' INTEGER PRIMARY KEY, 'AA BB CC' TEXT);"
 
 
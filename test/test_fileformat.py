@@ -0,0 +1,71 @@
+"""
+.. codeauthor:: Tsuyoshi Hombashi <tsuyoshi.hombashi@gmail.com>
+"""
+
+import sqlite3
+
+import pytest
+
+from sqliteschema import DatabaseFileFormatError, SQLiteFileReader, SQLiteSchemaExtractor
+
+from .fixture import database_path  # noqa: W0611
+
+
+class Test_SQLiteFileReader_fetch_sqlite_master:
+    def test_normal(self, database_path):
+        with SQLiteFileReader(database_path) as reader:
+            assert reader.page_size == 4096
+            assert reader.fetch_sqlite_master() == (
+                SQLiteSchemaExtractor(database_path).fetch_sqlite_master()
+            )
+
+    @pytest.mark.parametrize(["page_size"], [[512], [1024], [65536]])
+    def test_normal_multi_pages(self, tmpdir, page_size):
+        db_path = str(tmpdir.join("multi_pages.db"))
+        con = sqlite3.connect(db_path)
+        con.execute(f"PRAGMA page_size = {page_size}")
+        for i in range(300):
+            # long column lists make the schema b-tree deep and use overflow pages
+            columns = ", ".join(f"column_{i}_{j} TEXT" for j in range(i % 50 + 1))
+            con.execute(f"CREATE TABLE table_{i} ({columns})")
+            con.execute(f"CREATE INDEX table_{i}_index ON table_{i} (column_{i}_0)")
+        con.commit()
+        expected = SQLiteSchemaExtractor(con).fetch_sqlite_master()
+
+        with SQLiteFileReader(db_path) as reader:
+            assert reader.page_size == page_size
+            assert reader.schema_version == con.execute("PRAGMA schema_version").fetchone()[0]
+            assert reader.fetch_sqlite_master() == expected
+
+        con.close()
+
+    def test_normal_exclusive_lock(self, database_path):
+        con = sqlite3.connect(database_path, isolation_level=None)
+        con.execute("BEGIN EXCLUSIVE")
+        con.execute("INSERT INTO testdb0 VALUES (5, 6)")
+
+        with SQLiteFileReader(database_path) as reader:
+            assert [record["name"] for record in reader.fetch_sqlite_master()][:2] == [
+                "testdb0",
+                "testdb0_attra_index_71db",
+            ]
+
+        con.execute("ROLLBACK")
+        con.close()
+
+    def test_normal_empty_file(self, tmpdir):
+        db_path = tmpdir.join("empty.db")
+        db_path.write("")
+
+        with SQLiteFileReader(str(db_path)) as reader:
+            assert reader.fetch_sqlite_master() == []
+
+    def test_exception(self, tmpdir):
+        db_path = tmpdir.join("not_sqlite.db")
+        db_path.write("not a sqlite database file" * 10)
+
+        with pytest.raises(DatabaseFileFormatError):
+            SQLiteFileReader(str(db_path))
+
+        with pytest.raises(OSError):
+            SQLiteFileReader(str(tmpdir.join("not_exist.db")))
@@ -0,0 +1,86 @@
+"""
+.. codeauthor:: Tsuyoshi Hombashi <tsuyoshi.hombashi@gmail.com>
+"""
+
+import sqlite3
+
+import pytest
+
+from sqliteschema import ForeignKey, ForeignKeyCycleError, ForeignKeyGraph, SQLiteSchemaExtractor
+
+
+@pytest.fixture
+def fk_con():
+    con = sqlite3.connect(":memory:")
+    con.executescript(
+        """
+        CREATE TABLE order_items (
+            id INTEGER PRIMARY KEY,
+            order_id INTEGER REFERENCES orders(id),
+            product_id INTEGER REFERENCES products(id)
+        );
+        CREATE TABLE orders (
+            id INTEGER PRIMARY KEY,
+            customer_id INTEGER NOT NULL REFERENCES customers(id)
+        );
+        CREATE TABLE customers (id INTEGER PRIMARY KEY, referrer_id REFERENCES customers(id));
+        CREATE TABLE products (id INTEGER PRIMARY KEY);
+        CREATE INDEX order_items_order_id_index ON order_items(order_id);
+        CREATE INDEX customers_referrer_index ON customers(referrer_id);
+        """
+    )
+
+    return con
+
+
+class Test_ForeignKeyGraph_topological_order:
+    def test_normal(self, fk_con):
+        graph = SQLiteSchemaExtractor(fk_con).fetch_foreign_key_graph()
+
+        assert graph.topological_order() == ["customers", "products", "orders", "order_items"]
+        assert graph.find_cycles() == []
+        assert sorted(graph.get_referred_table_names("order_items")) == ["orders", "products"]
+        assert graph.get_referring_table_names("customers") == ["orders"]
+
+    def test_exception_cycle(self):
+        graph = ForeignKeyGraph(
+            ["a", "b", "c", "d"],
+            [
+                ForeignKey("a", ["b_id"], "b", ["id"]),
+                ForeignKey("b", ["c_id"], "c", ["id"]),
+                ForeignKey("c", ["a_id"], "a", ["id"]),
+                ForeignKey("d", ["a_id"], "a", ["id"]),
+            ],
+        )
+
+        assert graph.find_cycles() == [["a", "b", "c"]]
+
+        with pytest.raises(ForeignKeyCycleError) as e:
+            graph.topological_order()
+
+        assert e.value.cycles == [["a", "b", "c"]]
+
+
+class Test_ForeignKeyGraph_find_unindexed_foreign_keys:
+    def test_normal(self, fk_con):
+        graph = SQLiteSchemaExtractor(fk_con).fetch_foreign_key_graph()
+
+        assert graph.find_unindexed_foreign_keys() == [
+            ForeignKey("order_items", ["product_id"], "products", ["id"]),
+            ForeignKey("orders", ["customer_id"], "customers", ["id"]),
+        ]
+
+    def test_normal_multi_column(self):
+        graph = ForeignKeyGraph(
+            ["parent", "child"],
+            [ForeignKey("child", ["a", "b"], "parent", ["a", "b"])],
+            {"child": [["b", "a", "c"]]},
+        )
+        assert graph.find_unindexed_foreign_keys() == []
+
+        graph = ForeignKeyGraph(
+            ["parent", "child"],
+            [ForeignKey("child", ["a", "b"], "parent", ["a", "b"])],
+            {"child": [["a", "c", "b"]]},
+        )
+        assert len(graph.find_unindexed_foreign_keys()) == 1
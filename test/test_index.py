@@ -0,0 +1,131 @@
+"""
+.. codeauthor:: Tsuyoshi Hombashi <tsuyoshi.hombashi@gmail.com>
+"""
+
+import sqlite3
+
+import pytest
+
+from sqliteschema import IndexOrigin, RedundancyType, SQLiteIndexColumn, SQLiteSchemaExtractor
+from sqliteschema._index import split_index_sql
+
+
+@pytest.fixture
+def index_con():
+    con = sqlite3.connect(":memory:")
+    con.executescript(
+        """
+        CREATE TABLE users (
+            id INTEGER PRIMARY KEY,
+            email TEXT UNIQUE,
+            name TEXT,
+            created_at TEXT,
+            deleted INTEGER
+        );
+        CREATE TABLE orders (
+            id INTEGER PRIMARY KEY,
+            user_id INTEGER REFERENCES users(id),
+            status TEXT,
+            created_at TEXT
+        );
+        CREATE INDEX users_email ON users(email);
+        CREATE INDEX users_name ON users(name);
+        CREATE INDEX users_name_created_at ON users(name, created_at DESC);
+        CREATE INDEX "users name again" ON users("NAME");
+        CREATE INDEX users_lower_email ON users(lower(email) COLLATE NOCASE, name);
+        CREATE INDEX users_active_name ON users(name) WHERE deleted = 0;
+        CREATE UNIQUE INDEX orders_status_created_at ON orders(status, created_at);
+        CREATE UNIQUE INDEX orders_status ON orders(status);
+        """
+    )
+
+    return con
+
+
+class Test_split_index_sql:
+    @pytest.mark.parametrize(
+        ["sql", "expected"],
+        [
+            ["CREATE INDEX i ON t(a)", (["a"], None)],
+            ["CREATE INDEX i ON t (a DESC, b COLLATE NOCASE ASC)", (["a", "b"], None)],
+            [
+                'CREATE INDEX \'i(\' ON "t(" (substr(a, 1, 2), "b,c") WHERE a IS NOT NULL;',
+                (["substr(a, 1, 2)", '"b,c"'], "a IS NOT NULL"),
+            ],
+        ],
+    )
+    def test_normal(self, sql, expected):
+        assert split_index_sql(sql) == expected
+
+
+class Test_SQLiteSchemaExtractor_fetch_indexes:
+    def test_normal(self, index_con):
+        indexes = SQLiteSchemaExtractor(index_con).fetch_indexes(table_name="users")
+        index_map = {index.name: index for index in indexes}
+
+        assert [index.name for index in indexes][:3] == [
+            "sqlite_autoindex_users_1",
+            "users_email",
+            "users_name",
+        ]
+
+        autoindex = index_map["sqlite_autoindex_users_1"]
+        assert autoindex.origin == IndexOrigin.UNIQUE
+        assert autoindex.is_unique
+        assert not autoindex.is_droppable
+        assert autoindex.sql is None
+
+        index = index_map["users_name_created_at"]
+        assert index.column_names == ["name", "created_at"]
+        assert index.columns[1].is_descending
+        assert index.get_lookup_columns() == ["name", "created_at"]
+
+        index = index_map["users_lower_email"]
+        assert index.has_expression
+        assert index.columns[0] == SQLiteIndexColumn(None, "lower(email)", "NOCASE")
+        assert index.get_lookup_columns() == []
+
+        index = index_map["users_active_name"]
+        assert index.is_partial
+        assert index.where == "deleted = 0"
+        assert index.get_lookup_columns() == []
+
+
+class Test_SQLiteSchemaExtractor_analyze_indexes:
+    def test_normal(self, index_con):
+        analysis = SQLiteSchemaExtractor(index_con).analyze_indexes()
+
+        assert analysis
+        assert [
+            (item.index.name, item.covering_index.name) for item in analysis.duplicate_indexes
+        ] == [
+            ("users_email", "sqlite_autoindex_users_1"),
+            ("users name again", "users_name"),
+        ]
+        assert [
+            (item.index.name, item.covering_index.name) for item in analysis.left_prefix_indexes
+        ] == [("users_name", "users_name_created_at")]
+        assert all(
+            item.redundancy_type == RedundancyType.DUPLICATE for item in analysis.duplicate_indexes
+        )
+
+        # unique indexes are not redundant since they enforce the uniqueness
+        assert "orders_status" not in [item.index.name for item in analysis.redundant_indexes]
+
+        assert [foreign_key.columns for foreign_key in analysis.unindexed_foreign_keys] == [
+            ("user_id",)
+        ]
+
+    def test_normal_no_issue(self):
+        con = sqlite3.connect(":memory:")
+        con.executescript(
+            """
+            CREATE TABLE parent (id INTEGER PRIMARY KEY);
+            CREATE TABLE child (id INTEGER PRIMARY KEY, parent_id INTEGER REFERENCES parent(id));
+            CREATE INDEX child_parent_id ON child(parent_id, id);
+            """
+        )
+        analysis = SQLiteSchemaExtractor(con).analyze_indexes()
+
+        assert not analysis
+        assert analysis.as_dict() == {"redundant_indexes": [], "unindexed_foreign_keys": []}
@@ -0,0 +1,89 @@
+"""
+.. codeauthor:: Tsuyoshi Hombashi <tsuyoshi.hombashi@gmail.com>
+"""
+
+import shutil
+import sys
+
+import pytest
+
+from sqliteschema.__main__ import main
+
+from .fixture import database_path, mb_database_path  # noqa: W0611
+
+
+def run_main(monkeypatch, capsys, args):
+    monkeypatch.setattr(sys, "argv", ["sqliteschema"] + args)
+    result = main()
+
+    return result, capsys.readouterr().out
+
+
+class Test_main:
+    def test_normal_storage(self, monkeypatch, capsys, database_path):
+        result, output = run_main(monkeypatch, capsys, [database_path, "--storage"])
+
+        assert result == 0
+        storage_output = output.split("# storage")[1]
+        for table_name in ("testdb0", "testdb1", "constraints"):
+            assert f"| {table_name}" in storage_output
+
+    def test_normal_storage_table(self, monkeypatch, capsys, database_path):
+        result, output = run_main(
+            monkeypatch, capsys, [database_path, "--storage", "--table", "testdb*"]
+        )
+
+        assert result == 0
+        assert "# constraints" not in output
+        storage_output = output.split("# storage")[1]
+        assert "| testdb0" in storage_output
+        assert "| testdb1" in storage_output
+        assert "constraints" not in storage_output
+
+    def test_normal_storage_exclude(self, monkeypatch, capsys, database_path):
+        result, output = run_main(
+            monkeypatch, capsys, [database_path, "--storage", "--exclude", "testdb*"]
+        )
+
+        assert result == 0
+        storage_output = output.split("# storage")[1]
+        assert "| constraints" in storage_output
+        assert "testdb" not in storage_output
+
+    def test_normal_catalog(self, monkeypatch, capsys, database_path, mb_database_path, tmpdir):
+        catalog_path = str(tmpdir.join("catalog.sqlite"))
+
+        result, _ = run_main(
+            monkeypatch,
+            capsys,
+            ["--catalog", "build", catalog_path, database_path, mb_database_path, "--quiet"],
+        )
+        assert result == 0
+
+        result, output = run_main(
+            monkeypatch, capsys, ["--catalog", "query", catalog_path, "--table", "testdb1"]
+        )
+        assert result == 0
+        assert database_path in output
+
+    def test_normal_file_named_catalog(self, monkeypatch, capsys, database_path, tmpdir):
+        # a database file named "catalog" is not a catalog command
+        filepath = str(tmpdir.join("catalog"))
+        shutil.copy(database_path, filepath)
+        monkeypatch.chdir(str(tmpdir))
+
+        result, output = run_main(monkeypatch, capsys, ["catalog"])
+
+        assert result == 0
+        assert "# testdb0" in output
+
+    def test_exception(self, monkeypatch, capsys, database_path, tmpdir):
+        with pytest.raises(SystemExit):
+            run_main(monkeypatch, capsys, [])
+
+        with pytest.raises(SystemExit):
+            run_main(
+                monkeypatch,
+                capsys,
+                [database_path, "--catalog", "build", str(tmpdir.join("catalog.sqlite"))],
+            )
@@ -0,0 +1,206 @@
+"""
+.. codeauthor:: Tsuyoshi Hombashi <tsuyoshi.hombashi@gmail.com>
+"""
+
+import os
+import sqlite3
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from sqliteschema import RetryPolicy, SQLiteSchemaExtractorPool
+
+from .fixture import database_path, mb_database_path  # noqa: W0611
+
+
+class Test_SQLiteSchemaExtractorPool_get:
+    def test_normal(self, database_path):
+        pool = SQLiteSchemaExtractorPool()
+        extractor = pool.get(database_path)
+
+        assert pool.get(database_path) is extractor
+        assert database_path in pool
+        assert len(pool) == 1
+        assert extractor.fetch_table_names() == ["testdb0", "testdb1", "constraints"]
+
+    def test_normal_schema_change(self, database_path):
+        pool = SQLiteSchemaExtractorPool()
+        assert "new_table" not in pool.get(database_path).fetch_table_names()
+
+        con = sqlite3.connect(database_path)
+        con.execute("CREATE TABLE new_table (a INTEGER)")
+        con.close()
+
+        assert "new_table" in pool.get(database_path).fetch_table_names()
+
+    def test_normal_replaced_file(self, database_path, tmpdir):
+        pool = SQLiteSchemaExtractorPool()
+        extractor = pool.get(database_path)
+
+        other_path = str(tmpdir.join("other.db"))
+        con = sqlite3.connect(other_path)
+        con.execute("CREATE TABLE other (a INTEGER)")
+        con.close()
+        os.replace(other_path, database_path)
+
+        new_extractor = pool.get(database_path)
+        assert new_extractor is not extractor
+        assert new_extractor.fetch_table_names() == ["other"]
+
+    def test_normal_max_size(self, database_path, mb_database_path):
+        pool = SQLiteSchemaExtractorPool(max_size=1)
+        pool.get(database_path)
+        pool.get(mb_database_path)
+
+        assert len(pool) == 1
+        assert database_path not in pool
+        assert mb_database_path in pool
+
+    def test_normal_idle_timeout(self, database_path, mb_database_path):
+        pool = SQLiteSchemaExtractorPool(idle_timeout=0.01)
+        pool.get(database_path)
+        time.sleep(0.02)
+        pool.get(mb_database_path)
+
+        assert database_path not in pool
+        assert mb_database_path in pool
+
+        time.sleep(0.02)
+        assert pool.evict_idle() == 1
+        assert len(pool) == 0
+
+    def test_normal_extractor_options(self, database_path):
+        pool = SQLiteSchemaExtractorPool(busy_timeout=1.5, retry_policy=RetryPolicy(max_retries=0))
+        extractor = pool.get(database_path)
+
+        assert extractor._con.execute("PRAGMA busy_timeout").fetchone()[0] == 1500
+        assert extractor.fetch_table_names() == ["testdb0", "testdb1", "constraints"]
+
+    def test_normal_call_time_budget(self, database_path):
+        pool = SQLiteSchemaExtractorPool(call_time_budget=0.05)
+        pool.get(database_path)
+        time.sleep(0.1)
+
+        # the budget restarts at each call, not when the extractor was created
+        assert pool.get(database_path).fetch_table_names() == ["testdb0", "testdb1", "constraints"]
+
+    def test_exception(self, tmpdir):
+        pool = SQLiteSchemaExtractorPool()
+
+        with pytest.raises(OSError):
+            pool.get(str(tmpdir.join("not_exist.db")))
+
+        with pytest.raises(ValueError):
+            SQLiteSchemaExtractorPool(max_size=0)
+
+
+class Test_SQLiteSchemaExtractorPool_checkout:
+    def test_normal(self, database_path):
+        pool = SQLiteSchemaExtractorPool()
+
+        with pool.checkout(database_path) as extractor:
+            assert pool.get(database_path) is extractor
+            assert extractor.fetch_table_names() == ["testdb0", "testdb1", "constraints"]
+
+        assert database_path in pool
+        assert extractor.fetch_table_names() == ["testdb0", "testdb1", "constraints"]
+
+    def test_normal_evicted_while_leased(self, database_path, mb_database_path):
+        pool = SQLiteSchemaExtractorPool(max_size=1)
+
+        with pool.checkout(database_path) as extractor:
+            # evicts the leased extractor as the least recently used one
+            pool.get(mb_database_path)
+            assert database_path not in pool
+            assert extractor.fetch_table_names() == ["testdb0", "testdb1", "constraints"]
+
+            assert pool.evict(mb_database_path)
+            pool.clear()
+            assert extractor.fetch_table_names() == ["testdb0", "testdb1", "constraints"]
+
+        with pytest.raises(sqlite3.ProgrammingError):
+            extractor.fetch_table_names()
+
+    def test_normal_nested_leases(self, database_path):
+        pool = SQLiteSchemaExtractorPool()
+
+        with pool.checkout(database_path) as extractor:
+            with pool.checkout(database_path) as other:
+                assert other is extractor
+                pool.evict(database_path)
+
+            assert extractor.fetch_table_names() == ["testdb0", "testdb1", "constraints"]
+
+        with pytest.raises(sqlite3.ProgrammingError):
+            extractor.fetch_table_names()
+
+    def test_normal_idle_timeout(self, database_path, mb_database_path):
+        pool = SQLiteSchemaExtractorPool(idle_timeout=0.01)
+
+        with pool.checkout(database_path) as extractor:
+            pool.get(mb_database_path)
+            time.sleep(0.02)
+
+            assert pool.evict_idle() == 1
+            assert database_path in pool
+            assert mb_database_path not in pool
+            assert extractor.fetch_table_names() == ["testdb0", "testdb1", "constraints"]
+
+        assert pool.evict_idle() == 0
+        assert database_path in pool
+
+    def test_exception(self, tmpdir):
+        pool = SQLiteSchemaExtractorPool()
+
+        with pytest.raises(OSError):
+            with pool.checkout(str(tmpdir.join("not_exist.db"))):
+                pass
+
+
+class Test_SQLiteSchemaExtractorPool_evict:
+    def test_normal(self, database_path):
+        pool = SQLiteSchemaExtractorPool()
+        extractor = pool.get(database_path)
+
+        with ThreadPoolExecutor(max_workers=1) as executor:
+            # opens a connection for the worker thread
+            executor.submit(extractor.fetch_table_names).result()
+
+            assert pool.evict(database_path)
+            assert not pool.evict(database_path)
+
+            with pytest.raises(sqlite3.ProgrammingError):
+                extractor.fetch_table_names()
+            with pytest.raises(sqlite3.ProgrammingError):
+                executor.submit(extractor.fetch_table_names).result()
+
+    def test_normal_replaced_and_max_size(self, database_path, mb_database_path, tmpdir):
+        pool = SQLiteSchemaExtractorPool(max_size=1)
+        extractor = pool.get(database_path)
+        pool.get(mb_database_path)
+
+        with pytest.raises(sqlite3.ProgrammingError):
+            extractor.fetch_table_names()
+
+        extractor = pool.get(mb_database_path)
+        other_path = str(tmpdir.join("other.db"))
+        con = sqlite3.connect(other_path)
+        con.execute("CREATE TABLE other (a INTEGER)")
+        con.close()
+        os.replace(other_path, mb_database_path)
+        pool.get(mb_database_path)
+
+        with pytest.raises(sqlite3.ProgrammingError):
+            extractor.fetch_table_names()
+
+    def test_normal_clear(self, database_path, mb_database_path):
+        pool = SQLiteSchemaExtractorPool()
+        extractors = [pool.get(database_path), pool.get(mb_database_path)]
+
+        pool.clear()
+
+        assert len(pool) == 0
+        for extractor in extractors:
+            with pytest.raises(sqlite3.ProgrammingError):
+                extractor.fetch_table_names()
@@ -2,6 +2,8 @@
 .. codeauthor:: Tsuyoshi Hombashi <tsuyoshi.hombashi@gmail.com>
 """
 
+from textwrap import dedent
+
 import pytest
 
 from sqliteschema._schema import SQLiteTableSchema
@@ -11,3 +13,38 @@ class Test_SQLiteTableSchema_constructor:
     def test_exception(self):
         with pytest.raises(ValueError):
             SQLiteTableSchema("not_exist_table", {})
+
+
+class Test_SQLiteTableSchema_to_ddl:
+    def test_normal(self):
+        table_schema = SQLiteTableSchema(
+            "sample",
+            {"sample": []},
+            table_sql=dedent(
+                """\
+                CREATE TABLE sample (
+                    id integer not null primary key autoincrement, -- row id
+                    [user name] varchar (255) collate nocase default 'a,b' unique,
+                    price decimal(10,2) check(price>-1) default -1,
+                    parent_id int references parent(id) on delete set null,
+                    foreign key(parent_id) references parent(id)
+                ) without rowid"""
+            ),
+            index_sqls=["CREATE INDEX sample_price ON sample(price desc) WHERE price>0"],
+        )
+
+        assert table_schema.to_ddl() == dedent(
+            """\
+            CREATE TABLE "sample" (
+                "id" INTEGER PRIMARY KEY AUTOINCREMENT NOT NULL,  -- row id
+                "user name" VARCHAR(255) UNIQUE DEFAULT 'a,b' COLLATE NOCASE,
+                "price" DECIMAL(10, 2) CHECK ("price" > -1) DEFAULT -1,
+                "parent_id" INT REFERENCES "parent" ("id") ON DELETE SET NULL,
+                FOREIGN KEY ("parent_id") REFERENCES "parent" ("id")
+            ) WITHOUT ROWID;
+            CREATE INDEX "sample_price" ON "sample" ("price" DESC) WHERE "price" > 0;"""
+        )
+
+    def test_exception(self):
+        with pytest.raises(ValueError):
+            SQLiteTableSchema("sample", {"sample": []}).to_ddl()
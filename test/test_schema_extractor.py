@@ -2,21 +2,53 @@
 .. codeauthor:: Tsuyoshi Hombashi <tsuyoshi.hombashi@gmail.com>
 """
 
+import gzip
+import io
 import json
 import os
+import re
+import shutil
 import sqlite3
+import threading
+import zipfile
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
 from textwrap import dedent
 
 import pytest
 from simplesqlite import SimpleSQLite
 
-from sqliteschema import DataNotFoundError, SQLiteSchemaExtractor
+from sqliteschema import (
+    CancellationToken,
+    DataNotFoundError,
+    ExtractionCancelledError,
+    ExtractionTimeoutError,
+    ProgressBar,
+    RetryPolicy,
+    RowEstimateSource,
+    SchemaChanges,
+    SQLiteSchemaExtractor,
+    TableType,
+    TypeProfiler,
+)
+from sqliteschema._progress import ProgressReporter
 from sqliteschema._schema import SQLiteTableSchema
 
 from ._common import print_test_result
 from .fixture import database_path, mb_database_path  # noqa: W0611
 
 
+def _read_database_image(tmpdir, database_path, journal_mode):
+    image_path = str(tmpdir.join(f"image_{journal_mode}.sqlite3"))
+    shutil.copyfile(database_path, image_path)
+    con = sqlite3.connect(image_path)
+    con.execute(f"PRAGMA journal_mode = {journal_mode}")
+    con.close()
+
+    with open(image_path, "rb") as f:
+        return f.read()
+
+
 class Test_SQLiteSchemaExtractor_constructor:
     def test_normal_sqlite3_connection(self, database_path):
         con = sqlite3.connect(database_path)
@@ -26,12 +58,148 @@ class Test_SQLiteSchemaExtractor_constructor:
         con = SimpleSQLite(database_path)
         SQLiteSchemaExtractor(con)
 
+    @pytest.mark.skipif(
+        not hasattr(sqlite3.Connection, "deserialize"), reason="requires Python 3.11 or later"
+    )
+    @pytest.mark.parametrize(["journal_mode"], [["delete"], ["wal"]])
+    def test_normal_bytes(self, tmpdir, database_path, journal_mode):
+        data = _read_database_image(tmpdir, database_path, journal_mode)
+        buf = bytearray(data)
+
+        for source in (data, buf, memoryview(data), io.BytesIO(data)):
+            extractor = SQLiteSchemaExtractor(source)
+            assert extractor.fetch_table_names() == ["testdb0", "testdb1", "constraints"]
+            assert extractor.fetch_table_schema("testdb1").index_list == ["foo", "hoge"]
+
+        # the buffer of the caller is not modified
+        assert buf == data
+
+    @pytest.mark.skipif(
+        not hasattr(sqlite3.Connection, "deserialize"), reason="requires Python 3.11 or later"
+    )
+    @pytest.mark.parametrize(["journal_mode"], [["delete"], ["wal"]])
+    def test_normal_compressed(self, tmpdir, database_path, journal_mode):
+        data = _read_database_image(tmpdir, database_path, journal_mode)
+
+        gzip_path = str(tmpdir.join("backup.db.gz"))
+        with gzip.open(gzip_path, "wb") as f:
+            f.write(data)
+
+        zip_path = str(tmpdir.join("backup.zip"))
+        with zipfile.ZipFile(zip_path, "w", compression=zipfile.ZIP_DEFLATED) as zip_file:
+            zip_file.writestr("backup.db", data)
+
+        expected = SQLiteSchemaExtractor(database_path).fetch_database_schema_as_dict()
+
+        assert SQLiteSchemaExtractor(gzip_path).fetch_database_schema_as_dict() == expected
+        assert SQLiteSchemaExtractor(zip_path).fetch_database_schema_as_dict() == expected
+        assert SQLiteSchemaExtractor(gzip.compress(data)).fetch_database_schema_as_dict() == (
+            expected
+        )
+        with open(zip_path, "rb") as f:
+            assert SQLiteSchemaExtractor(f).fetch_database_schema_as_dict() == expected
+
+    def test_normal_sql_script(self, tmpdir, database_path):
+        con = sqlite3.connect(database_path)
+        script = "\n".join(con.iterdump())
+        con.close()
+        assert "INSERT INTO" in script
+
+        sql_path = str(tmpdir.join("dump.sql"))
+        with open(sql_path, "w") as f:
+            f.write(script)
+
+        gzip_path = str(tmpdir.join("dump.sql.gz"))
+        with gzip.open(gzip_path, "wt") as f:
+            f.write(script)
+
+        expected = SQLiteSchemaExtractor(database_path).fetch_database_schema_as_dict()
+
+        assert SQLiteSchemaExtractor(sql_path).fetch_database_schema_as_dict() == expected
+        assert SQLiteSchemaExtractor(gzip_path).fetch_database_schema_as_dict() == expected
+        assert SQLiteSchemaExtractor(io.StringIO(script)).fetch_database_schema_as_dict() == (
+            expected
+        )
+
+        # data rows are not loaded
+        table_stats = SQLiteSchemaExtractor(sql_path).fetch_column_stats("main")
+        assert table_stats
+        assert all(stats.row_count == 0 for stats in table_stats.values())
+
+    def test_exception_sql_script(self):
+        with pytest.raises(sqlite3.OperationalError):
+            SQLiteSchemaExtractor(io.StringIO("CREATE TABLE t (a); CREATE TABLE t (b);"))
+
     @pytest.mark.parametrize(["extractor_class"], [[SQLiteSchemaExtractor]])
     def test_exception_constructor(self, extractor_class):
         with pytest.raises(IOError):
             extractor_class("not_exist_path").fetch_table_names()
 
 
+class Test_SQLiteSchemaExtractor_close:
+    def test_normal(self, database_path):
+        with SQLiteSchemaExtractor(database_path) as extractor:
+            extractor.fetch_table_names()
+
+        with pytest.raises(sqlite3.ProgrammingError):
+            extractor.fetch_table_names()
+
+    def test_normal_connection(self, database_path):
+        con = sqlite3.connect(database_path)
+        extractor = SQLiteSchemaExtractor(con)
+        extractor.fetch_table_schema("testdb0")
+
+        extractor.close()
+
+        # connections given by the caller are kept open
+        assert con.execute("SELECT count(*) FROM testdb0").fetchone()[0] == 2
+
+
+def count_open_files(path):
+    realpath = os.path.realpath(path)
+    count = 0
+    for fd in os.listdir("/proc/self/fd"):
+        try:
+            if os.readlink(os.path.join("/proc/self/fd", fd)) == realpath:
+                count += 1
+        except OSError:
+            continue
+
+    return count
+
+
+@pytest.mark.skipif(not os.path.isdir("/proc/self/fd"), reason="requires /proc/self/fd")
+class Test_SQLiteSchemaExtractor_thread_connections:
+    def test_normal_repeated_column_stats(self, database_path):
+        extractor = SQLiteSchemaExtractor(database_path, max_workers=4)
+        extractor.fetch_column_stats()
+        open_count = count_open_files(database_path)
+
+        for _ in range(5):
+            extractor.fetch_column_stats()
+
+        assert count_open_files(database_path) == open_count
+
+        extractor.close()
+        assert count_open_files(database_path) == 0
+
+    def test_normal_exited_threads(self, database_path):
+        extractor = SQLiteSchemaExtractor(database_path)
+        extractor.fetch_table_names()
+        open_count = count_open_files(database_path)
+
+        for _ in range(5):
+            thread = threading.Thread(target=extractor.fetch_table_names)
+            thread.start()
+            thread.join()
+
+        # the connection of an exited thread is closed when another thread opens a connection
+        assert count_open_files(database_path) == open_count + 1
+
+        extractor.close()
+        assert count_open_files(database_path) == 0
+
+
 class Test_SQLiteSchemaExtractor_fetch_table_names:
     def test_normal(self, database_path):
         extractor = SQLiteSchemaExtractor(database_path)
@@ -48,6 +216,35 @@ class Test_SQLiteSchemaExtractor_fetch_table_names:
             "view1",
         ]
 
+    @pytest.mark.parametrize(
+        ["include_patterns", "exclude_patterns", "expected"],
+        [
+            [["testdb*"], None, ["testdb0", "testdb1"]],
+            [["testdb*"], ["*1"], ["testdb0"]],
+            [[re.compile(r"db\d$")], None, ["testdb0", "testdb1"]],
+            [["constraints", re.compile("0$")], None, ["testdb0", "constraints"]],
+            [None, [re.compile("^test")], ["constraints"]],
+            [["TESTDB*"], None, []],
+        ],
+    )
+    def test_normal_patterns(self, database_path, include_patterns, exclude_patterns, expected):
+        extractor = SQLiteSchemaExtractor(database_path)
+
+        assert (
+            extractor.fetch_table_names(
+                include_patterns=include_patterns, exclude_patterns=exclude_patterns
+            )
+            == expected
+        )
+        assert (
+            list(
+                extractor.fetch_database_schema_as_dict(
+                    include_patterns=include_patterns, exclude_patterns=exclude_patterns
+                )
+            )
+            == expected
+        )
+
 
 class Test_SQLiteSchemaExtractor_fetch_view_names:
     def test_normal(self, database_path):
@@ -56,6 +253,160 @@ class Test_SQLiteSchemaExtractor_fetch_view_names:
         assert extractor.fetch_view_names() == ["view1"]
 
 
+class Test_SQLiteSchemaExtractor_fetch_schema_names:
+    def test_normal(self, database_path):
+        con = sqlite3.connect(":memory:")
+        con.execute("ATTACH DATABASE ? AS shard", (database_path,))
+        extractor = SQLiteSchemaExtractor(con)
+
+        assert extractor.fetch_schema_names() == ["main", "temp", "shard"]
+
+
+class Test_SQLiteSchemaExtractor_attached_schemas:
+    def test_normal(self, database_path):
+        con = sqlite3.connect(":memory:")
+        con.execute("CREATE TABLE main_table (id INTEGER PRIMARY KEY)")
+        con.execute("CREATE TEMP TABLE temp_table (value TEXT NOT NULL)")
+        con.execute("ATTACH DATABASE ? AS shard", (database_path,))
+        extractor = SQLiteSchemaExtractor(con)
+
+        assert extractor.fetch_table_names(schema_name="shard") == [
+            "testdb0",
+            "testdb1",
+            "constraints",
+        ]
+        assert extractor.fetch_view_names(schema_name="shard") == ["view1"]
+        assert [
+            table_schema.qualified_name for table_schema in extractor.fetch_database_schema()
+        ] == ["main_table"]
+        assert [
+            table_schema.qualified_name
+            for table_schema in extractor.fetch_database_schema(schema_name="*")
+        ] == [
+            "main_table",
+            "temp.temp_table",
+            "shard.testdb0",
+            "shard.testdb1",
+            "shard.constraints",
+        ]
+
+        table_schema = extractor.fetch_table_schema("testdb1", schema_name="shard")
+        assert table_schema.schema_name == "shard"
+        assert table_schema.get_attr_names() == ["foo", "bar", "hoge"]
+        assert table_schema.index_list == ["foo", "hoge"]
+
+        output = extractor.fetch_database_schema_as_dict(schema_name="*")
+        assert list(output) == [
+            "main_table",
+            "temp.temp_table",
+            "shard.testdb0",
+            "shard.testdb1",
+            "shard.constraints",
+        ]
+
+    def test_normal_fetch_sqlite_master(self, database_path):
+        con = sqlite3.connect(":memory:")
+        con.execute("ATTACH DATABASE ? AS shard", (database_path,))
+        extractor = SQLiteSchemaExtractor(con)
+
+        assert extractor.fetch_sqlite_master() == []
+
+        records = extractor.fetch_sqlite_master(schema_name="*")
+        assert {record["schema_name"] for record in records} == {"shard"}
+        assert records[0] == {
+            "schema_name": "shard",
+            "tbl_name": "testdb0",
+            "sql": "CREATE TABLE 'testdb0' (\"attr_a\" INTEGER, [attr b] INTEGER)",
+            "type": "table",
+            "name": "testdb0",
+            "rootpage": 2,
+        }
+
+    @pytest.fixture
+    def all_schemas_extractor(self, database_path):
+        con = sqlite3.connect(":memory:")
+        con.execute("CREATE TABLE main_table (id INTEGER PRIMARY KEY, name TEXT UNIQUE)")
+        con.execute("CREATE VIEW main_view AS SELECT name FROM main_table")
+        con.execute("CREATE TEMP TABLE temp_table (value TEXT NOT NULL)")
+        con.execute("ATTACH DATABASE ? AS shard", (database_path,))
+
+        return SQLiteSchemaExtractor(con)
+
+    def test_normal_all_schemas(self, all_schemas_extractor):
+        extractor = all_schemas_extractor
+        table_names = [
+            "main_table",
+            "temp.temp_table",
+            "shard.testdb0",
+            "shard.testdb1",
+            "shard.constraints",
+        ]
+
+        assert extractor.fetch_table_names(schema_name="*") == table_names
+        assert extractor.fetch_table_names(schema_name="*", include_view=True) == [
+            "main_table",
+            "main_view",
+            "temp.temp_table",
+            "shard.testdb0",
+            "shard.testdb1",
+            "shard.constraints",
+            "shard.view1",
+        ]
+        assert extractor.fetch_table_names(schema_name="*", include_patterns=["testdb*"]) == [
+            "shard.testdb0",
+            "shard.testdb1",
+        ]
+        assert extractor.fetch_view_names("*") == ["main_view", "shard.view1"]
+        assert [
+            table_schema.qualified_name for table_schema in extractor.fetch_view_schemas("*")
+        ] == ["main_view", "shard.view1"]
+        assert {
+            (table_info.schema_name, table_info.name)
+            for table_info in extractor.fetch_table_infos("*")
+        } >= {("main", "main_table"), ("temp", "temp_table"), ("shard", "testdb0")}
+        assert extractor.fetch_triggers("*") == []
+        assert [
+            (column.schema_name, column.table_name)
+            for column in extractor.find_columns(name="value", schema_name="*")
+        ] == [("temp", "temp_table")]
+        indexes = extractor.fetch_indexes("*")
+        assert (indexes[0].schema_name, indexes[0].name) == (
+            "main",
+            "sqlite_autoindex_main_table_1",
+        )
+        assert {index.schema_name for index in indexes} == {"main", "shard"}
+        assert [index.name for index in indexes if index.schema_name == "shard"] == [
+            index.name for index in extractor.fetch_indexes("shard")
+        ]
+
+        storage_infos = extractor.fetch_storage_infos("*")
+        assert list(storage_infos) == table_names
+        assert storage_infos["shard.testdb1"].table_name == "testdb1"
+        assert "shard.testdb1" in extractor.dumps_storage(schema_name="*")
+
+        output = extractor.dumps(schema_name="*", output_format="text", verbosity_level=0)
+        assert output.splitlines() == table_names
+
+    @pytest.mark.parametrize(
+        ["method", "args"],
+        [
+            ["fetch_schema_version", []],
+            ["fetch_table_schema", ["testdb0"]],
+            ["fetch_type_profile", ["testdb0"]],
+            ["fetch_column_stats", []],
+            ["fetch_foreign_key_graph", []],
+            ["analyze_indexes", []],
+        ],
+    )
+    def test_exception_all_schemas(self, all_schemas_extractor, method, args):
+        with pytest.raises(ValueError):
+            getattr(all_schemas_extractor, method)(*args, schema_name="*")
+
+    def test_exception_all_schemas_dump_ddl(self, all_schemas_extractor):
+        with pytest.raises(ValueError):
+            list(all_schemas_extractor.dump_ddl("*"))
+
+
 class Test_SQLiteSchemaExtractor_fetch_sqlite_master:
     def test_normal(self, database_path):
         extractor = SQLiteSchemaExtractor(database_path)
@@ -329,6 +680,17 @@ class Test_SQLiteSchemaExtractor_fetch_table_schema:
 
         assert output == expected
 
+    def test_normal_quoted_name(self):
+        con = sqlite3.connect(":memory:")
+        con.execute("""CREATE TABLE "it's" (a INTEGER PRIMARY KEY, "b'c" TEXT)""")
+        con.execute("""CREATE INDEX "idx'b" ON "it's" ("b'c")""")
+        extractor = SQLiteSchemaExtractor(con)
+
+        output = extractor.fetch_table_schema("it's")
+
+        assert output.get_attr_names() == ["a", "b'c"]
+        assert output.index_list == ["a", "b'c"]
+
     @pytest.mark.parametrize(["extractor_class"], [[SQLiteSchemaExtractor]])
     def test_exception(self, extractor_class, database_path):
         extractor = extractor_class(database_path)
@@ -337,6 +699,873 @@ class Test_SQLiteSchemaExtractor_fetch_table_schema:
             print(extractor.fetch_table_schema("not_exist_table"))
 
 
+class Test_SQLiteSchemaExtractor_fetch_view_schemas:
+    def test_normal(self, database_path):
+        extractor = SQLiteSchemaExtractor(database_path)
+        view_schemas = extractor.fetch_view_schemas()
+
+        assert len(view_schemas) == 1
+        assert view_schemas[0].is_view
+        assert view_schemas[0].as_dict() == {
+            "view1": [
+                {
+                    "Field": "primarykey_id",
+                    "Index": False,
+                    "Type": "INTEGER",
+                    "Nullable": "YES",
+                    "Key": "",
+                    "Default": "NULL",
+                    "Extra": "",
+                },
+                {
+                    "Field": "unique_value",
+                    "Index": False,
+                    "Type": "INTEGER",
+                    "Nullable": "YES",
+                    "Key": "",
+                    "Default": "NULL",
+                    "Extra": "",
+                },
+            ]
+        }
+        assert extractor.fetch_table_schema("view1") == view_schemas[0]
+        assert [
+            table_schema.table_name
+            for table_schema in extractor.fetch_database_schema(include_view=True)
+        ] == ["testdb0", "testdb1", "constraints", "view1"]
+
+    def test_normal_broken_view(self):
+        con = sqlite3.connect(":memory:")
+        con.execute("CREATE TABLE a (id INTEGER)")
+        con.execute("CREATE TABLE b (id INTEGER)")
+        con.execute("CREATE VIEW view_a AS SELECT id FROM a")
+        con.execute("CREATE VIEW view_b AS SELECT id, id + 1 AS next_id FROM b")
+        con.execute("DROP TABLE a")
+        extractor = SQLiteSchemaExtractor(con)
+
+        view_schemas = extractor.fetch_view_schemas()
+
+        assert [view_schema.table_name for view_schema in view_schemas] == ["view_b"]
+        assert view_schemas[0].get_attr_names() == ["id", "next_id"]
+        assert view_schemas[0].as_dict()["view_b"][1]["Type"] is None
+
+    @pytest.mark.parametrize(
+        ["verbosity_level", "expected"],
+        [
+            [2, "view_b (id INTEGER, next_id)"],
+            [3, "view_b (id INTEGER Nullable, next_id Nullable)"],
+            [4, "view_b (\n    id INTEGER Nullable,\n    next_id Nullable\n)\n"],
+        ],
+    )
+    def test_normal_expression_view_dumps(self, verbosity_level, expected):
+        con = sqlite3.connect(":memory:")
+        con.execute("CREATE TABLE b (id INTEGER)")
+        con.execute("CREATE VIEW view_b AS SELECT id, id + 1 AS next_id FROM b")
+        extractor = SQLiteSchemaExtractor(con)
+
+        output = extractor.fetch_table_schema("view_b").dumps(
+            output_format="text", verbosity_level=verbosity_level
+        )
+
+        assert output == expected
+
+
+class Test_SQLiteSchemaExtractor_fetch_table_infos:
+    def test_normal(self):
+        con = sqlite3.connect(":memory:")
+        con.execute("CREATE TABLE regular (id INTEGER PRIMARY KEY, value TEXT)")
+        con.execute("CREATE TABLE wo_rowid (k TEXT PRIMARY KEY, v) WITHOUT ROWID")
+        con.execute("CREATE TABLE strict_table (id INTEGER, v TEXT) STRICT")
+        con.execute("CREATE VIRTUAL TABLE docs USING fts5(title, body)")
+        extractor = SQLiteSchemaExtractor(con)
+
+        table_infos = {table_info.name: table_info for table_info in extractor.fetch_table_infos()}
+
+        assert table_infos["regular"].table_type == TableType.REGULAR
+        assert not table_infos["regular"].without_rowid
+        assert table_infos["wo_rowid"].without_rowid
+        assert not table_infos["wo_rowid"].strict
+        assert table_infos["strict_table"].strict
+        assert table_infos["docs"].table_type == TableType.VIRTUAL
+        assert table_infos["docs"].module == "fts5"
+        assert sorted(
+            table_info.name for table_info in table_infos.values() if table_info.is_shadow
+        ) == ["docs_config", "docs_content", "docs_data", "docs_docsize", "docs_idx"]
+        assert table_infos["docs_idx"].parent == "docs"
+        assert table_infos["docs_idx"].without_rowid
+
+        assert extractor.fetch_table_names(include_shadow_table=False) == [
+            "regular",
+            "wo_rowid",
+            "strict_table",
+            "docs",
+        ]
+        assert [
+            table_schema.table_name
+            for table_schema in extractor.fetch_database_schema(include_shadow_table=False)
+        ] == ["regular", "wo_rowid", "strict_table", "docs"]
+
+
+class Test_SQLiteSchemaExtractor_fetch_triggers:
+    def test_normal(self, database_path):
+        con = sqlite3.connect(database_path)
+        con.execute(
+            dedent(
+                """\
+                CREATE TRIGGER after_insert_testdb0 AFTER INSERT ON testdb0
+                BEGIN
+                    UPDATE testdb1 SET foo = foo + 1;
+                END
+                """
+            )
+        )
+        con.execute(
+            dedent(
+                """\
+                CREATE TRIGGER upd_view1 INSTEAD OF UPDATE OF unique_value ON view1
+                BEGIN
+                    SELECT 1;
+                END
+                """
+            )
+        )
+        con.execute("CREATE TRIGGER del_testdb1 DELETE ON testdb1 BEGIN SELECT 1; END")
+        extractor = SQLiteSchemaExtractor(con)
+
+        assert [
+            (trigger.name, trigger.table_name, trigger.timing, trigger.event)
+            for trigger in extractor.fetch_triggers()
+        ] == [
+            ("after_insert_testdb0", "testdb0", "AFTER", "INSERT"),
+            ("upd_view1", "view1", "INSTEAD OF", "UPDATE"),
+            ("del_testdb1", "testdb1", "BEFORE", "DELETE"),
+        ]
+
+
+class Test_SQLiteSchemaExtractor_fetch_storage_infos:
+    def test_normal(self, database_path):
+        con = sqlite3.connect(database_path)
+        con.executemany("INSERT INTO testdb1 VALUES (?, ?, ?)", [[i, 0.1, "a"] for i in range(100)])
+        con.execute("ANALYZE testdb1")
+        con.commit()
+        extractor = SQLiteSchemaExtractor(con)
+
+        storage_infos = extractor.fetch_storage_infos()
+
+        assert list(storage_infos) == ["testdb0", "testdb1", "constraints"]
+        assert storage_infos["testdb0"].row_estimate == 2
+        assert storage_infos["testdb0"].row_estimate_source == RowEstimateSource.MAX_ROWID
+        assert storage_infos["testdb1"].row_estimate == 102
+        assert storage_infos["testdb1"].row_estimate_source == RowEstimateSource.SQLITE_STAT1
+        assert storage_infos["constraints"].row_estimate == 0
+
+        if storage_infos["testdb1"].size_bytes is None:
+            pytest.skip("requires dbstat")
+
+        assert storage_infos["testdb1"].page_count >= 1
+        assert storage_infos["testdb1"].size_bytes > 0
+        assert len(storage_infos["testdb1"].index_sizes) == 2
+        assert storage_infos["testdb1"].index_size_bytes > 0
+
+    def test_normal_table_names(self, database_path):
+        con = sqlite3.connect(database_path)
+        con.executemany("INSERT INTO testdb1 VALUES (?, ?, ?)", [[i, 0.1, "a"] for i in range(100)])
+        con.commit()
+        extractor = SQLiteSchemaExtractor(con)
+        expected = extractor.fetch_storage_infos()["testdb1"]
+        statements = []
+        con.set_trace_callback(statements.append)
+
+        storage_infos = extractor.fetch_storage_infos(table_names=["testdb1"])
+
+        assert list(storage_infos) == ["testdb1"]
+        assert storage_infos["testdb1"].as_dict() == expected.as_dict()
+        assert [statement for statement in statements if "max(rowid)" in statement] == [
+            'SELECT max(rowid) FROM "main"."testdb1"'
+        ]
+        assert all(
+            "WHERE s.name IN (" in statement for statement in statements if "dbstat" in statement
+        )
+
+    def test_normal_fetched_storage_infos(self, database_path):
+        con = sqlite3.connect(database_path)
+        extractor = SQLiteSchemaExtractor(con)
+        storage_infos = extractor.fetch_storage_infos()
+        expected_dumps = extractor.dumps(include_storage=True)
+        expected_dumps_storage = extractor.dumps_storage()
+        statements = []
+        con.set_trace_callback(statements.append)
+
+        assert extractor.dumps(storage_infos=storage_infos) == expected_dumps
+        assert extractor.dumps_storage(storage_infos=storage_infos) == expected_dumps_storage
+        assert not [
+            statement
+            for statement in statements
+            if "dbstat" in statement or "max(rowid)" in statement
+        ]
+
+    def test_normal_wo_dbstat(self, database_path):
+        extractor = SQLiteSchemaExtractor(database_path)
+        storage_info = extractor.fetch_storage_infos(use_dbstat=False)["testdb0"]
+
+        assert storage_info.size_bytes is None
+        assert storage_info.index_size_bytes is None
+        assert storage_info.row_estimate == 2
+
+    def test_normal_attach_to_table_schema(self, database_path):
+        extractor = SQLiteSchemaExtractor(database_path)
+        table_schema = extractor.fetch_table_schema("testdb0", include_storage=True)
+
+        assert table_schema.storage_info is not None
+        assert table_schema.storage_info.row_estimate == 2
+        assert table_schema.dumps(output_format="text", verbosity_level=0).startswith(
+            "testdb0 (rows: ~2"
+        )
+
+
+class Test_SQLiteSchemaExtractor_fetch_type_profile:
+    def test_normal(self):
+        con = sqlite3.connect(":memory:")
+        con.execute("CREATE TABLE mixed (id INTEGER PRIMARY KEY, value INTEGER, note TEXT)")
+        con.executemany(
+            "INSERT INTO mixed (value, note) VALUES (?, ?)",
+            [[i, None] for i in range(9)] + [["n/a", "x"]],
+        )
+        extractor = SQLiteSchemaExtractor(con)
+
+        type_profile = extractor.fetch_type_profile("mixed")
+
+        assert type_profile.is_full_scan
+        assert type_profile.sampled_rows == 10
+        assert type_profile.get_type_counts("value") == {"integer": 9, "text": 1}
+        assert type_profile.get_type_counts("note") == {"null": 9, "text": 1}
+        assert type_profile.to_summary("value") == "integer 90%, text 10%"
+
+    def test_normal_sampling(self):
+        con = sqlite3.connect(":memory:")
+        con.execute("CREATE TABLE large (value REAL)")
+        con.executemany("INSERT INTO large VALUES (?)", [[i / 2] for i in range(5000)])
+        con.execute("CREATE TABLE wo_rowid (k TEXT PRIMARY KEY, v BLOB) WITHOUT ROWID")
+        con.executemany("INSERT INTO wo_rowid VALUES (?, ?)", [[str(i), b"a"] for i in range(300)])
+        extractor = SQLiteSchemaExtractor(con)
+        type_profiler = TypeProfiler(sample_size=200, chunk_size=16, seed=0)
+
+        type_profile = extractor.fetch_type_profile("large", type_profiler=type_profiler)
+        assert not type_profile.is_full_scan
+        assert type_profile.sampled_rows == 200
+        assert type_profile.get_type_counts("value") == {"real": 200}
+
+        type_profile = extractor.fetch_type_profile("wo_rowid", type_profiler=type_profiler)
+        assert not type_profile.is_full_scan
+        assert type_profile.sampled_rows == 200
+        assert type_profile.get_type_counts("v") == {"blob": 200}
+
+    def test_normal_dumps(self, database_path):
+        extractor = SQLiteSchemaExtractor(database_path)
+        type_profiler = TypeProfiler()
+
+        output = extractor.dumps(output_format="markdown", type_profiler=type_profiler)
+        assert "Storage Class" in output
+        assert "integer 100%" in output
+
+        table_schema = extractor.fetch_table_schema("testdb0", type_profiler=type_profiler)
+        assert table_schema.type_profile is not None
+        assert table_schema.dumps(output_format="text", verbosity_level=2) == (
+            "testdb0 (attr_a INTEGER [integer 100%], attr b INTEGER [integer 100%])"
+        )
+        assert extractor.fetch_table_schema("testdb0").as_dict() == table_schema.as_dict()
+
+    def test_exception(self, database_path):
+        extractor = SQLiteSchemaExtractor(database_path)
+
+        with pytest.raises(DataNotFoundError):
+            extractor.fetch_type_profile("not_exist_table")
+
+        with pytest.raises(ValueError):
+            TypeProfiler(sample_size=0)
+
+
+class Test_SQLiteSchemaExtractor_fetch_column_stats:
+    def test_normal(self, database_path):
+        extractor = SQLiteSchemaExtractor(database_path, max_workers=4)
+
+        table_stats = extractor.fetch_column_stats()
+
+        assert list(table_stats) == ["testdb0", "testdb1", "constraints"]
+        assert table_stats["testdb0"].row_count == 2
+        assert table_stats["testdb0"].get("attr_a").min_value == 1
+        assert table_stats["testdb0"].get("attr_a").max_value == 3
+        assert table_stats["testdb1"].get("hoge").distinct_count == 2
+        assert table_stats["testdb1"].get("hoge").avg_length == 2
+        assert table_stats["constraints"].get("unique_value").null_fraction is None
+
+    def test_normal_dumps(self, database_path):
+        extractor = SQLiteSchemaExtractor(database_path)
+
+        output = extractor.dumps(output_format="markdown", include_stats=True)
+        assert "Null Fraction" in output
+        assert "Distinct" in output
+
+        output = extractor.dumps(output_format="markdown", verbosity_level=3, include_stats=True)
+        assert "Null Fraction" not in output
+
+        table_schema = extractor.fetch_table_schema("testdb1", include_stats=True)
+        assert table_schema.column_stats is not None
+        assert table_schema.column_stats.get("bar").max_value == 4.4
+        assert extractor.fetch_table_schema("view1", include_stats=True).column_stats is None
+
+
+class Test_SQLiteSchemaExtractor_dump_ddl:
+    def test_normal(self):
+        con = sqlite3.connect(":memory:")
+        con.executescript(
+            """
+            CREATE TABLE child (id integer primary key, parent_id int references parent(id));
+            CREATE TABLE parent (id INTEGER PRIMARY KEY, name text not null unique);
+            CREATE INDEX child_parent_id ON child(parent_id);
+            CREATE VIRTUAL TABLE docs USING fts5(body);
+            CREATE VIEW child_view AS SELECT * FROM child;
+            CREATE TRIGGER child_trigger AFTER INSERT ON child BEGIN SELECT 1; END;
+            """
+        )
+        extractor = SQLiteSchemaExtractor(con)
+
+        statements = list(extractor.dump_ddl())
+
+        assert statements == [
+            'CREATE TABLE "parent" (\n'
+            '    "id" INTEGER PRIMARY KEY,\n'
+            '    "name" TEXT NOT NULL UNIQUE\n'
+            ");",
+            "CREATE VIRTUAL TABLE docs USING fts5(body);",
+            'CREATE TABLE "child" (\n'
+            '    "id" INTEGER PRIMARY KEY,\n'
+            '    "parent_id" INT REFERENCES "parent" ("id")\n'
+            ");",
+            'CREATE INDEX "child_parent_id" ON "child" ("parent_id");',
+            "CREATE VIEW child_view AS SELECT * FROM child;",
+            "CREATE TRIGGER child_trigger AFTER INSERT ON child BEGIN SELECT 1; END;",
+        ]
+
+        # the DDL clones the schema and is stable for the clone
+        replica = sqlite3.connect(":memory:")
+        replica.executescript("\n".join(statements))
+        assert list(SQLiteSchemaExtractor(replica).dump_ddl()) == statements
+
+    def test_normal_cycle(self):
+        con = sqlite3.connect(":memory:")
+        con.executescript(
+            """
+            CREATE TABLE a (id INTEGER PRIMARY KEY, b_id INTEGER REFERENCES b(id));
+            CREATE TABLE b (id INTEGER PRIMARY KEY, a_id INTEGER REFERENCES a(id));
+            """
+        )
+
+        statements = list(SQLiteSchemaExtractor(con).dump_ddl())
+
+        assert [statement.splitlines()[0] for statement in statements] == [
+            'CREATE TABLE "a" (',
+            'CREATE TABLE "b" (',
+        ]
+
+
+class Test_SQLiteSchemaExtractor_thread_safety:
+    def test_normal_path(self, database_path):
+        extractor = SQLiteSchemaExtractor(database_path)
+        expected = extractor.fetch_database_schema_as_dict()
+
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            results = list(
+                executor.map(lambda _: extractor.fetch_database_schema_as_dict(), range(64))
+            )
+
+        assert all(result == expected for result in results)
+
+    def test_normal_shared_connection(self, database_path):
+        con = sqlite3.connect(database_path, check_same_thread=False)
+        extractor = SQLiteSchemaExtractor(con)
+        expected = extractor.fetch_database_schema_as_dict()
+
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            results = list(
+                executor.map(lambda _: extractor.fetch_database_schema_as_dict(), range(64))
+            )
+
+        assert all(result == expected for result in results)
+
+    def test_normal_row_factory(self, database_path):
+        con = sqlite3.connect(database_path)
+        con.row_factory = sqlite3.Row
+        extractor = SQLiteSchemaExtractor(con)
+
+        extractor.fetch_database_schema_as_dict()
+        extractor.fetch_table_schema("testdb0")
+
+        assert con.row_factory is sqlite3.Row
+
+    def test_normal_schema_change(self, database_path):
+        con = sqlite3.connect(database_path)
+        extractor = SQLiteSchemaExtractor(con)
+        assert "new_table" not in extractor.fetch_table_names()
+
+        con.execute("CREATE TABLE new_table (a INTEGER)")
+
+        assert "new_table" in extractor.fetch_table_names()
+
+
+class Test_SQLiteSchemaExtractor_ddl_cache:
+    def test_normal(self, database_path, tmpdir):
+        shard_path = str(tmpdir.join("shard.db"))
+        with sqlite3.connect(database_path) as src, sqlite3.connect(shard_path) as dst:
+            src.backup(dst)
+        SQLiteSchemaExtractor.clear_ddl_cache()
+
+        expected = SQLiteSchemaExtractor(database_path).fetch_database_schema_as_dict()
+        cache_info = SQLiteSchemaExtractor.get_ddl_cache_info()
+        assert cache_info.hits == 0
+        assert cache_info.misses == 3
+
+        assert SQLiteSchemaExtractor(shard_path).fetch_database_schema_as_dict() == expected
+        cache_info = SQLiteSchemaExtractor.get_ddl_cache_info()
+        assert cache_info.hits == 3
+        assert cache_info.misses == 3
+
+    def test_normal_results_are_not_shared(self, database_path):
+        extractor = SQLiteSchemaExtractor(database_path)
+        extractor.fetch_table_schema("testdb0").as_dict()["testdb0"][0]["Field"] = "modified"
+
+        assert extractor.fetch_table_schema("testdb0").get_attr_names() == ["attr_a", "attr b"]
+
+    def test_normal_disabled(self, database_path):
+        SQLiteSchemaExtractor.set_ddl_cache_size(0)
+        try:
+            SQLiteSchemaExtractor.clear_ddl_cache()
+            SQLiteSchemaExtractor(database_path).fetch_database_schema_as_dict()
+
+            assert SQLiteSchemaExtractor.get_ddl_cache_info().currsize == 0
+        finally:
+            SQLiteSchemaExtractor.set_ddl_cache_size(1024)
+
+
+class Test_SQLiteSchemaExtractor_refresh:
+    def test_normal(self, database_path):
+        con = sqlite3.connect(database_path)
+        extractor = SQLiteSchemaExtractor(con)
+
+        assert extractor.refresh() == SchemaChanges(added=["testdb0", "testdb1", "constraints"])
+        assert not extractor.refresh()
+
+        con.execute("ALTER TABLE testdb0 ADD COLUMN new_col TEXT")
+        con.execute("CREATE INDEX bar_index ON testdb1(bar)")
+        con.execute("DROP TABLE constraints")
+        con.execute("CREATE TABLE new_table (a INTEGER)")
+
+        assert extractor.refresh() == SchemaChanges(
+            added=["new_table"], dropped=["constraints"], modified=["testdb0", "testdb1"]
+        )
+
+    def test_normal_reparse_only_changed(self, database_path, monkeypatch):
+        con = sqlite3.connect(database_path)
+        extractor = SQLiteSchemaExtractor(con)
+        extractor.fetch_database_schema_as_dict()
+
+        parsed_tables = []
+        fetch_index_schema = SQLiteSchemaExtractor._fetch_index_schema
+
+        def counting_fetch_index_schema(self, table_name, schema_name="main"):
+            parsed_tables.append(table_name)
+            return fetch_index_schema(self, table_name, schema_name)
+
+        monkeypatch.setattr(
+            SQLiteSchemaExtractor, "_fetch_index_schema", counting_fetch_index_schema
+        )
+        con.execute("ALTER TABLE testdb0 ADD COLUMN new_col TEXT")
+
+        output = extractor.fetch_database_schema_as_dict()
+
+        assert parsed_tables == ["testdb0"]
+        assert [attr["Field"] for attr in output["testdb0"]] == ["attr_a", "attr b", "new_col"]
+
+
+class Test_SQLiteSchemaExtractor_snapshot:
+    @pytest.fixture
+    def wal_database_path(self, tmpdir):
+        database_path = str(tmpdir.join("wal.sqlite3"))
+        con = sqlite3.connect(database_path)
+        con.execute("PRAGMA journal_mode = WAL")
+        con.execute("CREATE TABLE a (x INTEGER)")
+        con.commit()
+        con.close()
+
+        return database_path
+
+    def test_normal(self, wal_database_path):
+        writer = sqlite3.connect(wal_database_path)
+        extractor = SQLiteSchemaExtractor(wal_database_path)
+
+        with extractor.snapshot() as snapshot:
+            writer.execute("CREATE TABLE b (y INTEGER)")
+            writer.execute("ALTER TABLE a ADD COLUMN z TEXT")
+            writer.commit()
+
+            assert extractor.fetch_table_names() == ["a"]
+            table_schemas = list(extractor.fetch_database_schema())
+            assert [table_schema.table_name for table_schema in table_schemas] == ["a"]
+            assert table_schemas[0].get_attr_names() == ["x"]
+            assert table_schemas[0].schema_version == snapshot.schema_version
+            assert snapshot.is_transaction_owner
+
+            with extractor.snapshot() as nested_snapshot:
+                assert nested_snapshot is snapshot
+
+        assert extractor.fetch_table_names() == ["a", "b"]
+        assert extractor.fetch_schema_version() > snapshot.schema_version
+        assert extractor.fetch_table_schema("a").get_attr_names() == ["x", "z"]
+
+    def test_normal_fetch_database_schema(self, wal_database_path):
+        writer = sqlite3.connect(wal_database_path)
+        writer.execute("CREATE TABLE b (y INTEGER)")
+        writer.commit()
+        extractor = SQLiteSchemaExtractor(wal_database_path)
+        schema_version = extractor.fetch_schema_version()
+
+        table_schemas = extractor.fetch_database_schema()
+        assert next(table_schemas).table_name == "a"
+
+        # the tables are read from the snapshot taken at the first table
+        writer.execute("DROP TABLE b")
+        writer.commit()
+
+        assert [table_schema.table_name for table_schema in table_schemas] == ["b"]
+        assert extractor.fetch_schema_version() > schema_version
+        assert extractor.fetch_table_names() == ["a"]
+
+    def test_normal_partially_consumed(self, database_path):
+        extractor = SQLiteSchemaExtractor(database_path)
+
+        table_schemas = extractor.fetch_database_schema()
+        assert next(table_schemas).table_name == "testdb0"
+
+        # the iterator does not hold the shared lock of the database
+        writer = sqlite3.connect(database_path, timeout=0)
+        writer.execute("CREATE TABLE b (y INTEGER)")
+        writer.commit()
+        writer.close()
+
+        assert [table_schema.table_name for table_schema in table_schemas] == [
+            "testdb1",
+            "constraints",
+        ]
+
+    def test_normal_caller_connection(self, database_path):
+        class CommitCountingConnection(sqlite3.Connection):
+            commit_count = 0
+
+            def commit(self):
+                self.commit_count += 1
+                super().commit()
+
+        con = sqlite3.connect(database_path, factory=CommitCountingConnection)
+        extractor = SQLiteSchemaExtractor(con)
+
+        with extractor.snapshot() as snapshot:
+            assert snapshot.is_transaction_owner
+            assert con.in_transaction
+            assert extractor.fetch_table_names() == ["testdb0", "testdb1", "constraints"]
+
+        assert len(list(extractor.fetch_database_schema())) == 3
+        assert not con.in_transaction
+        assert con.commit_count == 0
+
+    def test_normal_open_transaction(self, database_path):
+        con = sqlite3.connect(database_path)
+        con.execute("INSERT INTO testdb0 VALUES (1, 2)")
+        assert con.in_transaction
+        extractor = SQLiteSchemaExtractor(con)
+
+        with extractor.snapshot() as snapshot:
+            assert not snapshot.is_transaction_owner
+
+        # the transaction of the caller is not committed by the snapshot
+        assert con.in_transaction
+        con.rollback()
+
+
+class Test_SQLiteSchemaExtractor_progress:
+    def test_normal_fetch_database_schema(self, database_path):
+        extractor = SQLiteSchemaExtractor(database_path)
+        infos = []
+
+        table_schemas = list(extractor.fetch_database_schema(progress_callback=infos.append))
+
+        assert infos[0].tables_done == 0
+        assert infos[0].tables_total == len(table_schemas)
+        assert infos[-1].tables_done == len(table_schemas)
+        assert infos[-1].bytes_rendered == 0
+        assert infos[-1].current_table is None
+        assert infos[-1].is_finished
+        assert all(info.tables_total == len(table_schemas) for info in infos)
+
+    def test_normal_closed(self, database_path):
+        extractor = SQLiteSchemaExtractor(database_path)
+        infos = []
+
+        iter_table_schema = extractor.fetch_database_schema(progress_callback=infos.append)
+        next(iter_table_schema)
+        iter_table_schema.close()
+
+        # the tables are extracted before the first table schema is yielded
+        assert infos[-1].tables_done == 3
+        assert infos[-1].is_finished
+
+    def test_normal_dumps(self, database_path):
+        extractor = SQLiteSchemaExtractor(database_path)
+        infos = []
+
+        output = extractor.dumps(progress_callback=infos.append)
+
+        tables_total = infos[-1].tables_total
+        assert tables_total > 0
+        assert infos[-1].is_finished
+        assert infos[-1].bytes_rendered == len(output) - (tables_total - 1)
+
+    def test_normal_progress_bar(self, database_path):
+        extractor = SQLiteSchemaExtractor(database_path)
+        stream = io.StringIO()
+
+        extractor.dumps(progress_callback=ProgressBar(stream=stream, width=10))
+
+        lines = stream.getvalue().split("\r")
+        tables_total = len(extractor.fetch_table_names())
+        assert lines[-1].startswith("[##########] {0}/{0} tables".format(tables_total))
+        assert lines[-1].endswith("\n")
+
+    @pytest.mark.parametrize(["interval", "expected"], [[0, 7], [60, 2]])
+    def test_normal_throttle(self, interval, expected):
+        infos = []
+        progress = ProgressReporter(infos.append, interval=interval)
+
+        progress.set_total(3)
+        for table_name in ("a", "b", "c"):
+            progress.begin("main", table_name)
+            progress.add_bytes(10)
+            progress.end()
+        progress.close()
+
+        # the first and the last states are always reported
+        assert len(infos) == expected
+        assert infos[0] == infos[0]._replace(tables_done=0, tables_total=3, bytes_rendered=0)
+        assert infos[-1].tables_done == 3
+        assert infos[-1].bytes_rendered == 30
+        assert infos[-1].is_finished
+
+
+class Test_SQLiteSchemaExtractor_busy_retry:
+    @pytest.fixture
+    def locked_db_path(self, tmpdir):
+        # rollback journal mode: an exclusive lock blocks readers
+        p = str(tmpdir.join("locked.sqlite3"))
+        con = sqlite3.connect(p, isolation_level=None, check_same_thread=False)
+        con.execute("CREATE TABLE t (a INTEGER)")
+        con.execute("BEGIN EXCLUSIVE")
+        yield p, con
+        con.close()
+
+    def test_normal(self, locked_db_path):
+        p, lock_con = locked_db_path
+        extractor = SQLiteSchemaExtractor(
+            p, busy_timeout=0, retry_policy=RetryPolicy(max_retries=50, max_delay=0.05, seed=0)
+        )
+        timer = threading.Timer(0.2, lock_con.rollback)
+        timer.start()
+
+        try:
+            assert extractor.fetch_table_names() == ["t"]
+        finally:
+            timer.cancel()
+
+        stats = extractor.get_retry_stats()
+        assert stats.retries > 0
+        assert stats.busy_errors == stats.retries
+        assert stats.exhausted == 0
+        assert stats.wait_seconds > 0
+
+    def test_exception_exhausted(self, locked_db_path):
+        p, _ = locked_db_path
+        extractor = SQLiteSchemaExtractor(
+            p, busy_timeout=0, retry_policy=RetryPolicy(max_retries=2, initial_delay=0.01)
+        )
+
+        with pytest.raises(sqlite3.OperationalError, match="locked"):
+            extractor.fetch_table_names()
+
+        stats = extractor.get_retry_stats()
+        assert stats.retries == 2
+        assert stats.busy_errors == 3
+        assert stats.exhausted == 1
+
+    @pytest.mark.parametrize(
+        ["kwargs"],
+        [[{"max_retries": -1}], [{"initial_delay": -1}], [{"max_delay": -1}]],
+    )
+    def test_exception_policy(self, kwargs):
+        with pytest.raises(ValueError):
+            RetryPolicy(**kwargs)
+
+    def test_normal_calc_delay(self):
+        policy = RetryPolicy(initial_delay=0.1, max_delay=0.3, seed=0)
+
+        for attempt in range(10):
+            assert 0 <= policy.calc_delay(attempt) <= min(0.3, 0.1 * 2**attempt)
+
+
+class Test_SQLiteSchemaExtractor_time_budget:
+    @pytest.fixture
+    def endless_con(self):
+        con = sqlite3.connect(":memory:")
+        con.executescript(
+            """
+            CREATE TABLE a (x INTEGER);
+            CREATE TABLE b (y INTEGER);
+            CREATE VIEW endless AS
+                WITH RECURSIVE r(i) AS (SELECT 1 UNION ALL SELECT i + 1 FROM r) SELECT i FROM r;
+            """
+        )
+
+        return con
+
+    def test_normal_call_time_budget(self, endless_con):
+        extractor = SQLiteSchemaExtractor(endless_con, call_time_budget=0.2)
+
+        with pytest.raises(ExtractionTimeoutError) as e:
+            extractor.fetch_column_stats(table_names=["a", "endless"])
+
+        assert list(e.value.partial_result) == ["a"]
+
+        # each call has its own budget
+        assert extractor.fetch_table_names() == ["a", "b"]
+
+    def test_normal_time_budget(self, endless_con):
+        extractor = SQLiteSchemaExtractor(endless_con, time_budget=0.2)
+        assert extractor.fetch_table_names() == ["a", "b"]
+
+        with pytest.raises(ExtractionTimeoutError):
+            extractor.fetch_column_stats(table_names=["endless"])
+        with pytest.raises(ExtractionTimeoutError):
+            extractor.fetch_table_names()
+
+    def test_normal_cancel(self, endless_con, monkeypatch):
+        # report every progress
+        monkeypatch.setattr(
+            "sqliteschema._extractor.ProgressReporter", partial(ProgressReporter, interval=0)
+        )
+        token = CancellationToken()
+        extractor = SQLiteSchemaExtractor(endless_con, cancellation_token=token)
+
+        def cancel_after_first_table(info):
+            if info.tables_done == 1:
+                token.cancel()
+
+        with pytest.raises(ExtractionCancelledError) as e:
+            list(extractor.fetch_database_schema(progress_callback=cancel_after_first_table))
+
+        assert [table_schema.table_name for table_schema in e.value.partial_result] == ["a"]
+
+    def test_normal_cancel_running_statement(self, endless_con):
+        token = CancellationToken()
+        extractor = SQLiteSchemaExtractor(endless_con, cancellation_token=token)
+        timer = threading.Timer(0.2, token.cancel)
+        timer.start()
+
+        with pytest.raises(ExtractionCancelledError):
+            extractor.fetch_column_stats(table_names=["endless"])
+
+        timer.join()
+
+    def test_normal_dumps(self, database_path, monkeypatch):
+        token = CancellationToken()
+        extractor = SQLiteSchemaExtractor(database_path, cancellation_token=token)
+        expected = SQLiteSchemaExtractor(database_path).fetch_table_schema("testdb0").dumps()
+        dumps = SQLiteTableSchema.dumps
+
+        def cancelling_dumps(self, *args, **kwargs):
+            token.cancel()
+            return dumps(self, *args, **kwargs)
+
+        monkeypatch.setattr(SQLiteTableSchema, "dumps", cancelling_dumps)
+
+        with pytest.raises(ExtractionCancelledError) as e:
+            extractor.dumps()
+
+        assert e.value.partial_result == expected
+
+    def test_exception(self, endless_con):
+        token = CancellationToken()
+        token.cancel()
+        extractor = SQLiteSchemaExtractor(endless_con, cancellation_token=token)
+
+        with pytest.raises(ExtractionCancelledError) as e:
+            extractor.fetch_table_names()
+
+        assert e.value.partial_result is None
+
+
+class Test_SQLiteSchemaExtractor_find_columns:
+    @pytest.fixture
+    def extractor(self):
+        con = sqlite3.connect(":memory:")
+        con.execute(
+            dedent(
+                """\
+                CREATE TABLE t1 (
+                    id INTEGER PRIMARY KEY,
+                    tenant_id INT NOT NULL,
+                    data BLOB,
+                    name varchar(20) UNIQUE
+                )
+                """
+            )
+        )
+        con.execute("CREATE TABLE t2 (a, b, Tenant_Id INTEGER, PRIMARY KEY (a, b)) WITHOUT ROWID")
+        con.execute("CREATE INDEX t2_tenant ON t2(tenant_id, b)")
+
+        return SQLiteSchemaExtractor(con)
+
+    @pytest.mark.parametrize(
+        ["kwargs", "expected"],
+        [
+            [{"name": "TENANT_ID"}, [("t1", "tenant_id"), ("t2", "Tenant_Id")]],
+            [{"name": "tenant_id", "type": "integer"}, [("t2", "Tenant_Id")]],
+            [{"type": "VARCHAR"}, [("t1", "name")]],
+            [{"affinity": "BLOB"}, [("t1", "data"), ("t2", "a"), ("t2", "b")]],
+            [{"primary_key": True}, [("t1", "id"), ("t2", "a"), ("t2", "b")]],
+            [{"unique": True}, [("t1", "id"), ("t1", "name")]],
+            [{"name": "tenant_id", "indexed": False}, [("t1", "tenant_id")]],
+            [{"not_null": True, "primary_key": False}, [("t1", "tenant_id")]],
+            [{"name": "not_exist"}, []],
+        ],
+    )
+    def test_normal(self, extractor, kwargs, expected):
+        output = extractor.find_columns(**kwargs)
+
+        assert [(column.table_name, column.column_name) for column in output] == expected
+
+    def test_normal_schema_change(self, database_path):
+        con = sqlite3.connect(database_path)
+        extractor = SQLiteSchemaExtractor(con)
+        assert extractor.find_columns(name="tenant_id") == []
+
+        con.execute("CREATE TABLE new_table (tenant_id INTEGER)")
+
+        assert [column.table_name for column in extractor.find_columns(name="tenant_id")] == [
+            "new_table"
+        ]
+
+    def test_exception(self, extractor):
+        with pytest.raises(TypeError):
+            extractor.find_columns(not_exist=True)
+
+
 class Test_SQLiteSchemaExtractor_get_attr_names:
     def test_normal(self, database_path):
         extractor = SQLiteSchemaExtractor(database_path)
@@ -0,0 +1,67 @@
+"""
+.. codeauthor:: Tsuyoshi Hombashi <tsuyoshi.hombashi@gmail.com>
+"""
+
+import pytest
+
+from sqliteschema._script import iter_schema_statements, load_sql_script
+
+
+SCRIPT = """PRAGMA foreign_keys=OFF;
+BEGIN TRANSACTION;
+-- table
+CREATE TABLE t (a INTEGER, -- a; column
+  b TEXT /* b; column */ DEFAULT 'x;''y');
+INSERT INTO t VALUES(1,'a;b''--c/*');
+INSERT INTO "t" VALUES(2,'[x];');
+CREATE TRIGGER tr AFTER INSERT ON t BEGIN SELECT 1; SELECT ';'; END;
+PRAGMA writable_schema=ON;
+INSERT INTO sqlite_schema(type,name,tbl_name,rootpage,sql)VALUES('table','v_t','v_t',0,'CREATE VIRTUAL TABLE v_t USING fts5(body)');
+CREATE TABLE IF NOT EXISTS 'v_t_data'(id INTEGER PRIMARY KEY, block BLOB);
+PRAGMA writable_schema=OFF;
+CREATE INDEX i ON t(b);
+COMMIT;
+CREATE VIEW v AS SELECT * FROM t"""
+
+
+class Test_iter_schema_statements:
+    def test_normal(self):
+        assert list(iter_schema_statements([SCRIPT])) == [
+            "CREATE TABLE t (a INTEGER, -- a; column\n  b TEXT /* b; column */ DEFAULT 'x;''y');",
+            "CREATE TRIGGER tr AFTER INSERT ON t BEGIN SELECT 1; SELECT ';'; END;",
+            "PRAGMA writable_schema=ON;",
+            "INSERT INTO sqlite_schema(type,name,tbl_name,rootpage,sql)VALUES("
+            "'table','v_t','v_t',0,'CREATE VIRTUAL TABLE v_t USING fts5(body)');",
+            "CREATE TABLE IF NOT EXISTS 'v_t_data'(id INTEGER PRIMARY KEY, block BLOB);",
+            "PRAGMA writable_schema=OFF;",
+            "CREATE INDEX i ON t(b);",
+            "CREATE VIEW v AS SELECT * FROM t",
+        ]
+
+    @pytest.mark.parametrize(["chunk_size"], [[1], [2], [3], [5], [7], [64]])
+    def test_normal_chunks(self, chunk_size):
+        chunks = [SCRIPT[i : i + chunk_size] for i in range(0, len(SCRIPT), chunk_size)]
+
+        assert list(iter_schema_statements(chunks)) == list(iter_schema_statements([SCRIPT]))
+
+    def test_normal_schema_table(self):
+        script = 'INSERT INTO main."sqlite_schema" VALUES(1); INSERT OR REPLACE INTO t VALUES(1);'
+
+        assert list(iter_schema_statements([script])) == [
+            'INSERT INTO main."sqlite_schema" VALUES(1);'
+        ]
+
+
+class Test_load_sql_script:
+    def test_normal(self):
+        con = load_sql_script([SCRIPT])
+
+        assert con.execute("SELECT type, name FROM sqlite_master").fetchall() == [
+            ("table", "t"),
+            ("trigger", "tr"),
+            ("table", "v_t"),
+            ("table", "v_t_data"),
+            ("index", "i"),
+            ("view", "v"),
+        ]
+        assert con.execute("SELECT count(*) FROM t").fetchone() == (0,)
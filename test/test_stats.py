@@ -0,0 +1,129 @@
+"""
+.. codeauthor:: Tsuyoshi Hombashi <tsuyoshi.hombashi@gmail.com>
+"""
+
+import sqlite3
+from datetime import datetime
+from decimal import Decimal
+
+import pytest
+
+from sqliteschema import ColumnStatsCollector, HyperLogLog
+
+
+class Test_HyperLogLog_estimate:
+    @pytest.mark.parametrize(["cardinality"], [[0], [10], [1000], [50000]])
+    def test_normal(self, cardinality):
+        sketch = HyperLogLog(precision=12)
+        for _ in range(2):
+            for i in range(cardinality):
+                sketch.add(i)
+
+        assert sketch.estimate() == pytest.approx(cardinality, rel=0.05, abs=1)
+
+    def test_normal_storage_classes(self):
+        sketch = HyperLogLog()
+        for value in [1, 1.0, "1", b"1"]:
+            sketch.add(value)
+
+        assert sketch.estimate() == 3
+
+    def test_normal_merge(self):
+        lhs = HyperLogLog()
+        rhs = HyperLogLog()
+        for i in range(1000):
+            lhs.add(i)
+            rhs.add(i + 500)
+        lhs.merge(rhs)
+
+        assert lhs.estimate() == pytest.approx(1500, rel=0.05)
+
+    def test_exception(self):
+        with pytest.raises(ValueError):
+            HyperLogLog(precision=3)
+
+        with pytest.raises(ValueError):
+            HyperLogLog(precision=10).merge(HyperLogLog(precision=12))
+
+
+class Test_ColumnStatsCollector_collect:
+    def test_normal(self):
+        con = sqlite3.connect(":memory:")
+        con.execute("CREATE TABLE sample (id INTEGER, name TEXT, data)")
+        con.executemany(
+            "INSERT INTO sample VALUES (?, ?, ?)",
+            [[i, None if i % 4 == 0 else f"name{i % 10}", i] for i in range(1000)]
+            + [[None, "zz", "text"], [None, "a", b"\x00\x01"]],
+        )
+
+        table_stats = ColumnStatsCollector(fetch_size=100).collect(
+            con.cursor(), "main", "sample", ["id", "name", "data"]
+        )
+
+        assert table_stats.row_count == 1002
+        assert table_stats.column_names == ["id", "name", "data"]
+
+        id_stats = table_stats.get("id")
+        assert id_stats.null_count == 2
+        assert id_stats.min_value == 0
+        assert id_stats.max_value == 999
+        assert id_stats.distinct_count == pytest.approx(1000, rel=0.05)
+
+        name_stats = table_stats.get("name")
+        assert name_stats.null_fraction == pytest.approx(250 / 1002)
+        assert name_stats.min_value == "a"
+        assert name_stats.max_value == "zz"
+        assert name_stats.distinct_count == 12
+        assert name_stats.avg_length == pytest.approx((750 * 5 + 3) / 752)
+
+        # numbers < texts < blobs
+        data_stats = table_stats.get("data")
+        assert data_stats.min_value == 0
+        assert data_stats.max_value == b"\x00\x01"
+        assert data_stats.to_display_values()["max_value"] == "x'0001'"
+
+    def test_normal_converters(self, monkeypatch):
+        monkeypatch.setitem(
+            sqlite3.converters, "DATETIME", lambda value: datetime.fromisoformat(value.decode())
+        )
+        monkeypatch.setitem(sqlite3.converters, "MONEY", lambda value: Decimal(value.decode()))
+        monkeypatch.setitem(sqlite3.converters, "BOOL", lambda value: bool(int(value)))
+        con = sqlite3.connect(":memory:", detect_types=sqlite3.PARSE_DECLTYPES)
+        con.execute("CREATE TABLE sample (created_at DATETIME, price MONEY, flag BOOL)")
+        con.executemany(
+            "INSERT INTO sample VALUES (?, ?, ?)",
+            [
+                ["2024-01-02 03:04:05", "1.5", 1],
+                ["2023-12-31 23:59:59", "10.25", 0],
+                ["2024-06-01 00:00:00", "0.5", 1],
+            ],
+        )
+
+        table_stats = ColumnStatsCollector().collect(
+            con.cursor(), "main", "sample", ["created_at", "price", "flag"]
+        )
+
+        created_at_stats = table_stats.get("created_at")
+        assert created_at_stats.min_value == "2023-12-31 23:59:59"
+        assert created_at_stats.max_value == "2024-06-01 00:00:00"
+        assert created_at_stats.distinct_count == 3
+
+        price_stats = table_stats.get("price")
+        assert price_stats.min_value == 0.5
+        assert price_stats.max_value == 10.25
+
+        flag_stats = table_stats.get("flag")
+        assert flag_stats.min_value == 0
+        assert flag_stats.max_value == 1
+        assert flag_stats.distinct_count == 2
+
+    def test_normal_empty(self):
+        con = sqlite3.connect(":memory:")
+        con.execute("CREATE TABLE empty (id INTEGER)")
+
+        table_stats = ColumnStatsCollector().collect(con.cursor(), "main", "empty", ["id"])
+
+        assert table_stats.row_count == 0
+        assert table_stats.get("id").null_fraction is None
+        assert table_stats.get("id").avg_length is None
+        assert table_stats.get("id").distinct_count == 0